@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+ASGI App Module - Production serving mode on one long-lived event loop
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+
+Turn endpoints (/api/chat, /api/voice/chat and their /stream variants) run as coroutines on the
+server's loop: OpenAI STT/LLM/TTS through the pooled async client, product search on the bounded
+search pool, admission through the turn limiter (503 when it and its queue are full). A turn
+waiting on OpenAI holds a coroutine, not a thread, so one worker serves many concurrent calls.
+Every other route is the Flask app, run on a small thread pool by a2wsgi.
+"""
+
+import io
+import os
+import json
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from a2wsgi import WSGIMiddleware
+from a2wsgi.wsgi import build_environ
+
+import async_runtime
+from async_runtime import Overloaded
+import voice_sales_app_optimized as web
+
+logger = logging.getLogger(__name__)
+
+# Threads serving the Flask routes (pages, catalog queries, audio files, admin) and request parsing
+WSGI_WORKERS = int(os.getenv('WSGI_WORKERS', '16'))
+
+# Largest request body accepted (voice uploads are read into memory)
+MAX_BODY_BYTES = int(os.getenv('MAX_BODY_BYTES', str(25 * 1024 * 1024)))
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+class TurnRoute(NamedTuple):
+    """An endpoint served natively: request parser, turn coroutine and how its result is sent"""
+    parse: Callable  # runs in a Flask request context: (args, None) or (None, error response)
+    turn: Callable  # coroutine function (JSON payload) or async generator function (NDJSON events)
+    stream: bool
+    error_message: str
+
+
+TURN_ROUTES: Dict[Tuple[str, str], TurnRoute] = {
+    ('POST', '/api/chat'): TurnRoute(web.read_chat_request, web.chat_turn, False, 'Error processing message'),
+    ('POST', '/api/chat/stream'): TurnRoute(
+        web.read_chat_request, web.chat_stream_turn, True, 'Error processing message'),
+    ('POST', '/api/voice/chat'): TurnRoute(
+        web.read_voice_request, web.voice_turn, False, 'Error processing voice message'),
+    ('POST', '/api/voice/chat/stream'): TurnRoute(
+        web.read_voice_request, web.voice_stream_turn, True, 'Error processing voice message'),
+}
+
+NDJSON_HEADERS: Headers = [
+    (b'content-type', b'application/x-ndjson'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),
+]
+
+# Flask enforces the same body limit on the routes it serves (413)
+web.app.config.setdefault('MAX_CONTENT_LENGTH', MAX_BODY_BYTES)
+flask_asgi = WSGIMiddleware(web.app, workers=WSGI_WORKERS)
+
+# Turn requests are parsed in a Flask request context off the loop
+_wsgi_pool = ThreadPoolExecutor(max_workers=WSGI_WORKERS, thread_name_prefix='wsgi')
+
+
+class RequestTooLarge(Exception):
+    pass
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+async def read_body(receive) -> bytes:
+    """Whole request body, bounded by MAX_BODY_BYTES"""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ClientDisconnected()
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise RequestTooLarge()
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+def turn_environ(scope: Dict, body: bytes) -> Dict:
+    """WSGI environ for a turn request whose body was already read"""
+    environ = build_environ(scope, io.BytesIO(body))
+    environ['CONTENT_LENGTH'] = str(len(body))
+    return environ
+
+
+def encode_headers(headers) -> Headers:
+    return [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+
+async def send_response(send, status: int, body: bytes, headers: Headers):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': headers + [(b'content-length', str(len(body)).encode())]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_json(send, status: int, payload: Dict, headers: Headers = ()):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    await send_response(send, status, body, [(b'content-type', b'application/json')] + list(headers))
+
+
+async def send_error(send, status: int, error: str):
+    headers = [(b'retry-after', b'1')] if status == 503 else []
+    await send_json(send, status, {'error': error}, headers)
+
+
+def event_line(event: Dict) -> bytes:
+    return (json.dumps(event, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def prepare_turn(environ: Dict, parse: Callable):
+    """
+    Parse a turn request inside a Flask request context (same validation and session cookie
+    as the Flask views). Returns (args, error response or None, Set-Cookie headers).
+    """
+    flask_app = web.app
+    with flask_app.request_context(environ) as ctx:
+        args, error = parse()
+        response = flask_app.make_response(error) if error else flask_app.response_class()
+        flask_app.session_interface.save_session(flask_app, ctx.session, response)
+        cookies = [(b'set-cookie', cookie.encode('latin-1')) for cookie in response.headers.getlist('Set-Cookie')]
+        if error:
+            return None, response, cookies
+        return args, None, cookies
+
+
+async def until_disconnect(receive):
+    """Return once the client has gone away (the body was already consumed)"""
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def handle_turn(scope: Dict, receive, send, route: TurnRoute):
+    body = await read_body(receive)
+    loop = asyncio.get_running_loop()
+    args, error, cookies = await loop.run_in_executor(_wsgi_pool, prepare_turn, turn_environ(scope, body), route.parse)
+    if error is not None:
+        await send_response(send, error.status_code, error.get_data(), encode_headers(error.headers.to_wsgi_list()))
+        return
+
+    if not route.stream:
+        try:
+            payload = await route.turn(*args)
+        except Overloaded:
+            await send_error(send, 503, web.OVERLOADED_ERROR)
+            return
+        except Exception as e:
+            logger.error(f"{route.error_message}: {e}")
+            await send_error(send, 500, route.error_message)
+            return
+        await send_json(send, 200, payload, cookies)
+        return
+
+    # The first event is awaited before the response starts so refusals and early failures get a status
+    events = route.turn(*args)
+    try:
+        first = await events.__anext__()
+    except Overloaded:
+        await send_error(send, 503, web.OVERLOADED_ERROR)
+        return
+    except Exception as e:
+        logger.error(f"{route.error_message}: {e}")
+        await send_error(send, 500, route.error_message)
+        return
+
+    async def stream():
+        try:
+            await send({'type': 'http.response.body', 'body': event_line(first), 'more_body': True})
+            async for event in events:
+                await send({'type': 'http.response.body', 'body': event_line(event), 'more_body': True})
+        except Exception as e:
+            logger.error(f"{route.error_message}: {e}")
+            await send({'type': 'http.response.body', 'more_body': True,
+                        'body': event_line({'type': 'error', 'error': route.error_message})})
+        finally:
+            await events.aclose()
+        await send({'type': 'http.response.body', 'body': b''})
+
+    await send({'type': 'http.response.start', 'status': 200, 'headers': NDJSON_HEADERS + cookies})
+
+    # A client that hangs up cancels the turn, releasing its slot and the OpenAI streams
+    streaming = asyncio.ensure_future(stream())
+    watcher = asyncio.ensure_future(until_disconnect(receive))
+    await asyncio.wait([streaming, watcher], return_when=asyncio.FIRST_COMPLETED)
+    if not streaming.done():
+        logger.info("Client disconnected, cancelling streamed turn")
+        streaming.cancel()
+    watcher.cancel()
+    await asyncio.gather(streaming, watcher, return_exceptions=True)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            loop = asyncio.get_running_loop()
+            async_runtime.use_event_loop(loop)
+            if await loop.run_in_executor(None, web.start_services):
+                await send({'type': 'lifespan.startup.complete'})
+            else:
+                await send({'type': 'lifespan.startup.failed', 'message': 'Failed to initialize product database'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope: Dict, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    # Servers running without lifespan events still get a single shared loop
+    async_runtime.use_event_loop(asyncio.get_running_loop())
+
+    route = TURN_ROUTES.get((scope['method'], scope['path']))
+    try:
+        if route is not None:
+            await handle_turn(scope, receive, send, route)
+        else:
+            await flask_asgi(scope, receive, send)
+    except RequestTooLarge:
+        await send_error(send, 413, 'Request body too large')
+    except ClientDisconnected:
+        pass
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run('asgi_app:app', host='0.0.0.0', port=int(os.getenv('PORT', '5000')))
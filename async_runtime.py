@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Async Runtime Module - One long-lived event loop shared by the synchronous Flask views
+Lets WSGI handlers run coroutines and consume async generators without asyncio.run per request.
+Under the ASGI server the server's own loop is adopted instead of a background thread. Turns are
+admitted through a bounded concurrency limiter and CPU-bound search runs on a bounded pool.
+"""
+
+import os
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator
+
+import metrics
+
+# Turns (STT/search/LLM/TTS) processed at once per process, and turns allowed to wait for a slot
+MAX_CONCURRENT_TURNS = int(os.getenv('MAX_CONCURRENT_TURNS', '64'))
+MAX_QUEUED_TURNS = int(os.getenv('MAX_QUEUED_TURNS', '256'))
+
+# Threads running CPU-bound product search off the event loop
+SEARCH_WORKERS = int(os.getenv('SEARCH_WORKERS', str(min(8, os.cpu_count() or 1))))
+
+TURNS_REJECTED = metrics.Counter(
+    'voice_sales_turns_rejected_total', 'Turns refused because the concurrency limit and queue were full')
+
+_loop = None
+_loop_lock = threading.Lock()
+_search_pool = None
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop, starting its thread on first use"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='async-runtime', daemon=True)
+                thread.start()
+                _loop = loop
+    return _loop
+
+
+def use_event_loop(loop: asyncio.AbstractEventLoop):
+    """Share a server's running loop (ASGI mode) instead of starting a background thread"""
+    global _loop
+    if _loop is loop:
+        return
+    with _loop_lock:
+        if _loop is not None and _loop is not loop:
+            raise RuntimeError("A different shared event loop is already running")
+        _loop = loop
+
+
+def run_async(coro: Awaitable, timeout: float = None) -> Any:
+    """Run a coroutine on the background loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result(timeout)
+
+
+def iterate_async(agen: AsyncIterator) -> Iterator:
+    """
+    Consume an async generator from synchronous code, one item at a time.
+    Closing the returned iterator (e.g. client disconnect) closes the generator.
+    """
+    loop = get_event_loop()
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result()
+            except StopAsyncIteration:
+                break
+    finally:
+        asyncio.run_coroutine_threadsafe(agen.aclose(), loop).result()
+
+
+async def run_in_pool(func: Callable, *args, **kwargs) -> Any:
+    """Run blocking or CPU-bound work on the search pool, keeping context variables (request timings)"""
+    global _search_pool
+    if _search_pool is None:
+        with _loop_lock:
+            if _search_pool is None:
+                _search_pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix='search')
+    context = contextvars.copy_context()
+    call = partial(context.run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_search_pool, call)
+
+
+class Overloaded(Exception):
+    """The turn limiter is at capacity and its wait queue is full"""
+
+
+class ConcurrencyLimiter:
+    """
+    At most max_concurrent holders, with at most max_queued waiting for a slot
+    Beyond that, acquire raises Overloaded right away so callers can answer 503 (backpressure)
+    instead of piling up requests. Used from the shared event loop only.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_TURNS, max_queued: int = MAX_QUEUED_TURNS):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._semaphore = None
+
+    async def acquire(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        if self._semaphore.locked() and self.waiting >= self.max_queued:
+            self.rejected += 1
+            TURNS_REJECTED.inc()
+            raise Overloaded(f"{self.active} turns running and {self.waiting} waiting")
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+
+    def release(self):
+        self.active -= 1
+        self._semaphore.release()
+
+    async def __aenter__(self) -> 'ConcurrencyLimiter':
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+    def stats(self) -> Dict:
+        return {
+            'active': self.active,
+            'waiting': self.waiting,
+            'rejected': self.rejected,
+            'max_concurrent': self.max_concurrent,
+            'max_queued': self.max_queued,
+        }
+
+
+turn_limiter = ConcurrencyLimiter()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Audio Store Module - MP3 files shared by the workers of one host
+Voice endpoints return an audio URL instead of base64 inside the JSON; the file is served
+with send_file, so clients get the raw MP3 with range requests and can start playing it
+before the download finishes. Published files expire after a TTL. The TTS cache keeps its
+disk tier in the same kind of store, bounded by size instead.
+"""
+
+import os
+import re
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+AUDIO_STORE_DIR = os.getenv('AUDIO_STORE_DIR', os.path.join(tempfile.gettempdir(), 'voice_sales_audio'))
+AUDIO_URL_TTL = float(os.getenv('AUDIO_URL_TTL', '600'))
+
+# How often expired files are swept during writes (seconds)
+PURGE_INTERVAL = 60
+
+# Published ids are 32 hex characters, TTS cache keys 64
+AUDIO_KEY = re.compile(r'^[0-9a-f]{32,64}$')
+AUDIO_SUFFIX = '.mp3'
+
+
+class AudioStore:
+    """
+    MP3 files named by key, in subdirectories by key prefix, created on the first write
+    With `ttl`, files expire that many seconds after they were last written or read (published
+    responses). With `max_bytes`, the least recently used files go once the store is over it
+    (TTS cache); that index is per process and built from the directory on first use.
+    """
+
+    def __init__(self, directory: str = AUDIO_STORE_DIR, ttl: Optional[float] = AUDIO_URL_TTL,
+                 max_bytes: Optional[int] = None):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._entries: Optional['OrderedDict[str, int]'] = None
+        self._last_purge = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + AUDIO_SUFFIX)
+
+    def _expired(self, path: str) -> bool:
+        """The file is missing or older than the TTL"""
+        try:
+            return self.ttl is not None and time.time() - os.path.getmtime(path) > self.ttl
+        except OSError:
+            return True
+
+    def _index(self) -> 'OrderedDict[str, int]':
+        """Size of every stored file, least recently used first (call with the lock held)"""
+        if self._entries is None:
+            found = []
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith(AUDIO_SUFFIX):
+                        try:
+                            stat = os.stat(os.path.join(root, name))
+                        except OSError:
+                            continue
+                        found.append((stat.st_mtime, name[:-len(AUDIO_SUFFIX)], stat.st_size))
+            self._entries = OrderedDict((key, size) for _, key, size in sorted(found))
+            self.bytes = sum(self._entries.values())
+            self._evict()
+        return self._entries
+
+    def _evict(self):
+        while self.max_bytes is not None and self.bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+
+    def _forget(self, key: str):
+        """Drop a key from the size index (call with the lock held)"""
+        size = self._entries.pop(key, None) if self._entries is not None else None
+        if size is not None:
+            self.bytes -= size
+
+    def _write(self, key: str, audio: bytes):
+        """Write the file atomically, so readers never see partial audio"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(audio)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        if self.max_bytes is not None:
+            with self._lock:
+                entries = self._index()
+                self._forget(key)
+                entries[key] = len(audio)
+                self.bytes += len(audio)
+                self._evict()
+        self._maybe_purge()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Stored audio of a key, or None"""
+        if self.max_bytes is not None:
+            with self._lock:
+                entries = self._index()
+                if key not in entries:
+                    return None
+                entries.move_to_end(key)
+        path = self._path(key)
+        if self._expired(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                audio = f.read()
+            # The modification time records recency across restarts
+            os.utime(path)
+            return audio
+        except OSError:
+            with self._lock:
+                self._forget(key)
+            return None
+
+    def set(self, key: str, audio: bytes):
+        """Store audio under a key (skipped, with a warning, when it can't be written)"""
+        if self.max_bytes is not None and len(audio) > self.max_bytes:
+            return
+        try:
+            self._write(key, audio)
+        except OSError as e:
+            logger.warning(f"Could not store audio in {self.directory}: {e}")
+
+    def publish(self, audio: bytes) -> str:
+        """Store the audio (once per content) and return its id"""
+        audio_id = hashlib.sha256(audio).hexdigest()[:32]
+        path = self._path(audio_id)
+        if not self._expired(path):
+            # Same content published again: extend its lifetime
+            os.utime(path)
+            self._maybe_purge()
+        else:
+            self._write(audio_id, audio)
+        return audio_id
+
+    def path(self, audio_id: str) -> Optional[str]:
+        """File of a stored, unexpired audio id, or None"""
+        if not AUDIO_KEY.match(audio_id):
+            return None
+        path = self._path(audio_id)
+        return None if self._expired(path) else path
+
+    def _maybe_purge(self):
+        if self.ttl is None:
+            return
+        with self._lock:
+            if time.monotonic() - self._last_purge < PURGE_INTERVAL:
+                return
+            self._last_purge = time.monotonic()
+        self.purge()
+
+    def purge(self) -> int:
+        """Delete expired files and stale partial writes, returning how many were removed"""
+        if self.ttl is None:
+            return 0
+        removed = 0
+        cutoff = time.time() - self.ttl
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith((AUDIO_SUFFIX, '.tmp')):
+                    continue
+                try:
+                    if os.stat(os.path.join(root, name)).st_mtime < cutoff:
+                        os.unlink(os.path.join(root, name))
+                        removed += 1
+                except OSError:
+                    continue
+                with self._lock:
+                    self._forget(name[:-len(AUDIO_SUFFIX)])
+        if removed:
+            logger.info(f"Purged {removed} expired audio files")
+        return removed
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index())
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._index()
+            return {
+                'size': len(entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Batch Search Benchmark - batch_search vs one intelligent_search call per query
+Run from the repository root: python benchmarks/bench_batch_search.py --queries 2000
+
+The workload mimics shopper traffic rather than a list of distinct fuzzy queries: corpus
+queries repeat, and the rest are product-name fragments, brand + price/sale phrases, typos and
+"quiero ..." requests, so the structured, exact and fuzzy strategies all take part.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from product_database import ProductDatabase
+from bench_suite import load_queries
+
+MODIFIERS = ['barato', 'en oferta', 'menos de 500', 'entre 200 y 800', 'para regalo', 'buenos', 'para niños']
+
+
+def shopper_workload(db: ProductDatabase, size: int, seed: int) -> List[str]:
+    """Reproducible mix of shopper-like queries over the loaded catalog"""
+    rng = random.Random(seed)
+    corpus = load_queries()
+    names = db.search_index['product_names']
+    brands = sorted(set(db.search_index['brands']))
+
+    queries = []
+    while len(queries) < size:
+        kind = rng.random()
+        if kind < 0.35:
+            query = rng.choice(corpus)
+        elif kind < 0.6:
+            words = rng.choice(names).split()
+            count = rng.randint(1, min(3, len(words)))
+            start = rng.randint(0, len(words) - count)
+            query = ' '.join(words[start:start + count])
+        elif kind < 0.75:
+            query = f"{rng.choice(brands)} {rng.choice(MODIFIERS)}"
+        elif kind < 0.9:
+            # One dropped character
+            query = rng.choice(corpus + names[:200]).lower()
+            if len(query) > 4:
+                cut = rng.randrange(len(query))
+                query = query[:cut] + query[cut + 1:]
+        else:
+            query = f"quiero {rng.choice(names).split()[0]} {rng.choice(MODIFIERS)}"
+        queries.append(query)
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--csv', default='data/product_data.csv')
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--max-results', type=int, default=8)
+    args = parser.parse_args()
+
+    db = ProductDatabase(args.csv)
+    queries = shopper_workload(db, args.queries, args.seed)
+    print(f"Queries: {len(queries)} ({len(set(queries))} distinct)")
+
+    # Both runs start from an empty search cache
+    db.search_cache.clear()
+    start = time.perf_counter()
+    single = [db.intelligent_search(query, args.max_results) for query in queries]
+    loop_time = time.perf_counter() - start
+
+    db.search_cache.clear()
+    start = time.perf_counter()
+    batched = db.batch_search(queries, args.max_results)
+    batch_time = time.perf_counter() - start
+
+    print(f"Per-query loop: {loop_time:.2f}s")
+    print(f"batch_search:   {batch_time:.2f}s")
+    print(f"Speedup:        {loop_time / batch_time:.2f}x")
+    print(f"Identical results: {[r[0] for r in single] == [r[0] for r in batched]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+OpenAI Client Benchmark - Per-request client construction vs the shared pooled client
+Counts TCP connections seen by the local mock server to show connection reuse:
+
+    python benchmarks/bench_openai_client.py --requests 50
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_openai_server import MockOpenAIServer
+
+MESSAGES = [{"role": "user", "content": "Busco una tablet Samsung"}]
+
+
+def run(label: str, server: MockOpenAIServer, make_client, requests: int):
+    server.connections.clear()
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        client = make_client()
+        client.chat.completions.create(model="gpt-4o-mini", messages=MESSAGES, max_tokens=150)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<22} p50 {statistics.median(latencies) * 1000:6.2f} ms   "
+          f"p95 {p95 * 1000:6.2f} ms   connections: {len(server.connections)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--port', type=int, default=8001)
+    args = parser.parse_args()
+
+    # No artificial latency: measure client and connection overhead only
+    server = MockOpenAIServer(port=args.port, first_token_delay=0, token_delay=0).start_background()
+    os.environ['OPENAI_BASE_URL'] = server.base_url
+    os.environ.setdefault('OPENAI_API_KEY', 'mock')
+
+    from openai import OpenAI
+    from openai_clients import get_openai_client
+
+    run("Client per request", server, lambda: OpenAI(api_key=os.environ['OPENAI_API_KEY']), args.requests)
+    run("Shared pooled client", server, get_openai_client, args.requests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Ranked Text Search Benchmark - Batched scorer vs the legacy per-row fuzz loop
+Run from the repository root: python benchmarks/bench_ranked_text_search.py --scale 10
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fuzzywuzzy import fuzz
+
+from product_database import ProductDatabase
+from search_index import InvertedIndex, RankedTextScorer
+
+QUERIES = [
+    "telefono barato",
+    "zapatillas para correr",
+    "audifonos inalambricos",
+    "algo para la cocina",
+    "regalo para niños",
+    "reloj inteligente",
+    "bolso de cuero",
+    "camara profesional",
+]
+
+
+def legacy_ranked_search(full_text: List[str], query: str, max_results: int) -> List[int]:
+    """The original O(rows x words) implementation, kept as the reference"""
+    query_words = query.split()
+    scores = []
+
+    for idx, text in enumerate(full_text):
+        score = 0
+        for word in query_words:
+            if word in text:
+                score += len(word)
+            score += fuzz.partial_ratio(word, text) / 100
+        scores.append((idx, score))
+
+    scores.sort(key=lambda x: x[1], reverse=True)
+    return [idx for idx, score in scores[:max_results] if score > 0.5]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--csv', default='data/product_data.csv')
+    parser.add_argument('--scale', type=int, default=1, help='Replicate the catalog N times')
+    parser.add_argument('--max-results', type=int, default=8)
+    parser.add_argument('--skip-legacy', action='store_true', help='Only time the batched scorer')
+    args = parser.parse_args()
+
+    db = ProductDatabase(args.csv)
+    fields = {name: values * args.scale for name, values in db.search_index_fields().items()}
+    full_text = db.search_index['full_text'] * args.scale
+
+    start = time.perf_counter()
+    scorer = RankedTextScorer(full_text, InvertedIndex(fields))
+    print(f"Rows: {len(full_text)}  index build: {time.perf_counter() - start:.2f}s")
+
+    batched_time = 0.0
+    legacy_time = 0.0
+    same_order = 0
+    overlap = 0.0
+
+    for query in QUERIES:
+        start = time.perf_counter()
+        batched = scorer.search(query.split(), args.max_results)
+        batched_time += time.perf_counter() - start
+
+        if args.skip_legacy:
+            continue
+
+        start = time.perf_counter()
+        legacy = legacy_ranked_search(full_text, query, args.max_results)
+        legacy_time += time.perf_counter() - start
+
+        # Compare by text: replicated rows are interchangeable
+        batched_text = [full_text[i] for i in batched]
+        legacy_text = [full_text[i] for i in legacy]
+        same_order += batched_text == legacy_text
+        overlap += len(set(batched_text) & set(legacy_text)) / max(len(set(legacy_text)), 1)
+
+    queries = len(QUERIES)
+    print(f"Batched scorer: {batched_time / queries * 1000:.1f} ms/query")
+    if not args.skip_legacy:
+        print(f"Legacy loop:    {legacy_time / queries * 1000:.1f} ms/query")
+        print(f"Speedup:        {legacy_time / batched_time:.1f}x")
+        print(f"Identical ordering: {same_order}/{queries} queries")
+        print(f"Top-k overlap:      {overlap / queries:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite - Search and endpoint latency on synthetic catalogs, stored per commit
+Replays the Spanish query corpus (queries_es.txt) through the ProductDatabase search APIs on
+synthetic catalogs of several sizes, then load-tests /api/chat and /api/products against the
+mock OpenAI server. Each catalog size and the load test run in a fresh process so peak memory
+is reported per scenario. Results are written to benchmarks/results/<time>_<commit>.json:
+
+    python benchmarks/bench_suite.py --sizes 1k,10k,100k
+    python benchmarks/bench_suite.py --sizes 1M --op-budget 60 --skip-load
+    python benchmarks/bench_suite.py --compare benchmarks/results/<base>.json [<new>.json]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import threading
+import subprocess
+import multiprocessing
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+QUERIES_FILE = os.path.join(BENCH_DIR, 'queries_es.txt')
+
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_catalog import catalog_path, parse_size
+
+CATEGORY_QUERIES = ['electrónica', 'ropa', 'zapatos', 'cocina', 'hogar', 'juguetes', 'deportes', 'aire libre']
+PRICE_RANGES = [(None, 100), (100, 500), (500, None), (200, 300), (1000, 2000), (None, None)]
+FEATURED_SIZES = [5, 10, 20]
+
+
+def load_queries(path: str = QUERIES_FILE) -> List[str]:
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def percentiles(samples: List[float]) -> Dict:
+    """p50/p95/p99/mean in milliseconds"""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {
+        'count': len(ordered),
+        'p50_ms': pick(0.50),
+        'p95_ms': pick(0.95),
+        'p99_ms': pick(0.99),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3),
+    }
+
+
+def peak_memory_mb() -> Optional[float]:
+    """Peak resident memory of this process (None where `resource` is unavailable)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def time_calls(func: Callable, calls: List, repeat: int, budget: float) -> Dict:
+    """Run func over every argument `repeat` times (stopping after `budget` seconds)"""
+    samples = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for args in calls:
+            start = time.perf_counter()
+            func(*args)
+            samples.append(time.perf_counter() - start)
+            if time.perf_counter() - started > budget:
+                break
+        else:
+            continue
+        break
+
+    elapsed = time.perf_counter() - started
+    result = percentiles(samples)
+    result['throughput_ops'] = round(len(samples) / elapsed, 2) if elapsed else 0.0
+    result['truncated'] = len(samples) < repeat * len(calls)
+    return result
+
+
+def bench_search(rows: int, queries: List[str], repeat: int, budget: float) -> Dict:
+    """Search API latencies on one synthetic catalog (runs in its own process)"""
+    os.environ.setdefault('SEMANTIC_SEARCH', '0')
+    from product_database import ProductDatabase
+
+    csv_file = catalog_path(rows)
+    start = time.perf_counter()
+    # No result cache and no snapshot: every call measures the real search path
+    db = ProductDatabase(csv_file, cache_size=0, use_snapshot=False)
+    load_seconds = time.perf_counter() - start
+
+    operations = {
+        'intelligent_search': (lambda q: db.intelligent_search(q, 8), [(q,) for q in queries]),
+        'get_products_by_category': (lambda c: db.get_products_by_category(c, 10), [(c,) for c in CATEGORY_QUERIES]),
+        'get_products_by_price_range': (
+            lambda lo, hi: db.get_products_by_price_range(lo, hi, 10), PRICE_RANGES),
+        'get_featured_products': (lambda n: db.get_featured_products(n), [(n,) for n in FEATURED_SIZES]),
+    }
+
+    results = {}
+    for name, (func, calls) in operations.items():
+        results[name] = time_calls(func, calls, repeat, budget)
+        print(f"  {rows:>9,} rows  {name:<28} p50 {results[name].get('p50_ms', 0):>9.2f} ms  "
+              f"p95 {results[name].get('p95_ms', 0):>9.2f} ms", flush=True)
+
+    return {
+        'rows': rows,
+        'load_seconds': round(load_seconds, 3),
+        'peak_memory_mb': peak_memory_mb(),
+        'operations': results,
+    }
+
+
+def bench_load(rows: int, queries: List[str], concurrency: int, duration: float,
+               chat_ratio: float, llm_delay: float, port: int) -> Dict:
+    """Concurrent /api/chat and /api/products traffic against the mock OpenAI server"""
+    import logging
+    import httpx
+    from werkzeug.serving import make_server
+    from mock_openai_server import MockOpenAIServer
+
+    mock = MockOpenAIServer(port=port + 1, first_token_delay=llm_delay, token_delay=0).start_background()
+    os.environ['OPENAI_BASE_URL'] = mock.base_url
+    os.environ.setdefault('OPENAI_API_KEY', 'mock')
+    os.environ.setdefault('SEMANTIC_SEARCH', '0')
+
+    import voice_sales_app_optimized as voice_app
+    from product_database import ProductDatabase, set_product_database
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    set_product_database(ProductDatabase(catalog_path(rows), use_snapshot=False))
+
+    server = make_server('127.0.0.1', port, voice_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{port}"
+
+    samples = {'chat': [], 'products': []}
+    errors = {'chat': 0, 'products': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        # One client per simulated user so the session cookie is kept
+        with httpx.Client(base_url=base_url, timeout=60) as client:
+            while time.perf_counter() < deadline:
+                query = rng.choice(queries)
+                endpoint = 'chat' if rng.random() < chat_ratio else 'products'
+                start = time.perf_counter()
+                try:
+                    if endpoint == 'chat':
+                        response = client.post('/api/chat', json={'message': query})
+                    else:
+                        response = client.get('/api/products', params={'search': query, 'max_results': 8})
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                elapsed = time.perf_counter() - start
+                with lock:
+                    if ok:
+                        samples[endpoint].append(elapsed)
+                    else:
+                        errors[endpoint] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    endpoints = {}
+    for endpoint in samples:
+        endpoints[endpoint] = percentiles(samples[endpoint])
+        endpoints[endpoint]['throughput_rps'] = round(len(samples[endpoint]) / elapsed, 2)
+        endpoints[endpoint]['errors'] = errors[endpoint]
+        print(f"  load {endpoint:<9} p50 {endpoints[endpoint].get('p50_ms', 0):>9.2f} ms  "
+              f"p95 {endpoints[endpoint].get('p95_ms', 0):>9.2f} ms  "
+              f"{endpoints[endpoint]['throughput_rps']:>7.1f} req/s  {errors[endpoint]} errors", flush=True)
+
+    return {
+        'rows': rows,
+        'concurrency': concurrency,
+        'duration_seconds': round(elapsed, 2),
+        'llm_delay': llm_delay,
+        'peak_memory_mb': peak_memory_mb(),
+        'endpoints': endpoints,
+    }
+
+
+def run_isolated(func: Callable, *args):
+    """Run one scenario in a fresh interpreter so its peak memory is its own"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(func, *args).result()
+
+
+def git_revision() -> Dict:
+    def git(*args) -> str:
+        try:
+            return subprocess.run(['git', *args], cwd=REPO_DIR, capture_output=True, text=True).stdout.strip()
+        except OSError:
+            return ''
+    return {'commit': git('rev-parse', '--short', 'HEAD') or 'unknown',
+            'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+
+
+def save_results(results: Dict) -> str:
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    path = os.path.join(RESULTS_DIR, f"{stamp}_{results['git']['commit']}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def flatten(results: Dict) -> Dict[str, Dict]:
+    """Comparable series keyed 'search/<rows>/<operation>' and 'load/<endpoint>'"""
+    series = {}
+    for entry in results.get('search', []):
+        for name, stats in entry['operations'].items():
+            series[f"search/{entry['rows']}/{name}"] = stats
+        series[f"search/{entry['rows']}/load"] = {'p50_ms': entry['load_seconds'] * 1000}
+    load = results.get('load')
+    if load:
+        for endpoint, stats in load['endpoints'].items():
+            series[f"load/{endpoint}"] = stats
+    return series
+
+
+def compare(base_path: str, new_path: Optional[str], threshold: float) -> int:
+    """Print p50/p95 deltas between two result files; returns the number of regressions"""
+    if new_path is None:
+        candidates = sorted(f for f in os.listdir(RESULTS_DIR) if f.endswith('.json'))
+        new_path = os.path.join(RESULTS_DIR, candidates[-1])
+
+    with open(base_path, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)
+
+    print(f"base {base['git']['commit']} ({base['timestamp']})  vs  new {new['git']['commit']} ({new['timestamp']})")
+    base_series, new_series = flatten(base), flatten(new)
+    regressions = 0
+    for key in sorted(set(base_series) & set(new_series)):
+        for metric in ('p50_ms', 'p95_ms'):
+            old, cur = base_series[key].get(metric), new_series[key].get(metric)
+            if not old or cur is None:
+                continue
+            delta = (cur - old) / old * 100
+            flag = ''
+            if delta > threshold:
+                flag = '  REGRESSION'
+                regressions += 1
+            print(f"  {key:<45} {metric:<7} {old:>10.2f} -> {cur:>10.2f} ms  {delta:>+7.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search and endpoint benchmark suite")
+    parser.add_argument('--sizes', default='1k,10k,100k', help='Catalog sizes, e.g. 1k,10k,100k,1M')
+    parser.add_argument('--repeat', type=int, default=3, help='Passes over each call list')
+    parser.add_argument('--op-budget', type=float, default=30.0, help='Max seconds per operation and size')
+    parser.add_argument('--skip-load', action='store_true')
+    parser.add_argument('--load-size', default='1k', help='Catalog size served during the load test')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--chat-ratio', type=float, default=0.5, help='Share of /api/chat requests')
+    parser.add_argument('--llm-delay', type=float, default=0.05, help='Mock LLM latency in seconds')
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--no-save', action='store_true')
+    parser.add_argument('--compare', nargs='+', metavar='RESULT', help='Compare BASE [NEW] result files')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Regression threshold in percent')
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare(args.compare[0], args.compare[1] if len(args.compare) > 1 else None, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    queries = load_queries()
+    results = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'settings': vars(args),
+        'search': [],
+    }
+
+    for size in args.sizes.split(','):
+        rows = parse_size(size)
+        print(f"Search benchmark: {rows:,} rows", flush=True)
+        results['search'].append(run_isolated(bench_search, rows, queries, args.repeat, args.op_budget))
+
+    if not args.skip_load:
+        rows = parse_size(args.load_size)
+        print(f"Load test: {rows:,} rows, {args.concurrency} clients, {args.duration:.0f}s", flush=True)
+        results['load'] = run_isolated(bench_load, rows, queries, args.concurrency, args.duration,
+                                       args.chat_ratio, args.llm_delay, args.port)
+
+    if not args.no_save:
+        print(f"Results saved to {save_results(results)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Voice Streaming Benchmark - Time to first audio, buffered vs streamed voice endpoint
+Runs the Flask app in-process against the local mock OpenAI server:
+
+    python benchmarks/bench_voice_stream.py --runs 5
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_openai_server import MockOpenAIServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--port', type=int, default=8001)
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(port=args.port).start_background()
+    os.environ['OPENAI_BASE_URL'] = server.base_url
+    os.environ.setdefault('OPENAI_API_KEY', 'mock')
+
+    import voice_sales_app_optimized as voice_app
+    client = voice_app.app.test_client()
+
+    def upload():
+        return {'session_id': 'bench', 'voice': 'alloy', 'audio': (io.BytesIO(b'mock-audio'), 'recording.webm')}
+
+    buffered, streamed = [], []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        response = client.post('/api/voice/chat', data=upload())
+        assert response.status_code == 200, response.data
+        buffered.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        response = client.post('/api/voice/chat/stream', data=upload(), buffered=False)
+        first_audio = None
+        for chunk in response.response:
+            for line in chunk.decode('utf-8').splitlines():
+                if first_audio is None and json.loads(line)['type'] == 'audio':
+                    first_audio = time.perf_counter() - start
+        streamed.append(first_audio)
+
+    print(f"Buffered /api/voice/chat        first audio: {statistics.median(buffered) * 1000:.0f} ms (median)")
+    print(f"Streamed /api/voice/chat/stream first audio: {statistics.median(streamed) * 1000:.0f} ms (median)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Search Quality Check - Regression checks on what real shopper queries return
+Run from the repository root: python benchmarks/check_search_quality.py
+Exits with status 1 when a query stops returning the products it should.
+"""
+
+import argparse
+import os
+import re
+import sys
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from product_database import ProductDatabase
+from bench_ranked_text_search import legacy_ranked_search
+
+Products = List[Dict]
+Check = Callable[[Products, ProductDatabase], bool]
+
+
+def has_word(product: Dict, word: str) -> bool:
+    return re.search(rf'\b{word}\b', product['name'].lower()) is not None
+
+
+def words_first(word: str) -> Check:
+    """Products naming the word lead the results, before any that doesn't"""
+    def check(products: Products, db: ProductDatabase) -> bool:
+        flags = [has_word(p, word) for p in products]
+        return bool(flags) and flags[0] and flags == sorted(flags, reverse=True)
+    return check
+
+
+def includes(*names: str) -> Check:
+    return lambda products, db: set(names) <= {p['name'] for p in products}
+
+
+def at_least(count: int, **fields) -> Check:
+    """At least `count` results, all with the given field values"""
+    return lambda products, db: len(products) >= count and all(
+        p[field] == value for p in products for field, value in fields.items())
+
+
+def cheapest_of(query: str) -> Check:
+    """The results of `query` alone, cheapest first (not the cheapest products of the catalog)"""
+    def check(products: Products, db: ProductDatabase) -> bool:
+        matches, _ = db.intelligent_search(query, len(products))
+        return bool(products) and products == sorted(matches, key=lambda p: p['price'])
+    return check
+
+
+def within(low: float = 0, high: float = float('inf'), on_sale: bool = False) -> Check:
+    """Every result within the price bounds (and on sale); no results is fine"""
+    return lambda products, db: all(
+        low <= p['price'] <= high and (p['on_sale'] or not on_sale) for p in products)
+
+
+def same_as(query: str) -> Check:
+    """The same results as a plainer phrasing of the request"""
+    return lambda products, db: bool(products) and products == db.intelligent_search(query, len(products))[0]
+
+
+# (query, description, check) for queries that regressed at some point
+CHECKS: List[Tuple[str, str, Check]] = [
+    ("nike air", "Air products first, not products in 'Deportes y Aire Libre'", words_first('air')),
+    ("nike air", "every exact 'nike air' match", includes(
+        "Zapatillas Nike Air Max Excee", "Nike Air Max 270", "Nike Zapatillas Air Force 1 para Hombres")),
+    ("telefono barato", "the 'telefono' results, cheapest first", cheapest_of("telefono")),
+    ("laptop barata", "the 'laptop' results, cheapest first", cheapest_of("laptop")),
+    ("tablet samsung", "the Galaxy tablets", includes("Samsung Galaxy Tab S6", "Samsung Galaxy Tab A7 Lite")),
+    ("juguetes para niños", "a full page of toys", at_least(6, category="Juguetes y Juegos")),
+    ("ropa deportiva", "a full page of results", at_least(6)),
+    ("juegos de mesa hasbro", "a full page of Hasbro games", at_least(6, brand="Hasbro")),
+    ("apple menos de 100", "nothing above $100", within(high=100)),
+    ("laptop entre 300 y 800", "nothing outside $300-$800", within(300, 800)),
+    ("bolso prada en oferta menos de 50", "nothing above $50 or off sale", within(high=50, on_sale=True)),
+    ("camiseta hasta 2 años", "t-shirts, not a $2 price cap", words_first('camiseta')),
+    ("juguetes de 3 a 5 años", "a full page of toys", at_least(6, category="Juguetes y Juegos")),
+    ("busco una tablet samsung", "the Galaxy tablets", includes("Samsung Galaxy Tab S6", "Samsung Galaxy Tab A7 Lite")),
+    ("quiero un iphone barato", "the same iPhones as 'iphone barato'", same_as("iphone barato")),
+    ("¿quiero un iphone?", "the same iPhones as 'iphone'", same_as("iphone")),
+]
+
+# (query, expected intent fields) for price and cheap expressions
+INTENT_CHECKS: List[Tuple[str, Dict]] = [
+    ("juguetes de 3 a 5 años", {'min_price': None, 'max_price': None}),
+    ("celulares de $200 a $500", {'min_price': 200, 'max_price': 500}),
+    ("zapatillas de 300 a 800 dolares", {'min_price': 300, 'max_price': 800}),
+    ("tenis entre 200 y 500", {'min_price': 200, 'max_price': 500}),
+    ("telefono barato", {'sort': 'asc', 'has_filters': False}),
+    ("nike barato", {'sort': 'asc', 'has_filters': True}),
+    ("camiseta hasta 2 años", {'max_price': None}),
+    ("memoria usb menos de 64 gb", {'max_price': None}),
+    ("zapatillas hasta 500", {'max_price': 500}),
+    ("quiero un iphone barato", {'text': 'iphone', 'sort': 'asc'}),
+    ("¿tienes un iphone?", {'text': 'iphone'}),
+]
+
+# Queries whose ranked text results must keep the order of the original fuzzywuzzy loop
+RANKED_TEXT_QUERIES = ["telefono barato", "regalo para niños", "bolso de cuero", "zapatilas nike"]
+
+# Queries whose batched fuzzy name matches must equal the single-query process.extract ones
+NAME_MATCH_QUERIES = ["zapatilas nike", "ipone 13", "audifonos sony", "quiero un iphone", "telefono"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--csv', default='data/product_data.csv')
+    parser.add_argument('--max-results', type=int, default=8)
+    args = parser.parse_args()
+
+    db = ProductDatabase(args.csv)
+    queries = list(dict.fromkeys(query for query, _, _ in CHECKS))
+    # The batch path must answer exactly like the single-query path
+    batched = dict(zip(queries, db.batch_search(queries, args.max_results)))
+    db.search_cache.clear()
+
+    failures = 0
+    for query, description, check in CHECKS:
+        products, search_description = db.intelligent_search(query, args.max_results)
+        ok = check(products, db) and products == batched[query][0]
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {query!r}: {description}")
+        if not ok:
+            print(f"     {search_description}")
+            for p in products:
+                print(f"     - {p['name']} | {p['brand']} | {p['category']} | ${p['price']:.2f}")
+
+    for query, expected in INTENT_CHECKS:
+        intent = db.intent_parser.parse(query)
+        found = {**intent.to_dict(), 'has_filters': intent.has_filters, 'text': intent.text}
+        ok = all(found[field] == value for field, value in expected.items())
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {query!r}: {expected}")
+        if not ok:
+            print(f"     {found}")
+
+    for query in RANKED_TEXT_QUERIES:
+        rows = db.text_scorer.search(query.split(), args.max_results)
+        expected = legacy_ranked_search(db.search_index['full_text'], query, args.max_results)
+        ok = rows == expected
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {query!r}: ranked text order of the original fuzzywuzzy loop")
+        if not ok:
+            print(f"     {rows} != {expected}")
+
+    batched_names = db._fuzzy_name_matches(NAME_MATCH_QUERIES, args.max_results)
+    for query, matches in zip(NAME_MATCH_QUERIES, batched_names):
+        ok = matches == db._fuzzy_name_match(query, args.max_results)
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {query!r}: batched name matches equal process.extract")
+
+    checks = len(CHECKS) + len(INTENT_CHECKS) + len(RANKED_TEXT_QUERIES) + len(NAME_MATCH_QUERIES)
+    print(f"{checks - failures}/{checks} checks passed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Mock OpenAI Server - Local stand-in for the STT, chat and TTS endpoints
+Serves /v1/audio/transcriptions, /v1/chat/completions (plain and streamed) and
+/v1/audio/speech with configurable latencies, so the app can be exercised offline:
+
+    python benchmarks/mock_openai_server.py --port 8001 --token-delay 0.03
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=test python voice_sales_app_optimized.py
+"""
+
+import json
+import time
+import socket
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = (
+    "Te recomiendo el Samsung Galaxy Tab S6 a $1989. "
+    "También tengo el iPhone 13 a $7833 en oferta. "
+    "¿Cuál prefieres?"
+)
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """Request handler; latencies are read from the server instance"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length', 0))
+        return self.rfile.read(length) if length else b''
+
+    def _send_json(self, payload: dict):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self._read_body()
+        self.server.connections.add(self.client_address)
+        self.server.requests += 1
+
+        if self.path.endswith('/audio/transcriptions'):
+            time.sleep(self.server.stt_delay)
+            self._send_json({'text': self.server.transcript})
+
+        elif self.path.endswith('/chat/completions'):
+            request = json.loads(body or b'{}')
+            if request.get('stream'):
+                self._stream_completion(request)
+            else:
+                time.sleep(self.server.first_token_delay + self.server.token_delay * len(self.server.reply.split()))
+                self._send_json({
+                    'id': 'chatcmpl-mock',
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': request.get('model', 'mock'),
+                    'choices': [{
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': self.server.reply},
+                        'finish_reason': 'stop',
+                    }],
+                })
+
+        elif self.path.endswith('/audio/speech'):
+            request = json.loads(body or b'{}')
+            time.sleep(self.server.tts_delay)
+            # Not a real MP3, just a payload proportional to the text length
+            audio = b'ID3' + request.get('input', '').encode('utf-8') * 40
+            self.send_response(200)
+            self.send_header('Content-Type', 'audio/mpeg')
+            self.send_header('Content-Length', str(len(audio)))
+            self.end_headers()
+            self.wfile.write(audio)
+
+        else:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    def _stream_completion(self, request: dict):
+        """Send the reply word by word as server-sent chat.completion.chunk events"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        def send_chunk(data: str):
+            payload = f"data: {data}\n\n".encode('utf-8')
+            self.wfile.write(f"{len(payload):X}\r\n".encode() + payload + b"\r\n")
+            self.wfile.flush()
+
+        time.sleep(self.server.first_token_delay)
+        words = self.server.reply.split(' ')
+        for i, word in enumerate(words):
+            delta = word if i == 0 else ' ' + word
+            send_chunk(json.dumps({
+                'id': 'chatcmpl-mock',
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': request.get('model', 'mock'),
+                'choices': [{'index': 0, 'delta': {'content': delta}, 'finish_reason': None}],
+            }))
+            time.sleep(self.server.token_delay)
+
+        send_chunk('[DONE]')
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    """Threaded mock server that counts requests and distinct client connections"""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 8001, stt_delay: float = 0.3, first_token_delay: float = 0.3,
+                 token_delay: float = 0.03, tts_delay: float = 0.4, reply: str = DEFAULT_REPLY,
+                 transcript: str = "Busco una tablet Samsung"):
+        super().__init__(('127.0.0.1', port), MockOpenAIHandler)
+        self.stt_delay = stt_delay
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.tts_delay = tts_delay
+        self.reply = reply
+        self.transcript = transcript
+        self.requests = 0
+        self.connections = set()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def start_background(self) -> 'MockOpenAIServer':
+        """Serve from a daemon thread (for benchmarks and scripted tests)"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local mock of the OpenAI API")
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--stt-delay', type=float, default=0.3)
+    parser.add_argument('--first-token-delay', type=float, default=0.3)
+    parser.add_argument('--token-delay', type=float, default=0.03)
+    parser.add_argument('--tts-delay', type=float, default=0.4)
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(args.port, args.stt_delay, args.first_token_delay, args.token_delay, args.tts_delay)
+    print(f"Mock OpenAI API listening on {server.base_url}")
+    server.serve_forever()
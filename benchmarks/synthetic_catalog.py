@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Synthetic Catalog - Deterministic catalogs shaped like data/product_data.csv at any size
+Rows are derived from the real catalog: names get model/variant suffixes, a share of the rows
+move to generated brands (so brand cardinality grows with the catalog) and prices, stock and
+discounts are resampled. Generated files are cached under benchmarks/.cache/:
+
+    python benchmarks/synthetic_catalog.py --rows 100000
+"""
+
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BENCH_DIR, '.cache')
+SOURCE_CSV = os.path.join(os.path.dirname(BENCH_DIR), 'data', 'product_data.csv')
+
+VARIANTS = ['Pro', 'Plus', 'Max', 'Mini', 'Lite', 'XL', 'Edición Especial', 'Clásico', 'Sport', 'Premium']
+SYLLABLES = ['ka', 'lo', 'mi', 'ra', 'ten', 'vo', 'sa', 'del', 'mar', 'tri', 'no', 'ze', 'ban', 'qui', 'ro']
+
+# Share of rows moved to generated brands
+GENERATED_BRAND_SHARE = 0.3
+
+
+def parse_size(value: str) -> int:
+    """'10k' -> 10000, '1M' -> 1000000"""
+    value = value.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(value[-1], 1)
+    return int(float(value.rstrip('km')) * multiplier)
+
+
+def _brand_names(count: int, rng: np.random.Generator) -> list:
+    names = set()
+    while len(names) < count:
+        parts = rng.choice(SYLLABLES, size=rng.integers(2, 4))
+        names.add(''.join(parts).capitalize())
+    return sorted(names)
+
+
+def generate_catalog(rows: int, seed: int = 42, source_csv: str = SOURCE_CSV) -> pd.DataFrame:
+    """Catalog of `rows` products with the same columns and value shapes as the source CSV"""
+    rng = np.random.default_rng(seed)
+    source = pd.read_csv(source_csv)
+
+    picks = rng.integers(0, len(source), size=rows)
+    df = source.iloc[picks].reset_index(drop=True)
+
+    # Names: base product plus a variant and model number, unique enough at 1M rows
+    variants = rng.choice(VARIANTS, size=rows)
+    models = rng.integers(1, 10_000, size=rows)
+    names = [f"{name} {variant} {model}" for name, variant, model in zip(df['nombre_de_producto'], variants, models)]
+
+    # Brands: keep the real brand for most rows, spread the rest over ~sqrt(rows) generated brands
+    brands = df['marca'].to_numpy(dtype=object)
+    generated = rng.random(rows) < GENERATED_BRAND_SHARE
+    if generated.any():
+        pool = np.array(_brand_names(max(1, int(np.sqrt(rows))), rng), dtype=object)
+        new_brands = rng.choice(pool, size=int(generated.sum()))
+        for row, brand in zip(np.flatnonzero(generated), new_brands):
+            names[row] = names[row].replace(brands[row], brand) if brands[row] in names[row] else f"{names[row]} de {brand}"
+            brands[row] = brand
+
+    prices = np.round(df['precio'].to_numpy() * rng.lognormal(0, 0.35, size=rows), 2)
+    on_sale = rng.random(rows) < source['en_descuento'].mean()
+
+    df['nombre_de_producto'] = names
+    df['marca'] = brands
+    df['precio'] = prices
+    df['unidades_disponibles'] = rng.integers(0, 1000, size=rows)
+    df['en_descuento'] = on_sale
+    df['precio_de_descuento'] = np.where(on_sale, np.round(prices * rng.uniform(0.4, 0.9, size=rows), 2), prices)
+    return df
+
+
+def catalog_path(rows: int, seed: int = 42) -> str:
+    """Path of the cached synthetic catalog, generating it on first use"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f"catalog_{rows}_{seed}.csv")
+    if not os.path.exists(path):
+        generate_catalog(rows, seed).to_csv(path, index=False)
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a synthetic product catalog")
+    parser.add_argument('--rows', default='10k', help='Number of products (accepts 10k, 1M)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(catalog_path(parse_size(args.rows), args.seed))
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Cache Module - Thread-safe LRU cache with optional TTL and hit/miss statistics
+Shared by the search layer and the TTS audio cache; safe under Flask's threaded server
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache with optional per-entry time-to-live
+    With max_bytes set, entries are also evicted once their total size (size_of) exceeds it
+    """
+
+    def __init__(self, max_size: int = 512, ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None, size_of: Callable[[Any], int] = len):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self.bytes = 0
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value (refreshing its recency) or `default`"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at, size = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entries when full"""
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        size = self.size_of(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[2]
+            self._data[key] = (value, expires_at, size)
+            self.bytes += size
+            while len(self._data) > self.max_size or (self.max_bytes is not None and self.bytes > self.max_bytes):
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def delete(self, key: Hashable):
+        """Remove one entry if present"""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry[2]
+
+    def clear(self):
+        """Drop every entry (statistics are kept)"""
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters used to tune the cache size and TTL"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
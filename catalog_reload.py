@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Catalog Reload Module - Hot reload of the product CSV without restarting the app
+Watches the file (or reacts to an admin trigger), builds the new database in the
+background and swaps it in atomically; in-flight requests keep the old snapshot.
+A change is only picked up once the file has stopped changing for one poll, so a
+CSV still being written is not parsed half-way.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+from product_database import ProductDatabase, get_product_database, set_product_database
+
+logger = logging.getLogger(__name__)
+
+CATALOG_WATCH_INTERVAL = float(os.getenv('CATALOG_WATCH_INTERVAL', '5'))
+
+
+class CatalogReloader:
+    """Polls the catalog CSV and replaces the global ProductDatabase when it changes"""
+
+    def __init__(self, csv_file: Optional[str] = None, interval: float = CATALOG_WATCH_INTERVAL):
+        self.csv_file = csv_file or get_product_database().csv_file
+        self.interval = interval
+        self._signature = self._file_signature()
+        # Changed signature seen on the last poll, reloaded if the next poll sees it again
+        self._pending = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _file_signature(self):
+        """Size and modification time used to detect changes"""
+        try:
+            stat = os.stat(self.csv_file)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def start(self):
+        """Start watching the CSV in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name='catalog-reloader', daemon=True)
+        self._thread.start()
+        logger.info(f"Watching {self.csv_file} for changes every {self.interval:.0f}s")
+
+    def stop(self):
+        """Stop the watcher thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            signature = self._file_signature()
+            if signature is None or signature == self._signature:
+                self._pending = None
+                continue
+            # The writer may not be done yet: wait for two polls in a row with the same size and mtime
+            if signature != self._pending:
+                self._pending = signature
+                continue
+            self._pending = None
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Catalog reload failed, keeping current catalog: {e}")
+
+    def reload(self) -> Dict:
+        """
+        Rebuild the catalog from the CSV and swap it in.
+
+        When only price/stock columns changed, the current indexes are reused and
+        only the affected rows are updated; otherwise everything is rebuilt.
+        """
+        with self._reload_lock:
+            start = time.time()
+            signature = self._file_signature()
+            current = get_product_database()
+            df = ProductDatabase._read_csv(self.csv_file)
+
+            rows = current.changed_rows(df)
+            if rows is not None:
+                updated = current.with_updated_rows(df, rows)
+                mode = 'incremental'
+            else:
+                updated = ProductDatabase(self.csv_file, use_snapshot=False, df=df)
+                mode = 'full'
+
+            set_product_database(updated)
+            self._signature = signature
+
+            summary = {
+                'mode': mode,
+                'products': len(updated.df),
+                'changed_rows': len(rows) if rows is not None else len(updated.df),
+                'seconds': round(time.time() - start, 3),
+            }
+            logger.info(f"Catalog reloaded: {summary}")
+            return summary
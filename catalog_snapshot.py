@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Catalog Snapshot Module - Binary, memory-mapped catalog for fast startup
+Stores the parsed catalog columns and the prebuilt inverted index as .npy files:
+
+    python catalog_snapshot.py --csv data/product_data.csv
+"""
+
+import os
+import json
+import shutil
+import logging
+import argparse
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# Set CATALOG_SNAPSHOT=0 to always parse the CSV
+SNAPSHOT_ENABLED = os.getenv('CATALOG_SNAPSHOT', '1') != '0'
+
+
+def snapshot_dir(csv_file: str) -> str:
+    """Snapshot directory stored alongside the CSV"""
+    base, _ = os.path.splitext(csv_file)
+    return f"{base}.snapshot"
+
+
+def source_signature(csv_file: str) -> Optional[Dict]:
+    """Size and modification time of the source CSV"""
+    if not os.path.exists(csv_file):
+        return None
+    stat = os.stat(csv_file)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _save_strings(path: str, values: pd.Series):
+    """Dictionary-encode a text column: unique values plus int32 codes (-1 for missing)"""
+    codes, uniques = pd.factorize(values)
+    np.save(f"{path}.values.npy", np.asarray(uniques, dtype=str))
+    np.save(f"{path}.codes.npy", codes.astype(np.int32))
+
+
+def _load_strings(path: str) -> np.ndarray:
+    """Decode a dictionary-encoded text column into an object array"""
+    uniques = np.load(f"{path}.values.npy", mmap_mode='r').astype(object)
+    codes = np.load(f"{path}.codes.npy", mmap_mode='r')
+    # Append a missing-value slot so code -1 maps to NaN
+    return np.append(uniques, np.nan)[codes]
+
+
+def _save_postings(path: str, postings: Dict[str, np.ndarray]):
+    """Store posting lists in CSR form: keys, offsets and concatenated row ids"""
+    keys = list(postings)
+    lengths = np.fromiter((len(postings[key]) for key in keys), dtype=np.int64, count=len(keys))
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    rows = np.concatenate([postings[key] for key in keys]) if keys else np.empty(0, dtype=np.int32)
+
+    np.save(f"{path}.keys.npy", np.asarray(keys, dtype=str))
+    np.save(f"{path}.offsets.npy", offsets)
+    np.save(f"{path}.rows.npy", rows.astype(np.int32))
+
+
+def _load_postings(path: str) -> Dict[str, np.ndarray]:
+    """Rebuild posting lists as views into the memory-mapped row ids"""
+    keys = np.load(f"{path}.keys.npy").tolist()
+    offsets = np.load(f"{path}.offsets.npy")
+    rows = np.load(f"{path}.rows.npy", mmap_mode='r')
+    return dict(zip(keys, np.split(rows, offsets[1:-1]))) if keys else {}
+
+
+def write_snapshot(csv_file: str, df: pd.DataFrame, token_postings: Dict[str, np.ndarray],
+                   ngram_postings: Dict[str, np.ndarray]):
+    """Write the parsed catalog and its inverted index next to the CSV"""
+    target = snapshot_dir(csv_file)
+    staging = f"{target}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    columns = []
+    for i, column in enumerate(df.columns):
+        path = os.path.join(staging, f"col{i}")
+        if df[column].dtype == object or pd.api.types.is_string_dtype(df[column]):
+            _save_strings(path, df[column])
+            kind = 'string'
+        else:
+            np.save(f"{path}.npy", df[column].to_numpy())
+            kind = 'numeric'
+        columns.append({'name': column, 'kind': kind})
+
+    _save_postings(os.path.join(staging, 'tokens'), token_postings)
+    _save_postings(os.path.join(staging, 'ngrams'), ngram_postings)
+
+    with open(os.path.join(staging, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': SNAPSHOT_VERSION,
+            'rows': len(df),
+            'columns': columns,
+            'source': source_signature(csv_file),
+        }, f, indent=2)
+
+    # Swap the finished snapshot in place of the previous one
+    previous = f"{target}.old-{os.getpid()}"
+    if os.path.exists(target):
+        os.rename(target, previous)
+    os.rename(staging, target)
+    shutil.rmtree(previous, ignore_errors=True)
+
+    logger.info(f"Catalog snapshot with {len(df)} products written to {target}")
+
+
+def load_snapshot(csv_file: str) -> Optional[Tuple[pd.DataFrame, Dict[str, np.ndarray], Dict[str, np.ndarray]]]:
+    """
+    Load (df, token_postings, ngram_postings) from the snapshot.
+
+    Returns None when snapshots are disabled, missing, from another format
+    version, or older than the CSV they were built from.
+    """
+    if not SNAPSHOT_ENABLED:
+        return None
+
+    target = snapshot_dir(csv_file)
+    manifest_path = os.path.join(target, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if manifest.get('version') != SNAPSHOT_VERSION:
+        logger.info(f"Catalog snapshot {target} has an old format, reading CSV")
+        return None
+
+    signature = source_signature(csv_file)
+    if signature is not None and signature != manifest.get('source'):
+        logger.info(f"Catalog snapshot {target} is stale, reading CSV")
+        return None
+
+    data = {}
+    for i, column in enumerate(manifest['columns']):
+        path = os.path.join(target, f"col{i}")
+        if column['kind'] == 'string':
+            data[column['name']] = _load_strings(path)
+        else:
+            data[column['name']] = np.load(f"{path}.npy", mmap_mode='r')
+
+    df = pd.DataFrame(data)
+    token_postings = _load_postings(os.path.join(target, 'tokens'))
+    ngram_postings = _load_postings(os.path.join(target, 'ngrams'))
+    return df, token_postings, ngram_postings
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Build the binary catalog snapshot")
+    parser.add_argument('--csv', default='data/product_data.csv')
+    args = parser.parse_args()
+
+    from product_database import ProductDatabase
+    db = ProductDatabase(args.csv, use_snapshot=False)
+    db.write_snapshot(args.csv)
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Completion Cache Module - Reuse of LLM responses for repeated turns
+A turn is keyed on its context (catalog version, model settings and the prompt without the
+user message: recent history and listed products) plus the normalized user message. Because
+the catalog version is part of the context, a price or stock change never serves an old
+answer. With COMPLETION_CACHE_SEMANTIC=1, paraphrased messages within the same context are
+matched by sentence-embedding similarity. Entries live in memory or in a local SQLite file.
+"""
+
+import os
+import re
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from cache import LRUCache
+from query_intent import fold
+from sqlite_store import PurgeSchedule, SQLiteConnections
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Set COMPLETION_CACHE=0 to call the LLM on every turn
+COMPLETION_CACHE_ENABLED = os.getenv('COMPLETION_CACHE', '1') != '0'
+COMPLETION_CACHE_BACKEND = os.getenv('COMPLETION_CACHE_BACKEND', 'memory')
+COMPLETION_CACHE_DB = os.getenv('COMPLETION_CACHE_DB', 'data/completions.sqlite3')
+COMPLETION_CACHE_SIZE = int(os.getenv('COMPLETION_CACHE_SIZE', '4096'))
+COMPLETION_CACHE_TTL = float(os.getenv('COMPLETION_CACHE_TTL', '3600'))
+
+# Set COMPLETION_CACHE_SEMANTIC=1 to also match paraphrases (loads a sentence encoder)
+COMPLETION_CACHE_SEMANTIC = os.getenv('COMPLETION_CACHE_SEMANTIC', '0') == '1'
+COMPLETION_CACHE_SIMILARITY = float(os.getenv('COMPLETION_CACHE_SIMILARITY', '0.92'))
+
+# Messages kept per context for similarity lookups
+SEMANTIC_CANDIDATES = 32
+
+# Punctuation that does not change what a shopper asked ("¿tienes iphone?" == "tienes iphone")
+MESSAGE_PUNCTUATION = re.compile(r'[¿?¡!.,;:"\'()]+')
+
+COMPLETION_CACHE_LOOKUPS = metrics.Counter(
+    'voice_sales_completion_cache_lookups_total', 'Completion cache lookups by how they were answered', ('result',))
+
+
+def normalize_message(message: str) -> str:
+    """Case, accent, punctuation and whitespace-insensitive form of a user message"""
+    return ' '.join(MESSAGE_PUNCTUATION.sub(' ', fold(message)).split())
+
+
+class CompletionKey(NamedTuple):
+    """Cache key of one turn: a context hash and the normalized user message"""
+    context: str
+    message: str
+
+    @property
+    def digest(self) -> str:
+        return hashlib.sha256(f"{self.context}\x00{self.message}".encode('utf-8')).hexdigest()
+
+
+class CompletionCache:
+    """Common lookup logic and counters; backends store entries and similarity candidates"""
+
+    def __init__(self, ttl: float = COMPLETION_CACHE_TTL, max_entries: int = COMPLETION_CACHE_SIZE,
+                 semantic: bool = COMPLETION_CACHE_SEMANTIC, similarity: float = COMPLETION_CACHE_SIMILARITY):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.semantic = semantic
+        self.similarity = similarity
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._purge_schedule = PurgeSchedule(self.purge_expired)
+
+    @staticmethod
+    def key(context: str, message: str) -> CompletionKey:
+        """Key of a turn whose prompt, apart from the user message, is `context`"""
+        context_hash = hashlib.sha256(context.encode('utf-8')).hexdigest()
+        return CompletionKey(context_hash, normalize_message(message))
+
+    def get(self, key: CompletionKey) -> Optional[str]:
+        """Cached completion for the exact message, then for a paraphrase in the same context"""
+        completion = self._get_exact(key.digest)
+        if completion is not None:
+            self.exact_hits += 1
+            COMPLETION_CACHE_LOOKUPS.inc(result='exact')
+            return completion
+
+        if self.semantic:
+            completion = self._get_similar(key)
+            if completion is not None:
+                self.semantic_hits += 1
+                COMPLETION_CACHE_LOOKUPS.inc(result='semantic')
+                return completion
+
+        self.misses += 1
+        COMPLETION_CACHE_LOOKUPS.inc(result='miss')
+        return None
+
+    def set(self, key: CompletionKey, completion: str):
+        if not completion:
+            return
+        embedding = self._embed(key.message) if self.semantic else None
+        self._set(key, completion, embedding)
+        self._purge_schedule.maybe_purge()
+
+    def _embed(self, message: str) -> Optional[np.ndarray]:
+        """Normalized sentence embedding of a message (None when the encoder is unavailable)"""
+        try:
+            from model_registry import get_text_encoder
+            from semantic_search import EMBEDDING_MODEL
+            encoder = get_text_encoder(EMBEDDING_MODEL)
+        except Exception as e:
+            logger.warning(f"Semantic completion cache disabled: {e}")
+            self.semantic = False
+            return None
+        return encoder.encode([message], convert_to_numpy=True, normalize_embeddings=True)[0].astype(np.float32)
+
+    def _get_similar(self, key: CompletionKey) -> Optional[str]:
+        candidates = self._candidates(key.context)
+        if not candidates:
+            return None
+        vector = self._embed(key.message)
+        if vector is None:
+            return None
+
+        embeddings = np.stack([embedding for embedding, _ in candidates])
+        scores = embeddings @ vector
+        best = int(np.argmax(scores))
+        return candidates[best][1] if scores[best] >= self.similarity else None
+
+    def _get_exact(self, digest: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def _set(self, key: CompletionKey, completion: str, embedding: Optional[np.ndarray]):
+        raise NotImplementedError
+
+    def _candidates(self, context: str) -> List[Tuple[np.ndarray, str]]:
+        """Unexpired (embedding, completion) pairs cached for a context"""
+        raise NotImplementedError
+
+    def purge_expired(self):
+        raise NotImplementedError
+
+    def _counters(self) -> Dict:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            'exact_hits': self.exact_hits,
+            'semantic_hits': self.semantic_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.exact_hits + self.semantic_hits) / lookups, 4) if lookups else 0.0,
+            'semantic': self.semantic,
+            'ttl': self.ttl,
+        }
+
+    def stats(self) -> Dict:
+        raise NotImplementedError
+
+
+class MemoryCompletionCache(CompletionCache):
+    """Process-local completions in an LRU with TTL"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._entries = LRUCache(max_size=self.max_entries, ttl=self.ttl)
+        # context -> {message: (embedding, completion, expires_at)}, least recently written first
+        self._contexts: 'OrderedDict[str, OrderedDict]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_exact(self, digest: str) -> Optional[str]:
+        return self._entries.get(digest)
+
+    def _set(self, key: CompletionKey, completion: str, embedding: Optional[np.ndarray]):
+        self._entries.set(key.digest, completion)
+        if embedding is None:
+            return
+        with self._lock:
+            messages = self._contexts.pop(key.context, None) or OrderedDict()
+            messages.pop(key.message, None)
+            messages[key.message] = (embedding, completion, time.monotonic() + self.ttl)
+            while len(messages) > SEMANTIC_CANDIDATES:
+                messages.popitem(last=False)
+            self._contexts[key.context] = messages
+            while len(self._contexts) > self.max_entries:
+                self._contexts.popitem(last=False)
+
+    def _candidates(self, context: str) -> List[Tuple[np.ndarray, str]]:
+        now = time.monotonic()
+        with self._lock:
+            messages = self._contexts.get(context)
+            if not messages:
+                return []
+            return [(embedding, completion) for embedding, completion, expires_at in messages.values()
+                    if expires_at > now]
+
+    def purge_expired(self):
+        now = time.monotonic()
+        with self._lock:
+            for context in list(self._contexts):
+                messages = self._contexts[context]
+                for message in [m for m, entry in messages.items() if entry[2] <= now]:
+                    del messages[message]
+                if not messages:
+                    del self._contexts[context]
+
+    def stats(self) -> Dict:
+        return {'backend': 'memory', **self._counters(), 'entries': self._entries.stats()}
+
+
+class SQLiteCompletionCache(CompletionCache):
+    """Completions in a local SQLite file shared by every worker process"""
+
+    def __init__(self, path: str = COMPLETION_CACHE_DB, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._connections = SQLiteConnections(path)
+        with self._connections.get() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS completions (
+                    digest TEXT PRIMARY KEY,
+                    context TEXT NOT NULL,
+                    completion TEXT NOT NULL,
+                    embedding BLOB,
+                    created REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS completions_context ON completions (context, created)")
+            conn.execute("CREATE INDEX IF NOT EXISTS completions_created ON completions (created)")
+
+    def _get_exact(self, digest: str) -> Optional[str]:
+        row = self._connections.get().execute(
+            "SELECT completion FROM completions WHERE digest = ? AND created >= ?",
+            (digest, time.time() - self.ttl)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: CompletionKey, completion: str, embedding: Optional[np.ndarray]):
+        conn = self._connections.get()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO completions (digest, context, completion, embedding, created) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key.digest, key.context, completion,
+                 embedding.tobytes() if embedding is not None else None, time.time())
+            )
+            conn.execute("""
+                DELETE FROM completions WHERE digest IN (
+                    SELECT digest FROM completions ORDER BY created DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+    def _candidates(self, context: str) -> List[Tuple[np.ndarray, str]]:
+        rows = self._connections.get().execute(
+            "SELECT embedding, completion FROM completions "
+            "WHERE context = ? AND created >= ? AND embedding IS NOT NULL ORDER BY created DESC LIMIT ?",
+            (context, time.time() - self.ttl, SEMANTIC_CANDIDATES)
+        ).fetchall()
+        return [(np.frombuffer(embedding, dtype=np.float32), completion) for embedding, completion in rows]
+
+    def purge_expired(self):
+        conn = self._connections.get()
+        with conn:
+            conn.execute("DELETE FROM completions WHERE created < ?", (time.time() - self.ttl,))
+
+    def stats(self) -> Dict:
+        count, = self._connections.get().execute("SELECT COUNT(*) FROM completions").fetchone()
+        return {'backend': 'sqlite', 'path': self.path, **self._counters(),
+                'entries': count, 'max_entries': self.max_entries}
+
+
+_completion_cache = None
+_completion_cache_lock = threading.Lock()
+
+
+def get_completion_cache() -> Optional[CompletionCache]:
+    """Process-wide completion cache selected by COMPLETION_CACHE_BACKEND (None when disabled)"""
+    global _completion_cache
+    if not COMPLETION_CACHE_ENABLED:
+        return None
+    if _completion_cache is None:
+        with _completion_cache_lock:
+            if _completion_cache is None:
+                if COMPLETION_CACHE_BACKEND == 'sqlite':
+                    logger.info(f"Using SQLite completion cache at {COMPLETION_CACHE_DB}")
+                    _completion_cache = SQLiteCompletionCache(COMPLETION_CACHE_DB)
+                else:
+                    _completion_cache = MemoryCompletionCache()
+    return _completion_cache
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Facet Index Module - Precomputed bitmaps over category, brand and sale status
+Each facet value keeps its matching rows either as a packed bitmap (dense values) or a
+sorted row array (sparse values, roaring-style), so any combination of facet filters is
+answered by intersecting those sets instead of comparing whole DataFrame columns.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Set bits per byte value, for counting packed bitmaps
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
+
+# A row set: packed little-endian bitmap (uint8) or sorted row positions (int32)
+RowSet = np.ndarray
+
+
+def _normalize(value: Any) -> Any:
+    return value.lower() if isinstance(value, str) else value
+
+
+class FacetIndex:
+    """Row sets for every value of every facet, plus per-row codes for facet counts"""
+
+    def __init__(self, facets: Dict[str, Iterable]):
+        self.size = 0
+        self.codes: Dict[str, np.ndarray] = {}
+        self.values: Dict[str, List] = {}
+        self.lookup: Dict[str, Dict[Any, int]] = {}
+        self.sets: Dict[str, List[RowSet]] = {}
+        for name, column in facets.items():
+            self._build_facet(name, column)
+
+    @classmethod
+    def from_records(cls, records) -> 'FacetIndex':
+        """Category, brand and on-sale facets of precomputed ProductRecords"""
+        columns = records.columns
+        return cls({'category': columns['category'], 'brand': columns['brand'], 'on_sale': columns['on_sale']})
+
+    def with_facet(self, name: str, column: Iterable) -> 'FacetIndex':
+        """Copy with one facet rebuilt (the other facets are shared)"""
+        updated = FacetIndex({})
+        updated.size = self.size
+        updated.codes = dict(self.codes)
+        updated.values = dict(self.values)
+        updated.lookup = dict(self.lookup)
+        updated.sets = dict(self.sets)
+        updated._build_facet(name, column)
+        return updated
+
+    def _build_facet(self, name: str, column: Iterable):
+        codes, uniques = pd.factorize(pd.Series(list(column), dtype=object))
+        codes = codes.astype(np.int32)
+        self.size = len(codes)
+        self.codes[name] = codes
+        self.values[name] = list(uniques)
+        self.lookup[name] = {_normalize(value): code for code, value in enumerate(uniques)}
+
+        # Group row positions by value with one stable sort
+        order = np.argsort(codes, kind='stable').astype(np.int32)
+        boundaries = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        self.sets[name] = [
+            self._compact(order[boundaries[code]:boundaries[code + 1]]) for code in range(len(uniques))
+        ]
+
+    def _compact(self, rows: np.ndarray) -> RowSet:
+        """Keep sparse sets as row arrays, dense ones as packed bitmaps (whichever is smaller)"""
+        if len(rows) * 32 < self.size:
+            return rows
+        return self._to_bitmap(rows)
+
+    def _to_bitmap(self, rowset: RowSet) -> np.ndarray:
+        if rowset.dtype == np.uint8:
+            return rowset
+        mask = np.zeros(self.size, dtype=bool)
+        mask[rowset] = True
+        return np.packbits(mask, bitorder='little')
+
+    def _to_rows(self, rowset: RowSet, limit: Optional[int] = None) -> np.ndarray:
+        if rowset.dtype != np.uint8:
+            return rowset if limit is None else rowset[:limit]
+
+        # Every non-zero byte holds at least one row, so `limit` bytes are enough
+        nonzero = np.flatnonzero(rowset)
+        if limit is not None:
+            nonzero = nonzero[:limit]
+        bits = np.unpackbits(rowset[nonzero], bitorder='little').reshape(-1, 8)
+        rows = (nonzero[:, None] * 8 + np.arange(8))[bits.astype(bool)].astype(np.int32)
+        return rows if limit is None else rows[:limit]
+
+    def _count(self, rowset: RowSet) -> int:
+        if rowset.dtype == np.uint8:
+            return int(POPCOUNT[rowset].sum())
+        return len(rowset)
+
+    def _intersect(self, a: RowSet, b: RowSet) -> RowSet:
+        if a.dtype == np.uint8 and b.dtype == np.uint8:
+            return a & b
+        if a.dtype == np.uint8:
+            a, b = b, a
+        if b.dtype == np.uint8:
+            # Probe the bitmap for each row of the sparse side
+            return a[(b[a >> 3] >> (a & 7).astype(np.uint8)) & 1 == 1]
+        return np.intersect1d(a, b, assume_unique=True)
+
+    def _facet_set(self, name: str, wanted: Union[Any, List]) -> Optional[RowSet]:
+        """Rows matching any of the wanted values of one facet (None if no value exists)"""
+        values = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+        codes = [self.lookup[name][key] for key in map(_normalize, values) if key in self.lookup[name]]
+        if not codes:
+            return None
+        if len(codes) == 1:
+            return self.sets[name][codes[0]]
+
+        union = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        for code in codes:
+            union |= self._to_bitmap(self.sets[name][code])
+        return union
+
+    def select(self, filters: Dict[str, Any]) -> Optional[RowSet]:
+        """Row set matching every filter (None means no filter, i.e. every row)"""
+        selected = None
+        # Start from the smallest set so the intersections stay cheap
+        sets = []
+        for name, wanted in filters.items():
+            if wanted is None:
+                continue
+            if name not in self.sets:
+                raise KeyError(f"Unknown facet: {name}")
+            rowset = self._facet_set(name, wanted)
+            if rowset is None:
+                return np.empty(0, dtype=np.int32)
+            sets.append(rowset)
+
+        for rowset in sorted(sets, key=self._count):
+            selected = rowset if selected is None else self._intersect(selected, rowset)
+        return selected
+
+    def select_rows(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Row positions matching the filters as an array, in catalog order"""
+        selected = self.select(filters)
+        return np.arange(self.size, dtype=np.int32) if selected is None else self._to_rows(selected)
+
+    def rows(self, limit: Optional[int] = None, **filters) -> List[int]:
+        """Row positions matching the filters, in catalog order"""
+        if limit is not None and limit <= 0:
+            return []
+        selected = self.select(filters)
+        if selected is None:
+            return list(range(self.size if limit is None else min(limit, self.size)))
+        return self._to_rows(selected, limit).tolist()
+
+    def count(self, **filters) -> int:
+        """Number of rows matching the filters"""
+        selected = self.select(filters)
+        return self.size if selected is None else self._count(selected)
+
+    def query(self, filters: Dict[str, Any], limit: Optional[int] = 10,
+              facets: Optional[Iterable[str]] = None) -> Dict:
+        """
+        Matching rows (catalog order), their total and per-value counts for each facet.
+        Filter values may be a single value or a list (any of them matches).
+        """
+        all_rows = self.select_rows(filters)
+
+        counts = {}
+        for name in (facets if facets is not None else self.codes):
+            tally = np.bincount(self.codes[name][all_rows], minlength=len(self.values[name]))
+            counts[name] = {
+                self.values[name][code]: int(tally[code]) for code in np.argsort(-tally, kind='stable') if tally[code]
+            }
+
+        rows = all_rows if limit is None else all_rows[:max(limit, 0)]
+        return {'rows': rows.tolist(), 'total': len(all_rows), 'facets': counts}
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Metrics Module - Per-stage latency histograms and search strategy counters
+Exposed in Prometheus text format at /metrics and returned per request in the JSON responses
+"""
+
+import time
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Latency buckets in seconds, from sub-millisecond search steps to slow LLM/TTS calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry: List['_Metric'] = []
+
+# Stage timings of the request being handled in the current thread/task
+_request_timings: contextvars.ContextVar[Optional[Dict]] = contextvars.ContextVar('request_timings', default=None)
+
+
+def _escape_label_value(value: str) -> str:
+    """Backslash, double quote and newline escaped as the Prometheus text format requires"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic counter with labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def snapshot(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, value in sorted(self.snapshot().items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {value:g}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket latency histogram with labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], Dict] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+                self._series[key] = series
+            series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            series = {key: dict(value, counts=list(value['counts'])) for key, value in self._series.items()}
+
+        for key, data in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), data['counts']):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else f"{bound:g}"
+                labels = _format_labels(self.label_names, key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {data['sum']:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {data['count']}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    'voice_sales_stage_seconds', 'Time spent in each request stage', ('endpoint', 'stage'))
+REQUEST_SECONDS = Histogram(
+    'voice_sales_request_seconds', 'Total time per API request', ('endpoint',))
+SEARCH_STRATEGY_SECONDS = Histogram(
+    'voice_sales_search_strategy_seconds', 'Time spent in each intelligent_search strategy', ('strategy',))
+SEARCH_STRATEGY_HITS = Counter(
+    'voice_sales_search_strategy_hits_total', 'intelligent_search calls answered by each strategy', ('strategy',))
+
+
+def start_request(endpoint: str) -> Dict:
+    """Begin collecting stage timings for the current request"""
+    timings = {'endpoint': endpoint, '_start': time.perf_counter()}
+    _request_timings.set(timings)
+    return timings
+
+
+def finish_request(timings: Dict) -> Dict:
+    """Record the total request time and return the per-request timings for the response"""
+    total = time.perf_counter() - timings.pop('_start')
+    endpoint = timings.pop('endpoint')
+    REQUEST_SECONDS.observe(total, endpoint=endpoint)
+    _request_timings.set(None)
+    timings['total'] = round(total, 4)
+    return timings
+
+
+def clear_request():
+    """Stop collecting timings in the current context"""
+    _request_timings.set(None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a request stage into the stage histogram and the current request timings"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def record_stage(name: str, seconds: float, endpoint: Optional[str] = None):
+    """Record an already measured stage duration"""
+    timings = _request_timings.get()
+    if endpoint is None:
+        endpoint = timings.get('endpoint', '') if timings else ''
+    STAGE_SECONDS.observe(seconds, endpoint=endpoint, stage=name)
+    if timings is not None:
+        timings[name] = round(seconds, 4)
+
+
+@contextmanager
+def search_strategy(name: str) -> Iterator[None]:
+    """Time one intelligent_search strategy"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        SEARCH_STRATEGY_SECONDS.observe(time.perf_counter() - start, strategy=name)
+
+
+def record_search_hit(strategy: str):
+    """Count which strategy produced the intelligent_search results"""
+    SEARCH_STRATEGY_HITS.inc(strategy=strategy)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings['search_strategy'] = strategy
+
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
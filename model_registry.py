@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Model Registry Module - Heavyweight voice models loaded once per process
+The Silero VAD model and the LiveKit LLM/STT/TTS plugin clients are created lazily on
+first real use and shared by every SalesAssistant instead of being rebuilt per session.
+Sentence encoders are shared the same way by semantic search and the completion cache.
+"""
+
+import os
+import logging
+import threading
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """Thread-safe, lazily populated registry of shared model objects"""
+
+    def __init__(self):
+        self._models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, loader: Callable[[], Any]) -> Any:
+        """Return the shared object for `name`, loading it on first use"""
+        model = self._models.get(name)
+        if model is None:
+            with self._lock:
+                model = self._models.get(name)
+                if model is None:
+                    logger.info(f"Loading shared model: {name}")
+                    model = loader()
+                    self._models[name] = model
+        return model
+
+    def loaded(self) -> List[str]:
+        """Names of the models loaded so far"""
+        return list(self._models)
+
+
+registry = ModelRegistry()
+
+
+def get_vad():
+    """Silero voice activity detection model"""
+    def load():
+        from livekit.plugins import silero
+        return silero.VAD.load()
+    return registry.get('vad', load)
+
+
+def get_llm(model: str = "gpt-4o"):
+    """LiveKit OpenAI LLM plugin client"""
+    def load():
+        from livekit.plugins import openai
+        return openai.LLM(model=model, api_key=os.getenv('OPENAI_API_KEY'))
+    return registry.get(f'llm:{model}', load)
+
+
+def get_stt():
+    """LiveKit OpenAI speech-to-text plugin client"""
+    def load():
+        from livekit.plugins import openai
+        return openai.STT()
+    return registry.get('stt', load)
+
+
+def get_tts():
+    """ElevenLabs text-to-speech, falling back to OpenAI TTS"""
+    def load():
+        try:
+            from livekit.plugins import elevenlabs
+            return elevenlabs.TTS()
+        except Exception as e:
+            logger.info(f"ElevenLabs TTS unavailable ({e}), using OpenAI TTS")
+            from livekit.plugins import openai
+            return openai.TTS()
+    return registry.get('tts', load)
+
+
+def get_text_encoder(model_name: str):
+    """Sentence-transformers encoder on CPU"""
+    def load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name, device='cpu')
+    return registry.get(f'encoder:{model_name}', load)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+OpenAI Clients Module - Process-wide pooled OpenAI clients
+One sync and one async client per process, with keep-alive connection pooling,
+configurable timeouts and retries, instead of a new client (and TLS handshake) per request.
+"""
+
+import os
+import threading
+
+import httpx
+
+# Connection pool and retry tuning
+OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', '30'))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv('OPENAI_CONNECT_TIMEOUT', '5'))
+OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '2'))
+OPENAI_MAX_CONNECTIONS = int(os.getenv('OPENAI_MAX_CONNECTIONS', '50'))
+OPENAI_MAX_KEEPALIVE = int(os.getenv('OPENAI_MAX_KEEPALIVE', '20'))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv('OPENAI_KEEPALIVE_EXPIRY', '60'))
+
+_client = None
+_async_client = None
+_lock = threading.Lock()
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_openai_client():
+    """Shared synchronous OpenAI client (thread-safe, pooled connections)"""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                from openai import OpenAI
+                _client = OpenAI(
+                    api_key=os.getenv('OPENAI_API_KEY'),
+                    timeout=_timeout(),
+                    max_retries=OPENAI_MAX_RETRIES,
+                    http_client=httpx.Client(timeout=_timeout(), limits=_limits()),
+                )
+    return _client
+
+
+def get_async_openai_client():
+    """
+    Shared asynchronous OpenAI client.
+    Its connection pool belongs to the event loop that first uses it, so it is
+    meant for the long-lived loop in async_runtime.
+    """
+    global _async_client
+    if _async_client is None:
+        with _lock:
+            if _async_client is None:
+                from openai import AsyncOpenAI
+                _async_client = AsyncOpenAI(
+                    api_key=os.getenv('OPENAI_API_KEY'),
+                    timeout=_timeout(),
+                    max_retries=OPENAI_MAX_RETRIES,
+                    http_client=httpx.AsyncClient(timeout=_timeout(), limits=_limits()),
+                )
+    return _async_client
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Price Index Module - Sorted final-price index for range queries
+Products are kept in final (discounted) price order so a price range is two binary
+searches plus a slice; category, brand and on-sale filters run on the slice only.
+"""
+
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+SORT_ORDERS = ('asc', 'desc', None)
+
+
+class PriceIndex:
+    """Row positions sorted by final price, with filter columns aligned to that order"""
+
+    def __init__(self, prices: List[float], categories: List[str], brands: List[str], on_sale: List[bool]):
+        prices = np.asarray(prices, dtype=np.float64)
+
+        # Stable sort keeps catalog order among equal prices; products without a price sort last
+        self.order = np.argsort(prices, kind='stable').astype(np.int32)
+        self.sorted_prices = prices[self.order]
+        self.priced = int(np.count_nonzero(~np.isnan(prices)))
+
+        category_codes, category_names = pd.factorize(pd.Series(categories, dtype=object))
+        brand_codes, brand_names = pd.factorize(pd.Series(brands, dtype=object))
+        self.sorted_categories = category_codes.astype(np.int32)[self.order]
+        self.sorted_brands = brand_codes.astype(np.int32)[self.order]
+        self.sorted_on_sale = np.asarray(on_sale, dtype=bool)[self.order]
+
+        self.category_codes: Dict[str, int] = {str(name).lower(): code for code, name in enumerate(category_names)}
+        self.brand_codes: Dict[str, int] = {str(name).lower(): code for code, name in enumerate(brand_names)}
+
+    @classmethod
+    def from_records(cls, records) -> 'PriceIndex':
+        """Index over the final prices of precomputed ProductRecords"""
+        columns = records.columns
+        return cls(columns['price'], columns['category'], columns['brand'], columns['on_sale'])
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def bounds(self, min_price: Optional[float] = None, max_price: Optional[float] = None):
+        """Slice [lo, hi) of the sorted arrays holding prices within the range (inclusive)"""
+        priced = self.sorted_prices[:self.priced]
+        lo = 0 if min_price is None else int(np.searchsorted(priced, min_price, side='left'))
+        hi = self.priced if max_price is None else int(np.searchsorted(priced, max_price, side='right'))
+        return lo, max(lo, hi)
+
+    @staticmethod
+    def _code_mask(codes: np.ndarray, lookup: Dict[str, int], wanted: Union[str, List[str]]) -> Optional[np.ndarray]:
+        """Mask of rows whose code is one of the wanted names (None if no name exists)"""
+        names = [wanted] if isinstance(wanted, str) else wanted
+        wanted_codes = [lookup[name.lower()] for name in names if name.lower() in lookup]
+        if not wanted_codes:
+            return None
+        if len(wanted_codes) == 1:
+            return codes == wanted_codes[0]
+        return np.isin(codes, wanted_codes)
+
+    def select(self, min_price: Optional[float] = None, max_price: Optional[float] = None,
+               category: Union[str, List[str], None] = None, brand: Union[str, List[str], None] = None,
+               on_sale: Optional[bool] = None) -> np.ndarray:
+        """
+        Row positions with final price in [min_price, max_price] matching the filters, cheapest first.
+        Category and brand are exact names (case-insensitive), or lists of them.
+        """
+        lo, hi = self.bounds(min_price, max_price)
+        empty = self.order[:0]
+        if lo == hi:
+            return empty
+
+        mask = None
+        if category is not None:
+            mask = self._code_mask(self.sorted_categories[lo:hi], self.category_codes, category)
+            if mask is None:
+                return empty
+        if brand is not None:
+            brand_mask = self._code_mask(self.sorted_brands[lo:hi], self.brand_codes, brand)
+            if brand_mask is None:
+                return empty
+            mask = brand_mask if mask is None else mask & brand_mask
+        if on_sale is not None:
+            sale_mask = self.sorted_on_sale[lo:hi] == on_sale
+            mask = sale_mask if mask is None else mask & sale_mask
+
+        rows = self.order[lo:hi]
+        return rows if mask is None else rows[mask]
+
+    def query(self, min_price: Optional[float] = None, max_price: Optional[float] = None,
+              category: Union[str, List[str], None] = None, brand: Union[str, List[str], None] = None,
+              on_sale: Optional[bool] = None, sort: Optional[str] = 'asc', limit: Optional[int] = 10) -> List[int]:
+        """
+        Like select(), limited and ordered by sort: 'asc' or 'desc' by price, or None for catalog order.
+        """
+        if sort not in SORT_ORDERS:
+            raise ValueError(f"sort must be one of {SORT_ORDERS}")
+        if limit is not None and limit <= 0:
+            return []
+
+        rows = self.select(min_price, max_price, category, brand, on_sale)
+        if sort == 'desc':
+            rows = rows[::-1]
+        elif sort is None:
+            rows = np.sort(rows)
+        return rows[:limit].tolist()
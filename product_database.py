@@ -4,47 +4,123 @@ Product Database Module - Production Ready Search System
 Loads and manages product data from CSV with intelligent search capabilities
 """
 
+import os
+import copy
+import hashlib
+import threading
+from functools import partial
+import numpy as np
 import pandas as pd
 import logging
 from typing import List, Dict, Optional, Tuple
 import re
-from fuzzywuzzy import fuzz, process
+from fuzzywuzzy import fuzz, process, utils as fuzz_utils
 from collections import defaultdict
 
+from search_index import InvertedIndex, RankedTextScorer, partial_ratio, rapid_fuzz, rapid_process, ratio_bounds
+from product_records import ProductRecords
+from price_index import PriceIndex
+from facet_index import FacetIndex
+from query_intent import IntentParser, QueryIntent
+from value_resolver import ValueResolver
+from relevance import RelevanceRanker
+from cache import LRUCache
+from semantic_search import SemanticIndex
+from catalog_snapshot import load_snapshot, write_snapshot
+import metrics
+
 logger = logging.getLogger(__name__)
 
+# Search result cache tuning (TTL in seconds, empty for no expiry)
+SEARCH_CACHE_SIZE = int(os.getenv('SEARCH_CACHE_SIZE', '512'))
+SEARCH_CACHE_TTL = float(os.getenv('SEARCH_CACHE_TTL') or 0) or None
+
+# Set SEMANTIC_SEARCH=0 to skip loading the embedding index
+SEMANTIC_SEARCH_ENABLED = os.getenv('SEMANTIC_SEARCH', '1') != '0'
+
+# Set INTENT_ROUTING=0 to always run the full fuzzy cascade
+INTENT_ROUTING_ENABLED = os.getenv('INTENT_ROUTING', '1') != '0'
+
+# Minimum partial_ratio for a fuzzy product name match
+FUZZY_NAME_MIN_SCORE = 60
+
+# Query x product-name scores computed per vectorized chunk in batch searches
+BATCH_SCORE_CELLS = 4_000_000
+
+# Columns that can change in place without rebuilding the text indexes
+INCREMENTAL_COLUMNS = ['precio', 'precio_de_descuento', 'unidades_disponibles', 'en_descuento']
+
+# Rows found by a search strategy, with the name similarity (0-1) it computed for some of them
+RowMatches = Tuple[List[int], Optional[Dict[int, float]]]
+
 class ProductDatabase:
-    def __init__(self, csv_file: str = "data/product_data.csv"):
-        """Initialize product database from CSV file"""
+    def __init__(self, csv_file: str = "data/product_data.csv",
+                 cache_size: int = SEARCH_CACHE_SIZE, cache_ttl: Optional[float] = SEARCH_CACHE_TTL,
+                 use_snapshot: bool = True, df: Optional[pd.DataFrame] = None):
+        """Initialize product database from CSV file (or its binary snapshot), or from an already parsed `df`"""
+        self.use_snapshot = use_snapshot
+        self.csv_file = csv_file
+        self.search_cache = LRUCache(max_size=cache_size, ttl=cache_ttl)
         self.df = None
         self.categories = set()
         self.brands = set()
         self.search_index = {}
-        self.load_data(csv_file)
-
-    def load_data(self, csv_file: str):
-        """Load product data from CSV file"""
+        self.inverted_index = None
+        self.text_scorer = None
+        self.records = None
+        self.price_index = None
+        self.facet_index = None
+        self.intent_parser = None
+        self.brand_resolver = None
+        self.category_resolver = None
+        self.ranker = None
+        self.semantic_index = None
+        self.catalog_version = None
+        self.load_data(csv_file, df)
+
+    def load_data(self, csv_file: str, df: Optional[pd.DataFrame] = None):
+        """Load product data from the binary snapshot, or from the CSV file when it is stale"""
         try:
-            self.df = pd.read_csv(csv_file)
-            logger.info(f"Loaded {len(self.df)} products from {csv_file}")
-
-            # Clean and prepare data
-            self.df['precio'] = pd.to_numeric(self.df['precio'], errors='coerce')
-            self.df['precio_de_descuento'] = pd.to_numeric(self.df['precio_de_descuento'], errors='coerce')
+            snapshot = load_snapshot(csv_file) if self.use_snapshot and df is None else None
+            if df is not None:
+                self.df = df
+                token_postings = ngram_postings = None
+            elif snapshot is not None:
+                self.df, token_postings, ngram_postings = snapshot
+                logger.info(f"Loaded {len(self.df)} products from snapshot of {csv_file}")
+            else:
+                self.df = self._read_csv(csv_file)
+                token_postings = ngram_postings = None
+            self.csv_file = csv_file
 
             # Extract unique categories and brands
             self.categories = set(self.df['categoria'].unique())
             self.brands = set(self.df['marca'].unique())
 
-            # Create comprehensive search index
-            self.df['search_text'] = (
-                self.df['nombre_de_producto'].str.lower() + ' ' +
-                self.df['categoria'].str.lower() + ' ' +
-                self.df['marca'].str.lower()
-            ).fillna('')
+            # Brand/category dictionary for query intent extraction
+            self.intent_parser = IntentParser(self.brands, self.categories)
+
+            # Sorted distinct names with memoized fuzzy resolution
+            self.brand_resolver = ValueResolver(self.brands)
+            self.category_resolver = ValueResolver(self.categories)
 
             # Build search index for fuzzy matching
-            self._build_search_index()
+            self._build_search_index(token_postings, ngram_postings)
+
+            # Precompute the response dictionaries served by every endpoint
+            self.records = ProductRecords.from_dataframe(self.df)
+            self.price_index = PriceIndex.from_records(self.records)
+            self.facet_index = FacetIndex.from_records(self.records)
+            self.ranker = RelevanceRanker.build(self.search_index, self.records)
+
+            # Persisted embedding index (built offline with semantic_search.py)
+            self.semantic_index = None
+            if SEMANTIC_SEARCH_ENABLED:
+                self.semantic_index = SemanticIndex.load(csv_file, self.search_index['full_text'])
+
+            # Cached results refer to the previous catalog
+            self.search_cache.clear()
+            self.catalog_version = self.compute_catalog_version()
 
             logger.info(f"Categories: {len(self.categories)}, Brands: {len(self.brands)}")
             logger.info(f"Products on sale: {len(self.df[self.df['en_descuento'] == True])}")
@@ -54,158 +130,427 @@ class ProductDatabase:
             logger.error(f"Error loading product data: {e}")
             raise
 
-    def _build_search_index(self):
+    @staticmethod
+    def _read_csv(csv_file: str) -> pd.DataFrame:
+        """Parse and clean the product CSV"""
+        df = pd.read_csv(csv_file)
+        logger.info(f"Loaded {len(df)} products from {csv_file}")
+
+        # Clean and prepare data
+        df['precio'] = pd.to_numeric(df['precio'], errors='coerce')
+        df['precio_de_descuento'] = pd.to_numeric(df['precio_de_descuento'], errors='coerce')
+
+        # Create comprehensive search index
+        df['search_text'] = (
+            df['nombre_de_producto'].str.lower() + ' ' +
+            df['categoria'].str.lower() + ' ' +
+            df['marca'].str.lower()
+        ).fillna('')
+
+        return df
+
+    def write_snapshot(self, csv_file: Optional[str] = None):
+        """Persist the loaded catalog and inverted index as a binary snapshot"""
+        write_snapshot(csv_file or self.csv_file, self.df,
+                       self.inverted_index.token_postings, self.inverted_index.ngram_postings)
+
+    def changed_rows(self, df: pd.DataFrame) -> Optional[List[int]]:
+        """
+        Rows whose price/stock columns differ in `df`.
+        Returns None when the change also touches text columns or row layout.
+        """
+        if len(df) != len(self.df) or list(df.columns) != list(self.df.columns):
+            return None
+
+        for column in df.columns:
+            if column not in INCREMENTAL_COLUMNS and not df[column].equals(self.df[column]):
+                return None
+
+        changed = np.zeros(len(df), dtype=bool)
+        for column in INCREMENTAL_COLUMNS:
+            new, old = df[column], self.df[column]
+            changed |= ~((new.to_numpy() == old.to_numpy()) | (new.isna().to_numpy() & old.isna().to_numpy()))
+        return np.flatnonzero(changed).tolist()
+
+    def with_updated_rows(self, df: pd.DataFrame, rows: List[int]) -> 'ProductDatabase':
+        """
+        Copy of this database with price/stock values taken from `df` for `rows`.
+        Text indexes are shared with the original, which stays untouched.
+        """
+        updated = copy.copy(self)
+        updated.df = self.df.copy(deep=False)
+        for column in INCREMENTAL_COLUMNS:
+            updated.df[column] = df[column].to_numpy()
+
+        updated.records = self.records.with_updates(updated.df, rows)
+        updated.price_index = PriceIndex.from_records(updated.records)
+        updated.facet_index = self.facet_index.with_facet('on_sale', updated.records.columns['on_sale'])
+        updated.ranker = self.ranker.with_records(updated.records)
+        updated.search_cache = LRUCache(max_size=self.search_cache.max_size, ttl=self.search_cache.ttl)
+        updated.catalog_version = updated.compute_catalog_version()
+        return updated
+
+    def compute_catalog_version(self) -> str:
+        """
+        Fingerprint of the product names, prices and stock shown to shoppers
+        Content-based, so every worker that loads the same catalog reports the same version.
+        """
+        hashes = pd.util.hash_pandas_object(self.df[['nombre_de_producto'] + INCREMENTAL_COLUMNS], index=False)
+        return hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()[:16]
+
+    def _build_search_index(self, token_postings: Optional[Dict] = None, ngram_postings: Optional[Dict] = None):
         """Build search index for fuzzy matching"""
         self.search_index = {
-            'product_names': list(self.df['nombre_de_producto'].str.lower()),
-            'brands': list(self.df['marca'].str.lower()),
-            'categories': list(self.df['categoria'].str.lower()),
+            'product_names': list(self.df['nombre_de_producto'].fillna('').str.lower()),
+            'brands': list(self.df['marca'].fillna('').str.lower()),
+            'categories': list(self.df['categoria'].fillna('').str.lower()),
             'full_text': list(self.df['search_text'])
         }
 
+        # Names preprocessed once, as process.extract does per call, for batched name scoring
+        self.search_index['processed_names'] = [fuzz_utils.full_process(name)
+                                                for name in self.search_index['product_names']]
+
+        # Inverted index for substring/word lookups without full-table scans
+        self.inverted_index = InvertedIndex(self.search_index_fields(), token_postings, ngram_postings)
+        self.text_scorer = RankedTextScorer(self.search_index['full_text'], self.inverted_index)
+
+    def search_index_fields(self) -> Dict[str, List[str]]:
+        """Lowercased text fields covered by the inverted index"""
+        return {
+            'nombre_de_producto': self.search_index['product_names'],
+            'marca': self.search_index['brands'],
+            'categoria': self.search_index['categories'],
+        }
+
     def intelligent_search(self, query: str, max_results: int = 8) -> Tuple[List[Dict], str]:
         """
         Intelligent search using multiple strategies without hardcoded patterns
+        Results are cached per normalized query and max_results
         """
+        cache_key = self._search_key(query, max_results)
+        cached = self.search_cache.get(cache_key)
+        if cached is None:
+            cached = self._search_cascade(query, max_results)
+            self.search_cache.set(cache_key, cached)
+        else:
+            metrics.record_search_hit('cache')
+
+        # Hand out copies so callers can't alter cached entries
+        products, search_description = cached
+        return [dict(product) for product in products], search_description
+
+    def batch_search(self, queries: List[str], max_results: int = 8) -> List[Tuple[List[Dict], str]]:
+        """
+        intelligent_search over many queries, results in input order
+        Queries are deduplicated by their cache key and cached results reused; the fuzzy name
+        scores of every remaining query are computed in vectorized chunks.
+        """
+        keys = [self._search_key(query, max_results) for query in queries]
+        results: Dict[Tuple, Tuple[List[Dict], str]] = {}
+        pending: Dict[Tuple, str] = {}
+        for key, query in zip(keys, queries):
+            if key in results or key in pending:
+                continue
+            cached = self.search_cache.get(key)
+            if cached is None:
+                pending[key] = query
+            else:
+                metrics.record_search_hit('cache')
+                results[key] = cached
+
+        if pending:
+            found = self._search_many(list(pending.values()), max_results)
+            for key, result in zip(pending, found):
+                self.search_cache.set(key, result)
+                results[key] = result
+
+        return [([dict(product) for product in results[key][0]], results[key][1]) for key in keys]
+
+    def search_cache_stats(self) -> Dict:
+        """Hit/miss statistics of the search result cache"""
+        return self.search_cache.stats()
+
+    @staticmethod
+    def _search_key(query: str, max_results: int) -> Tuple[str, int]:
+        """Cache key shared by queries that only differ in case and whitespace"""
+        return ' '.join((query or '').lower().split()), max_results
+
+    def _search_many(self, queries: List[str], max_results: int) -> List[Tuple[List[Dict], str]]:
+        """Search cascade for several queries, fuzzy name scoring done for all of them at once"""
+        results: List[Optional[Tuple[List[Dict], str]]] = [None] * len(queries)
+        intents = [self._parse_intent(query) for query in queries]
+        fuzzy = []
+        for position, (query, intent) in enumerate(zip(queries, intents)):
+            results[position] = self._direct_search(query, max_results, intent)
+            if results[position] is None:
+                fuzzy.append(position)
+
+        if fuzzy:
+            texts = [self._text_query(queries[position], intents[position]) for position in fuzzy]
+            name_matches = self._fuzzy_name_matches(texts, max_results)
+            for position, text, matches in zip(fuzzy, texts, name_matches):
+                results[position] = self._fuzzy_cascade(text, max_results, matches, intents[position])
+        return results
+
+    def _search_cascade(self, query: str, max_results: int) -> Tuple[List[Dict], str]:
+        """Run the search strategies in priority order"""
+        intent = self._parse_intent(query)
+        direct = self._direct_search(query, max_results, intent)
+        if direct is not None:
+            return direct
+        return self._fuzzy_cascade(self._text_query(query, intent), max_results, intent=intent)
+
+    def _parse_intent(self, query: str) -> Optional[QueryIntent]:
+        """Structured filters of a query (None for empty queries or with intent routing disabled)"""
+        if not INTENT_ROUTING_ENABLED or not query or not query.strip():
+            return None
+        return self.intent_parser.parse(query.strip().lower())
+
+    @staticmethod
+    def _text_query(query: str, intent: Optional[QueryIntent]) -> str:
+        """Text the exact and fuzzy strategies search for: the query without price and sale words"""
+        if intent is not None and intent.text:
+            return intent.text
+        return query.strip().lower()
+
+    def _direct_search(self, query: str, max_results: int,
+                       intent: Optional[QueryIntent] = None) -> Optional[Tuple[List[Dict], str]]:
+        """Featured, structured-filter and exact results, or None when the fuzzy strategies must run"""
         if not query or not query.strip():
+            metrics.record_search_hit('featured')
             return self.get_featured_products(max_results), "Productos destacados"
 
         query = query.strip().lower()
-        results = []
-        search_description = ""
 
-        # Strategy 1: Exact text matching (highest priority)
-        exact_results = self._exact_search(query, max_results)
-        if exact_results:
-            return exact_results, f"Resultados exactos para: '{query}'"
-
-        # Strategy 2: Fuzzy product name matching
-        fuzzy_results = self._fuzzy_product_search(query, max_results)
-        if fuzzy_results:
-            results.extend(fuzzy_results)
-            search_description = f"Productos similares a: '{query}'"
-
-        # Strategy 3: Brand fuzzy matching
-        if not results:
-            brand_results = self._fuzzy_brand_search(query, max_results)
-            if brand_results:
-                results.extend(brand_results)
-                search_description = f"Productos de marca similar a: '{query}'"
-
-        # Strategy 4: Category fuzzy matching
-        if not results:
-            category_results = self._fuzzy_category_search(query, max_results)
-            if category_results:
-                results.extend(category_results)
-                search_description = f"Productos en categoría similar a: '{query}'"
-
-        # Strategy 5: Full text search with ranking
-        if not results:
-            text_results = self._ranked_text_search(query, max_results)
-            if text_results:
-                results.extend(text_results)
-                search_description = f"Resultados de búsqueda para: '{query}'"
-
-        # Strategy 6: Smart alternatives (without hardcoding)
-        if not results:
-            alternative_results = self._find_smart_alternatives(query, max_results)
-            if alternative_results:
-                results.extend(alternative_results)
-                search_description = f"Alternativas sugeridas para: '{query}'"
-
-        # Fallback: Popular products
-        if not results:
-            results = self.get_featured_products(max_results)
-            search_description = f"No se encontraron resultados para '{query}'. Productos populares:"
-
-        # Remove duplicates and rank by relevance
-        unique_results = self._remove_duplicates_and_rank(results, query)
-        return unique_results[:max_results], search_description
-
-    def _exact_search(self, query: str, max_results: int) -> List[Dict]:
+        # Strategy 0: Structured filters (brand, category, price, sale) from indexed lookups
+        if intent is not None and intent.has_filters:
+            with metrics.search_strategy('intent'):
+                intent_results = self._intent_search(intent, max_results)
+            if intent_results:
+                metrics.record_search_hit('intent')
+                return intent_results, f"Productos ({intent.describe()}) para: '{query}'"
+
+        # Strategy 1: Exact text matching (highest priority); price filters need every match
+        text = self._text_query(query, intent)
+        with metrics.search_strategy('exact'):
+            if self._price_filters(intent):
+                exact_rows = self._within_price(self._exact_search(text, None), intent)
+                exact_rows = self._price_ordered(exact_rows, intent.sort)[:max_results]
+            else:
+                exact_rows = self._exact_search(text, max_results)
+        if exact_rows:
+            metrics.record_search_hit('exact')
+            return self._format_rows(exact_rows), f"Resultados exactos para: '{text}'"
+        return None
+
+    def _fuzzy_cascade(self, query: str, max_results: int,
+                       name_matches: Optional[List[Tuple[str, int]]] = None,
+                       intent: Optional[QueryIntent] = None) -> Tuple[List[Dict], str]:
+        """
+        Fuzzy strategies in priority order, then relevance ranking (name matches may be precomputed)
+        The price bounds, sale filter and price order of `intent`, if any, apply to the results.
+        """
+        price_filters = self._price_filters(intent)
+        # Strategies 2-7: fuzzy name, brand, category, semantic, ranked text, smart alternatives
+        strategies = [
+            ('fuzzy_name', partial(self._fuzzy_product_search, matches=name_matches),
+             f"Productos similares a: '{query}'"),
+            ('fuzzy_brand', self._fuzzy_brand_search, f"Productos de marca similar a: '{query}'"),
+            ('fuzzy_category', self._fuzzy_category_search, f"Productos en categoría similar a: '{query}'"),
+            ('semantic', self._semantic_search, f"Productos relacionados con: '{query}'"),
+            ('ranked_text', self._ranked_text_search, f"Resultados de búsqueda para: '{query}'"),
+            ('alternatives', self._find_smart_alternatives, f"Alternativas sugeridas para: '{query}'"),
+        ]
+
+        # Strategies hand back row ids, plus any name similarity they already computed
+        rows, similarity = [], None
+        search_description = ""
+        for name, strategy, description in strategies:
+            with metrics.search_strategy(name):
+                rows, similarity = strategy(query, max_results)
+                if price_filters:
+                    rows = self._within_price(rows, intent)
+            if rows:
+                metrics.record_search_hit(name)
+                search_description = description
+                break
+
+        # Fallback: Popular products, or the cheapest/closest products within the price filters
+        if not rows:
+            metrics.record_search_hit('fallback')
+            if price_filters:
+                rows, similarity = self._price_fallback_rows(intent, max_results), None
+                search_description = (f"No se encontraron resultados para '{query}'. "
+                                      f"Otros productos {intent.describe(facets=False)}:" if rows else
+                                      f"No se encontraron resultados para '{query}' ({intent.describe()})")
+            else:
+                rows, similarity = self._featured_rows(max_results), None
+                search_description = f"No se encontraron resultados para '{query}'. Productos populares:"
+
+        # Remove duplicates and rank by relevance; only the top rows are formatted
+        with metrics.search_strategy('ranking'):
+            top_rows = self.ranker.rank(query, rows, max_results, similarity)
+            if price_filters:
+                top_rows = self._price_ordered(top_rows, intent.sort)
+        return self._format_rows(top_rows), search_description
+
+    def _price_fallback_rows(self, intent: QueryIntent, max_results: int) -> List[int]:
+        """Rows within the price bounds and sale filter of a query, in its price order (maybe none)"""
+        rows = self.price_index.select(intent.min_price, intent.max_price, on_sale=intent.on_sale)
+        if intent.sort == 'desc':
+            rows = rows[::-1]
+        return rows[:max_results].tolist()
+
+    @staticmethod
+    def _price_filters(intent: Optional[QueryIntent]) -> bool:
+        return intent is not None and (intent.has_price or bool(intent.on_sale))
+
+    def _within_price(self, rows: List[int], intent: QueryIntent) -> List[int]:
+        """Rows within the price bounds and sale filter of a query"""
+        prices = self.records.columns['price']
+        on_sale = self.records.columns['on_sale']
+        low = -np.inf if intent.min_price is None else intent.min_price
+        high = np.inf if intent.max_price is None else intent.max_price
+        return [row for row in rows if low <= prices[row] <= high and (not intent.on_sale or on_sale[row])]
+
+    def _price_ordered(self, rows: List[int], sort: Optional[str]) -> List[int]:
+        """Rows by final price for 'asc'/'desc' (stable, so ties keep their order), as they are for None"""
+        if sort is None:
+            return rows
+        prices = self.records.columns['price']
+        return sorted(rows, key=lambda row: prices[row], reverse=(sort == 'desc'))
+
+    def _intent_search(self, intent: QueryIntent, max_results: int) -> List[Dict]:
+        """
+        Products matching the structured filters of a query, narrowed by its residual words
+        Filtered rows come from the price or facet index. Under a brand or category filter the
+        residual words only rank them; price and sale filters alone keep the rows naming a
+        residual word, and are empty when none does, so the text strategies run.
+        """
+        categories = intent.categories or None
+        brands = intent.brands or None
+        if intent.has_price:
+            rows = self.price_index.select(intent.min_price, intent.max_price, category=categories,
+                                           brand=brands, on_sale=intent.on_sale)
+            if intent.sort == 'desc':
+                rows = rows[::-1]
+        else:
+            rows = self.facet_index.select_rows({'category': categories, 'brand': brands, 'on_sale': intent.on_sale})
+
+        if len(rows) and intent.residual:
+            rows = self._rank_residual(rows, intent.residual, keep_unmatched=bool(categories or brands))
+        return self._format_rows(rows[:max_results].tolist())
+
+    def _rank_residual(self, rows: np.ndarray, words: List[str], keep_unmatched: bool) -> np.ndarray:
+        """
+        Filtered rows naming the most residual words first: as whole tokens, or else as word
+        prefixes ("tablet" for "Galaxy Tab"). The rows naming none follow when keep_unmatched is
+        set (a brand/category filter still holds); otherwise they are dropped.
+        """
+        counts = self.text_scorer.token_counts(words, rows)
+        if not counts.any():
+            counts = self.text_scorer.prefix_counts(words, rows)
+        if not counts.any():
+            return rows if keep_unmatched else rows[:0]
+        # Stable sort keeps the price/catalog order among rows with the same count
+        order = np.argsort(-counts, kind='stable')
+        return rows[order] if keep_unmatched else rows[order[:np.count_nonzero(counts)]]
+
+    def _exact_search(self, query: str, max_results: Optional[int]) -> List[int]:
         """Exact text matching in product names, brands, categories"""
-        mask = (
-            self.df['nombre_de_producto'].str.lower().str.contains(query, na=False) |
-            self.df['marca'].str.lower().str.contains(query, na=False) |
-            self.df['categoria'].str.lower().str.contains(query, na=False)
-        )
-        results = self.df[mask].head(max_results)
-        return self._format_products(results)
-
-    def _fuzzy_product_search(self, query: str, max_results: int) -> List[Dict]:
+        return self.inverted_index.find_substring(query, limit=max_results)
+
+    def _fuzzy_product_search(self, query: str, max_results: int,
+                              matches: Optional[List[Tuple[str, int]]] = None) -> RowMatches:
         """Fuzzy matching on product names"""
         if not self.search_index['product_names']:
-            return []
-
-        # Find best matches using fuzzy matching
-        matches = process.extract(query, self.search_index['product_names'],
-                                limit=max_results, scorer=fuzz.partial_ratio)
+            return [], None
 
-        # Filter matches with decent score (>60)
-        good_matches = [match for match in matches if match[1] > 60]
+        # Best names with a decent score (>60), unless the batch already scored this query
+        good_matches = matches if matches is not None else self._fuzzy_name_match(query, max_results)
 
         if not good_matches:
-            return []
+            return [], None
 
-        # Get products for the best matches
+        # Rows of the best matches, keeping their scores for the relevance ranking
         matched_names = [match[0] for match in good_matches]
-        mask = self.df['nombre_de_producto'].str.lower().isin(matched_names)
-        results = self.df[mask]
-        return self._format_products(results)
+        rows = self.ranker.rows_with_names(matched_names)
+        scores = dict(good_matches)
+        similarity = {row: scores[self.search_index['product_names'][row]] / 100 for row in rows}
+        return rows, similarity
 
-    def _fuzzy_brand_search(self, query: str, max_results: int) -> List[Dict]:
-        """Fuzzy matching on brand names"""
-        unique_brands = list(self.brands)
-        matches = process.extract(query, unique_brands, limit=3, scorer=fuzz.partial_ratio)
-        good_matches = [match for match in matches if match[1] > 70]
+    def _fuzzy_name_match(self, query: str, limit: int) -> List[Tuple[str, int]]:
+        """Up to `limit` (name, partial_ratio) pairs scoring above FUZZY_NAME_MIN_SCORE"""
+        matches = process.extract(query, self.search_index['product_names'], limit=limit, scorer=fuzz.partial_ratio)
+        return [match for match in matches if match[1] > FUZZY_NAME_MIN_SCORE]
 
-        if not good_matches:
-            return []
+    def _fuzzy_name_matches(self, queries: List[str], limit: int) -> List[List[Tuple[str, int]]]:
+        """
+        _fuzzy_name_match for many queries, with the same results
+        With rapidfuzz, a chunk of queries is scored against every name in one cdist call; those
+        scores bound fuzzywuzzy's, so only names that can still make a query's top `limit` are
+        scored with fuzzywuzzy.
+        """
+        if rapid_process is None:
+            return [self._fuzzy_name_match(query, limit) for query in queries]
+
+        names = self.search_index['product_names']
+        processed_names = self.search_index['processed_names']
+        # Queries equal after preprocessing are scored once
+        processed = [fuzz_utils.full_process(query) for query in queries]
+        distinct = list(dict.fromkeys(processed))
+        by_query = {}
+        step = max(1, BATCH_SCORE_CELLS // max(len(names), 1))
+        for start in range(0, len(distinct), step):
+            chunk = distinct[start:start + step]
+            # Names that can't score above the minimum are cut off early (reported as 0)
+            bounds = ratio_bounds(rapid_process.cdist(chunk, processed_names, scorer=rapid_fuzz.partial_ratio,
+                                                      dtype=np.float64, workers=-1,
+                                                      score_cutoff=FUZZY_NAME_MIN_SCORE))
+            for query, row_bounds in zip(chunk, bounds):
+                top = RankedTextScorer.bounded_top_k(
+                    row_bounds, lambda row, query=query: partial_ratio(query, processed_names[row]),
+                    limit, min_score=FUZZY_NAME_MIN_SCORE)
+                # Exact scores are memoized, so reading them back costs nothing
+                by_query[query] = [(names[i], partial_ratio(query, processed_names[i])) for i in top]
+        return [by_query[query] for query in processed]
+
+    def _fuzzy_brand_search(self, query: str, max_results: int) -> RowMatches:
+        """Fuzzy matching on brand names"""
+        matched_brands = self.brand_resolver.resolve(query, limit=3, min_score=70, strict=True)
+        if not matched_brands:
+            return [], None
 
-        matched_brands = [match[0] for match in good_matches]
-        mask = self.df['marca'].isin(matched_brands)
-        results = self.df[mask].head(max_results)
-        return self._format_products(results)
+        return self.facet_index.rows(max_results, brand=matched_brands), None
 
-    def _fuzzy_category_search(self, query: str, max_results: int) -> List[Dict]:
+    def _fuzzy_category_search(self, query: str, max_results: int) -> RowMatches:
         """Fuzzy matching on categories"""
-        unique_categories = list(self.categories)
-        matches = process.extract(query, unique_categories, limit=2, scorer=fuzz.partial_ratio)
-        good_matches = [match for match in matches if match[1] > 70]
+        matched_categories = self.category_resolver.resolve(query, limit=2, min_score=70, strict=True)
+        if not matched_categories:
+            return [], None
 
-        if not good_matches:
-            return []
+        return self.facet_index.rows(max_results, category=matched_categories), None
 
-        matched_categories = [match[0] for match in good_matches]
-        mask = self.df['categoria'].isin(matched_categories)
-        results = self.df[mask].head(max_results)
-        return self._format_products(results)
+    def _semantic_search(self, query: str, max_results: int) -> RowMatches:
+        """Nearest products in embedding space"""
+        if self.semantic_index is None:
+            return [], None
 
-    def _ranked_text_search(self, query: str, max_results: int) -> List[Dict]:
-        """Full text search with ranking"""
-        query_words = query.split()
-        scores = []
-
-        for idx, text in enumerate(self.search_index['full_text']):
-            score = 0
-            for word in query_words:
-                if word in text:
-                    score += len(word)  # Longer words get higher scores
-                # Add partial matching score
-                score += fuzz.partial_ratio(word, text) / 100
-            scores.append((idx, score))
-
-        # Sort by score and get top results
-        scores.sort(key=lambda x: x[1], reverse=True)
-        top_indices = [idx for idx, score in scores[:max_results] if score > 0.5]
-
-        if not top_indices:
-            return []
+        try:
+            matches = self.semantic_index.search(query, max_results)
+        except Exception as e:
+            logger.error(f"Semantic search failed: {e}")
+            return [], None
 
-        results = self.df.iloc[top_indices]
-        return self._format_products(results)
+        return [row for row, _ in matches], None
 
-    def _find_smart_alternatives(self, query: str, max_results: int) -> List[Dict]:
+    def _ranked_text_search(self, query: str, max_results: int) -> RowMatches:
+        """Full text search with ranking"""
+        # Longer contained words score higher, plus partial matching for every word
+        return self.text_scorer.search(query.split(), max_results), None
+
+    def _find_smart_alternatives(self, query: str, max_results: int) -> RowMatches:
         """
         Find smart alternatives without hardcoding
         Uses semantic similarity and product relationships
@@ -217,174 +562,108 @@ class ProductDatabase:
         alternatives = []
         for word in query_words:
             if len(word) > 2:  # Skip short words
-                word_results = self._exact_search(word, max_results // 2)
-                alternatives.extend(word_results)
-
-        return alternatives
-
-    def _remove_duplicates_and_rank(self, products: List[Dict], query: str) -> List[Dict]:
-        """Remove duplicates and rank by relevance to query"""
-        seen_names = set()
-        unique_products = []
-
-        for product in products:
-            if product['name'] not in seen_names:
-                seen_names.add(product['name'])
-                # Calculate relevance score
-                relevance_score = self._calculate_relevance(product, query)
-                product['_relevance_score'] = relevance_score
-                unique_products.append(product)
+                alternatives.extend(self._exact_search(word, max_results // 2))
 
-        # Sort by relevance score (descending)
-        unique_products.sort(key=lambda x: x.get('_relevance_score', 0), reverse=True)
+        return alternatives, None
 
-        # Remove the temporary score field
-        for product in unique_products:
-            product.pop('_relevance_score', None)
-
-        return unique_products
-
-    def _calculate_relevance(self, product: Dict, query: str) -> float:
-        """Calculate relevance score for ranking"""
-        score = 0.0
-        query_lower = query.lower()
-
-        # Exact name match gets highest score
-        if query_lower in product['name'].lower():
-            score += 10.0
-
-        # Brand match
-        if query_lower in product['brand'].lower():
-            score += 5.0
-
-        # Category match
-        if query_lower in product['category'].lower():
-            score += 3.0
-
-        # Fuzzy similarity score
-        name_similarity = fuzz.partial_ratio(query_lower, product['name'].lower()) / 100
-        score += name_similarity * 2
-
-        # Boost products on sale
-        if product['on_sale']:
-            score += 1.0
-
-        # Boost products with good availability
-        if product['units_available'] > 10:
-            score += 0.5
-
-        return score
 
     def get_products_by_category(self, category: str, max_results: int = 10) -> List[Dict]:
         """Get products by category with fuzzy matching"""
-        matches = process.extract(category, list(self.categories), limit=1, scorer=fuzz.partial_ratio)
-        if not matches or matches[0][1] < 60:
+        matches = self.category_resolver.resolve(category, limit=1, min_score=60)
+        if not matches:
             return []
 
-        best_category = matches[0][0]
-        mask = self.df['categoria'] == best_category
-        results = self.df[mask].head(max_results)
-        return self._format_products(results)
+        best_category = matches[0]
+        return self._format_rows(self.facet_index.rows(max_results, category=best_category))
 
     def get_products_by_brand(self, brand: str, max_results: int = 10) -> List[Dict]:
         """Get products by brand with fuzzy matching"""
-        matches = process.extract(brand, list(self.brands), limit=1, scorer=fuzz.partial_ratio)
-        if not matches or matches[0][1] < 60:
+        matches = self.brand_resolver.resolve(brand, limit=1, min_score=60)
+        if not matches:
             return []
 
-        best_brand = matches[0][0]
-        mask = self.df['marca'] == best_brand
-        results = self.df[mask].head(max_results)
-        return self._format_products(results)
+        best_brand = matches[0]
+        return self._format_rows(self.facet_index.rows(max_results, brand=best_brand))
 
     def get_products_on_sale(self, max_results: int = 10) -> List[Dict]:
         """Get products currently on sale"""
         if self.df is None:
             return []
 
-        mask = self.df['en_descuento'] == True
-        results = self.df[mask].head(max_results)
-        return self._format_products(results)
+        return self._format_rows(self.facet_index.rows(max_results, on_sale=True))
 
-    def get_products_by_price_range(self, min_price: float = None, max_price: float = None, max_results: int = 10) -> List[Dict]:
-        """Get products within price range"""
-        if self.df is None:
+    def get_products_by_price_range(self, min_price: float = None, max_price: float = None, max_results: int = 10,
+                                    sort: Optional[str] = 'asc', category: Optional[str] = None,
+                                    brand: Optional[str] = None, on_sale: Optional[bool] = None) -> List[Dict]:
+        """
+        Get products whose final (discounted) price is within the range
+        Sorted by price ('asc'/'desc') or catalog order (None), optionally filtered
+        by exact category/brand name and sale status
+        """
+        if self.price_index is None:
             return []
 
-        mask = pd.Series([True] * len(self.df))
-
-        if min_price is not None:
-            mask &= self.df['precio'] >= min_price
-
-        if max_price is not None:
-            mask &= self.df['precio'] <= max_price
-
-        results = self.df[mask].head(max_results)
-        return self._format_products(results)
+        rows = self.price_index.query(min_price, max_price, category=category, brand=brand,
+                                      on_sale=on_sale, sort=sort, limit=max_results)
+        return self._format_rows(rows)
 
     def get_featured_products(self, max_results: int = 10) -> List[Dict]:
         """Get featured products (mix of popular brands and good prices)"""
         if self.df is None:
             return []
 
+        return self._format_rows(self._featured_rows(max_results))
+
+    def _featured_rows(self, max_results: int) -> List[int]:
+        """Rows of the featured products: premium brands first, then products on sale"""
         # Prioritize Apple, Samsung, Sony, Nike, Adidas products
         premium_brands = ['Apple', 'Samsung', 'Sony', 'Nike', 'Adidas', 'Gucci', 'Prada']
 
         # Get some premium brand products
-        premium_mask = self.df['marca'].isin(premium_brands)
-        premium_products = self.df[premium_mask].head(max_results // 2)
+        premium_rows = self.facet_index.rows(max_results // 2, brand=premium_brands)
 
         # Get some products on sale
-        sale_mask = self.df['en_descuento'] == True
-        sale_products = self.df[sale_mask].head(max_results // 2)
+        sale_rows = self.facet_index.rows(max_results // 2, on_sale=True)
 
         # Combine and remove duplicates
-        featured = pd.concat([premium_products, sale_products]).drop_duplicates().head(max_results)
-
-        return self._format_products(featured)
-
-    def _format_products(self, df_subset: pd.DataFrame) -> List[Dict]:
-        """Format DataFrame subset into product dictionaries"""
-        products = []
-
-        for _, row in df_subset.iterrows():
-            # Calculate final price (with discount if applicable)
-            final_price = row['precio']
-            if row['en_descuento'] and pd.notna(row['precio_de_descuento']):
-                final_price = row['precio_de_descuento']
-
-            # Create description
-            description = f"{row['marca']} - {row['categoria']}"
-            if row['en_descuento']:
-                discount_pct = int(((row['precio'] - final_price) / row['precio']) * 100) if final_price < row['precio'] else 0
-                description += f" - ¡{discount_pct}% de descuento!"
-
-            product = {
-                'name': row['nombre_de_producto'],
-                'brand': row['marca'],
-                'category': row['categoria'],
-                'price': final_price,
-                'original_price': row['precio'] if row['en_descuento'] else None,
-                'on_sale': bool(row['en_descuento']),
-                'units_available': int(row['unidades_disponibles']),
-                'description': description,
-                'shipping': row['metodo_de_envio'],
-                'payment_methods': row['metodos_de_pago'],
-                'financing': row['opciones_de_financiacion'],
-                'return_policy': row['politicas_de_devolucion']
-            }
-            products.append(product)
-
-        return products
+        return list(dict.fromkeys(premium_rows + sale_rows))[:max_results]
+
+    def filter_products(self, max_results: int = 10, **filters) -> Dict:
+        """
+        Products matching any combination of category, brand and on_sale filters
+        (exact names, a value or a list of values), with the total and per-facet counts
+        """
+        result = self.facet_index.query(filters, limit=max_results)
+        return {
+            'products': self._format_rows(result['rows']),
+            'total': result['total'],
+            'facets': result['facets'],
+        }
+
+    def _format_rows(self, rows: List[int]) -> List[Dict]:
+        """Gather precomputed product dictionaries for row positions"""
+        return self.records.gather(rows)
 
     # Backward compatibility - alias for intelligent_search
     def smart_search(self, user_query: str, max_results: int = 8) -> Tuple[List[Dict], str]:
         """Alias for intelligent_search for backward compatibility"""
         return self.intelligent_search(user_query, max_results)
 
-# Global instance
-product_db = ProductDatabase()
+# Global instance, created on first use so importing this module stays cheap
+_product_db = None
+_product_db_lock = threading.Lock()
 
 def get_product_database() -> ProductDatabase:
     """Get the global product database instance"""
-    return product_db
\ No newline at end of file
+    global _product_db
+    if _product_db is None:
+        with _product_db_lock:
+            if _product_db is None:
+                _product_db = ProductDatabase()
+    return _product_db
+
+def set_product_database(db: ProductDatabase):
+    """Atomically replace the global instance (requests holding the old one keep using it)"""
+    global _product_db
+    with _product_db_lock:
+        _product_db = db
\ No newline at end of file
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Product Records Module - Columnar precomputed product responses
+Derived fields (final price, discount, description) are computed once at load time
+"""
+
+from typing import List, Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+class ProductRecords:
+    """
+    Column-oriented storage of the product dictionaries returned by the API.
+
+    Every response field is a plain Python list aligned by row position, so
+    formatting a result set is an index gather with no pandas work per request.
+    """
+
+    FIELDS = (
+        'name', 'brand', 'category', 'price', 'original_price', 'on_sale',
+        'units_available', 'description', 'shipping', 'payment_methods',
+        'financing', 'return_policy',
+    )
+
+    # Fields derived from the price, sale and stock columns
+    PRICE_STOCK_FIELDS = ('price', 'original_price', 'on_sale', 'units_available', 'description')
+
+    def __init__(self, columns: Dict[str, list]):
+        self.columns = columns
+        self._field_columns = [(field, columns[field]) for field in self.FIELDS]
+
+    def __len__(self) -> int:
+        return len(self.columns['name'])
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'ProductRecords':
+        """Precompute every response field from the catalog DataFrame"""
+        price = df['precio'].to_numpy(dtype=np.float64)
+        discount_price = df['precio_de_descuento'].to_numpy(dtype=np.float64)
+        on_sale = df['en_descuento'].fillna(False).astype(bool).to_numpy()
+
+        # Final price (with discount if applicable)
+        final_price = np.where(on_sale & ~np.isnan(discount_price), discount_price, price)
+
+        # Discount percentage, truncated like int() for on-sale products only
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = np.trunc((price - final_price) / price * 100)
+        discount_pct = np.where(on_sale & (final_price < price), pct, 0).astype(int)
+
+        brands = df['marca'].tolist()
+        categories = df['categoria'].tolist()
+        descriptions = [
+            f"{brand} - {category} - ¡{pct}% de descuento!" if sale else f"{brand} - {category}"
+            for brand, category, sale, pct in zip(brands, categories, on_sale.tolist(), discount_pct.tolist())
+        ]
+
+        columns = {
+            'name': df['nombre_de_producto'].tolist(),
+            'brand': brands,
+            'category': categories,
+            'price': final_price.tolist(),
+            'original_price': [p if sale else None for p, sale in zip(price.tolist(), on_sale.tolist())],
+            'on_sale': on_sale.tolist(),
+            'units_available': df['unidades_disponibles'].fillna(0).astype(int).tolist(),
+            'description': descriptions,
+            'shipping': df['metodo_de_envio'].tolist(),
+            'payment_methods': df['metodos_de_pago'].tolist(),
+            'financing': df['opciones_de_financiacion'].tolist(),
+            'return_policy': df['politicas_de_devolucion'].tolist(),
+        }
+        return cls(columns)
+
+    def with_updates(self, df: pd.DataFrame, rows: List[int]) -> 'ProductRecords':
+        """Copy of these records with price/stock fields of `rows` recomputed from `df`"""
+        patch = ProductRecords.from_dataframe(df.iloc[rows])
+        columns = dict(self.columns)
+        for field in self.PRICE_STOCK_FIELDS:
+            column = list(columns[field])
+            for value, row in zip(patch.columns[field], rows):
+                column[row] = value
+            columns[field] = column
+        return ProductRecords(columns)
+
+    def gather(self, rows: Iterable[int]) -> List[Dict]:
+        """Build fresh product dictionaries for the given row positions"""
+        field_columns = self._field_columns
+        return [{field: column[row] for field, column in field_columns} for row in rows]
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Prompt Builder Module - Token-budgeted prompt assembly
+Product lines, a rolling conversation summary and the most recent messages are packed into
+PROMPT_TOKEN_BUDGET tokens counted with tiktoken. Messages that no longer fit, or that the
+session store drops, are condensed into the summary instead of disappearing from the prompt.
+"""
+
+import os
+import logging
+from functools import lru_cache
+from typing import Dict, List
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+from voice_pipeline import split_sentences
+
+logger = logging.getLogger(__name__)
+
+# Tokens for the prompt context (summary, recent messages, products); the user message is extra
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '400'))
+PROMPT_MESSAGE_TOKENS = int(os.getenv('PROMPT_MESSAGE_TOKENS', '60'))
+PROMPT_SUMMARY_TOKENS = int(os.getenv('PROMPT_SUMMARY_TOKENS', '120'))
+PROMPT_ENCODING = os.getenv('PROMPT_ENCODING', 'cl100k_base')
+
+# Products listed in the prompt
+MAX_PROMPT_PRODUCTS = 6
+
+# Tokens kept per condensed message in the summary
+SUMMARY_LINE_TOKENS = 25
+
+# Characters per token assumed when tiktoken is not installed
+CHARS_PER_TOKEN = 4
+
+ELLIPSIS = '...'
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        logger.info("tiktoken not installed, estimating prompt tokens from length")
+        return None
+    return tiktoken.get_encoding(PROMPT_ENCODING)
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str) -> int:
+    """Tokens in a piece of prompt text (memoized: history lines repeat on every turn)"""
+    encoding = _encoding()
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Text cut to at most max_tokens tokens, marked with an ellipsis when cut"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _encoding()
+    if encoding is None:
+        return text[:max(max_tokens - 1, 0) * CHARS_PER_TOKEN].rstrip() + ELLIPSIS
+    return encoding.decode(encoding.encode(text)[:max(max_tokens - 1, 0)]).rstrip() + ELLIPSIS
+
+
+def message_line(message: Dict, max_tokens: int = PROMPT_MESSAGE_TOKENS) -> str:
+    role = "Usuario" if message['role'] == 'user' else "Asistente"
+    return f"{role}: {truncate_tokens(' '.join(message['content'].split()), max_tokens)}"
+
+
+def condense(message: Dict) -> str:
+    """Summary line of one message: its first sentence, capped at SUMMARY_LINE_TOKENS"""
+    content = ' '.join(message['content'].split())
+    sentences, remainder = split_sentences(content)
+    first = sentences[0] if sentences else remainder
+    return message_line({'role': message['role'], 'content': first}, SUMMARY_LINE_TOKENS)
+
+
+def summarize(summary: str, messages: List[Dict], max_tokens: int = PROMPT_SUMMARY_TOKENS) -> str:
+    """
+    Fold messages into a rolling summary (one condensed line per message)
+    The oldest lines go first once the summary exceeds max_tokens.
+    """
+    lines = [line for line in summary.splitlines() if line] + [condense(m) for m in messages]
+    kept = []
+    used = 0
+    for line in reversed(lines):
+        tokens = count_tokens(line) + 1
+        if used + tokens > max_tokens:
+            break
+        kept.append(line)
+        used += tokens
+    return '\n'.join(reversed(kept))
+
+
+def products_block(products: List[Dict], search_description: str = "") -> List[str]:
+    """Header and one line per listed product"""
+    if not products:
+        return []
+    # Alternative suggestions carry their explanation instead of the generic header
+    lines = [search_description if "No tenemos" in search_description else "PRODUCTOS RELEVANTES:"]
+    for i, p in enumerate(products[:MAX_PROMPT_PRODUCTS], 1):
+        price = f"${p['price']:.0f}"
+        if p['on_sale'] and p['original_price']:
+            price = f"${p['price']:.0f} (¡oferta!)"
+        lines.append(f"{i}. {p['name']} - {p['brand']} - {price}")
+    return lines
+
+
+def build_context(history: List[Dict], products: List[Dict], search_description: str = "",
+                  summary: str = "", budget: int = PROMPT_TOKEN_BUDGET) -> str:
+    """
+    Prompt context for a turn, within `budget` tokens
+    `history` holds the messages before the current one and `summary` the session's rolling
+    summary of messages already dropped. Products are packed first, then the newest messages;
+    earlier messages that do not fit are folded into the summary.
+    """
+    product_lines = []
+    used = 0
+    for line in products_block(products, search_description):
+        tokens = count_tokens(line) + 1
+        if used + tokens > budget:
+            break
+        product_lines.append(line)
+        used += tokens
+
+    # Space for the summary is held back only when there is one or the history overflows
+    lines = [message_line(message) for message in history]
+    history_tokens = sum(count_tokens(line) + 1 for line in lines)
+    overflows = used + history_tokens > budget
+    reserve = min(PROMPT_SUMMARY_TOKENS, max(budget - used, 0)) if summary or overflows else 0
+    recent = []
+    for line in reversed(lines):
+        tokens = count_tokens(line) + 1
+        if used + reserve + tokens > budget:
+            break
+        recent.append(line)
+        used += tokens
+    recent.reverse()
+
+    older = history[:len(history) - len(recent)]
+    if older or summary:
+        summary = summarize(summary, older, reserve)
+
+    context = "CONTEXTO RECIENTE:\n"
+    if summary:
+        context += f"Resumen de la conversación:\n{summary}\n"
+    context += ''.join(f"{line}\n" for line in recent)
+    context += "\n" + ''.join(f"{line}\n" for line in product_lines)
+    return context
+
+
+def render_prompt(context: str, user_message: str) -> str:
+    """Full prompt for the current user message"""
+    return f"""
+{context}
+
+USUARIO: {user_message}
+
+RESPUESTA (máximo 2-3 oraciones, específica con precios, promociona productos relevantes):"""
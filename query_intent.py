@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Query Intent Module - Structured filters extracted from shopper utterances
+Brand and category mentions are found in one pass with an Aho-Corasick automaton built
+from the catalog; price expressions ("menos de 500", "entre 200 y 500") and sale/cheap
+keywords are parsed with regular expressions. What is left is the residual text.
+"""
+
+import re
+import unicodedata
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Quantities that are not prices ("hasta 2 años", "entre 3 y 5 años", "menos de 64 gb")
+UNITS = (r'anos?|meses|mes|semanas|dias|horas|gb|tb|mb|mp|mah|hz|w|pulgadas|cm|mm|kg|gr?|litros?|ml|'
+         r'piezas|personas|jugadores|puertos|velocidades')
+NUMBER = rf'\$?\s*(\d+(?:[.,]\d+)*)(?![\d.,]|\s*(?:{UNITS})\b)\s*(mil\b)?\s*(?:d[oó]lares|pesos|usd)?'
+
+PRICE_BETWEEN = re.compile(rf'\bentre\s+{NUMBER}\s+(?:y|a)\s+{NUMBER}')
+# "de N a M" is a price range only with a currency marker ("juguetes de 3 a 5 años" is an age range)
+PRICE_FROM_TO = re.compile(rf'\bde\s+{NUMBER}\s+(?:a|hasta)\s+{NUMBER}')
+CURRENCY = re.compile(r'\$|\b(?:d[oó]lares|pesos|usd)\b')
+PRICE_MAX = re.compile(
+    rf'\b(?:menos\s+de|menor\s+a|menor\s+de|por\s+debajo\s+de|debajo\s+de|bajo|hasta|maximo|'
+    rf'no\s+mas\s+de|que\s+no\s+pase\s+de|por\s+menos\s+de)\s+{NUMBER}')
+PRICE_MIN = re.compile(rf'\b(?:mas\s+de|mayor\s+a|mayor\s+de|por\s+encima\s+de|arriba\s+de|desde|minimo)\s+{NUMBER}')
+
+SALE_WORDS = re.compile(r'\b(?:en\s+)?(?:ofertas?|descuentos?|rebajas?|rebajad[oa]s?|promocion(?:es)?|promos?|liquidacion)\b')
+CHEAP_WORDS = re.compile(r'\b(?:(?:lo\s+)?mas\s+barat[oa]s?|barat[oa]s?|economic[oa]s?|de\s+bajo\s+precio)\b')
+
+# Punctuation around a word that no product name relies on ("¿tienes iphone?")
+WORD_PUNCTUATION = '¿?¡!.,;:"()'
+
+# Filler words that carry no product meaning in spoken requests
+STOPWORDS = {
+    'quiero', 'queria', 'busco', 'buscando', 'necesito', 'tienes', 'tienen', 'hay', 'me', 'puedes', 'mostrar',
+    'muestrame', 'dame', 'recomienda', 'recomiendas', 'algo', 'algun', 'alguna', 'alguno', 'un', 'una', 'unos',
+    'unas', 'el', 'la', 'los', 'las', 'de', 'del', 'en', 'con', 'para', 'por', 'que', 'y', 'o', 'a', 'al', 'mi',
+    'marca', 'productos', 'producto', 'cosas', 'favor', 'hola', 'precio', 'precios', 'dolares', 'pesos', 'es',
+    'sea', 'este', 'esta', 'tengas', 'tenga', 'mas', 'muy', 'super', 'bueno', 'buena', 'buenos', 'buenas',
+}
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents, keeping one character per input character"""
+    return ''.join(unicodedata.normalize('NFKD', char)[0] for char in text.lower())
+
+
+def strip_filler(words: List[str]) -> List[str]:
+    """Words without the filler at either end ("quiero un iphone" -> "iphone", "juegos de mesa" stays)"""
+    start, end = 0, len(words)
+    while start < end and fold(words[start]) in STOPWORDS:
+        start += 1
+    while end > start and fold(words[end - 1]) in STOPWORDS:
+        end -= 1
+    return words[start:end]
+
+
+def parse_number(digits: str, thousands: Optional[str] = None) -> float:
+    """'1,500' / '1.500' -> 1500, '99.90' -> 99.9, '5' + 'mil' -> 5000"""
+    groups = re.split(r'[.,]', digits)
+    if len(groups) > 1 and all(len(group) == 3 for group in groups[1:]):
+        value = float(''.join(groups))
+    else:
+        value = float(digits.replace(',', '.')) if len(groups) == 2 else float(''.join(groups))
+    return value * 1000 if thousands else value
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: every dictionary phrase found in a text in a single pass"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Any]]] = [[]]
+
+    def add(self, pattern: str, value: Any):
+        """Register a pattern (already folded) and the value reported when it matches"""
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append((len(pattern), value))
+
+    def build(self) -> 'AhoCorasick':
+        """Compute failure links breadth-first"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+        return self
+
+    def find(self, text: str) -> List[Tuple[int, int, Any]]:
+        """All (start, end, value) matches, overlapping ones included"""
+        matches = []
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for length, value in self._output[node]:
+                matches.append((end - length, end, value))
+        return matches
+
+
+class QueryIntent:
+    """Structured filters plus the residual free text of one query"""
+
+    def __init__(self):
+        self.brands: List[str] = []
+        self.categories: List[str] = []
+        self.min_price: Optional[float] = None
+        self.max_price: Optional[float] = None
+        self.on_sale: Optional[bool] = None
+        self.cheap = False
+        self.residual: List[str] = []
+        # The query without its price, sale and cheap expressions or leading/trailing filler words
+        # (for the text strategies)
+        self.text = ''
+
+    @property
+    def has_filters(self) -> bool:
+        """Filters that select rows; "barato" alone only orders the results of the text search"""
+        return bool(self.brands or self.categories or self.on_sale
+                    or self.min_price is not None or self.max_price is not None)
+
+    @property
+    def has_price(self) -> bool:
+        return self.cheap or self.min_price is not None or self.max_price is not None
+
+    @property
+    def sort(self) -> Optional[str]:
+        """Price order implied by the query: cheapest first, or closest to the budget"""
+        if self.cheap:
+            return 'asc'
+        if self.max_price is not None and self.min_price is None:
+            return 'desc'
+        return 'asc' if self.has_price else None
+
+    def describe(self, facets: bool = True) -> str:
+        """Spanish summary of the filters, e.g. 'Nike, en oferta, hasta $500' (no brands/categories without facets)"""
+        parts = self.brands + self.categories if facets else []
+        if self.on_sale:
+            parts.append('en oferta')
+        if self.min_price is not None and self.max_price is not None:
+            parts.append(f"entre ${self.min_price:.0f} y ${self.max_price:.0f}")
+        elif self.max_price is not None:
+            parts.append(f"hasta ${self.max_price:.0f}")
+        elif self.min_price is not None:
+            parts.append(f"desde ${self.min_price:.0f}")
+        if self.cheap:
+            parts.append('más baratos primero')
+        return ', '.join(parts)
+
+    def to_dict(self) -> Dict:
+        return {
+            'brands': self.brands, 'categories': self.categories, 'min_price': self.min_price,
+            'max_price': self.max_price, 'on_sale': self.on_sale, 'sort': self.sort, 'residual': self.residual,
+        }
+
+
+def category_aliases(category: str) -> List[str]:
+    """Phrases a shopper may use for a category: the full name and its parts, singular and plural"""
+    folded = fold(category)
+    aliases = {folded}
+    for part in re.split(r',\s*|\s+y\s+', folded):
+        part = part.strip()
+        if len(part) < 4:
+            continue
+        aliases.add(part)
+        aliases.add(part[:-1] if part.endswith('s') else part + 's')
+    return sorted(aliases)
+
+
+class IntentParser:
+    """Extracts brands, categories, price bounds and sale/cheap intent from a query"""
+
+    def __init__(self, brands: Iterable[str], categories: Iterable[str]):
+        self.automaton = AhoCorasick()
+        for brand in brands:
+            if isinstance(brand, str) and brand.strip():
+                self.automaton.add(fold(brand.strip()), ('brand', brand))
+        for category in categories:
+            if isinstance(category, str) and category.strip():
+                for alias in category_aliases(category):
+                    self.automaton.add(alias, ('category', category))
+        self.automaton.build()
+
+    @staticmethod
+    def _is_word(text: str, start: int, end: int) -> bool:
+        """The match is not part of a longer word"""
+        return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+
+    def _dictionary_matches(self, text: str) -> List[Tuple[int, int, Tuple[str, str]]]:
+        """Leftmost-longest, non-overlapping whole-word brand/category matches"""
+        matches = [m for m in self.automaton.find(text) if self._is_word(text, m[0], m[1])]
+        matches.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+
+        selected = []
+        last_end = 0
+        for start, end, value in matches:
+            if start >= last_end:
+                selected.append((start, end, value))
+                last_end = end
+        return selected
+
+    def parse(self, query: str) -> QueryIntent:
+        intent = QueryIntent()
+        text = fold(query or '')
+        spans = []
+
+        match = PRICE_BETWEEN.search(text) or next(
+            (m for m in PRICE_FROM_TO.finditer(text) if CURRENCY.search(m.group(0))), None)
+        if match:
+            low = parse_number(match.group(1), match.group(2))
+            high = parse_number(match.group(3), match.group(4))
+            intent.min_price, intent.max_price = min(low, high), max(low, high)
+            spans.append(match.span())
+        else:
+            match = PRICE_MAX.search(text)
+            if match:
+                intent.max_price = parse_number(match.group(1), match.group(2))
+                spans.append(match.span())
+            match = PRICE_MIN.search(text)
+            if match:
+                intent.min_price = parse_number(match.group(1), match.group(2))
+                spans.append(match.span())
+
+        for pattern in (SALE_WORDS, CHEAP_WORDS):
+            for match in pattern.finditer(text):
+                if pattern is SALE_WORDS:
+                    intent.on_sale = True
+                else:
+                    intent.cheap = True
+                spans.append(match.span())
+
+        covered = [False] * len(text)
+        for start, end in spans:
+            covered[start:end] = [True] * (end - start)
+
+        # Remaining words keep their accents so they match the catalog text
+        original = (query or '').lower()
+        source = original if len(original) == len(text) else text
+        words = ''.join(' ' if covered[i] else char for i, char in enumerate(source)).split()
+        intent.text = ' '.join(strip_filler([word for word in (w.strip(WORD_PUNCTUATION) for w in words) if word]))
+
+        for start, end, (kind, value) in self._dictionary_matches(text):
+            if any(covered[start:end]):
+                continue
+            target = intent.brands if kind == 'brand' else intent.categories
+            if value not in target:
+                target.append(value)
+            covered[start:end] = [True] * (end - start)
+
+        residual = ''.join(' ' if covered[i] else char for i, char in enumerate(source))
+        intent.residual = [word for word in re.findall(r'\w+', residual)
+                           if fold(word) not in STOPWORDS and len(word) > 1]
+        return intent
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Relevance Module - Final ranking stage of intelligent_search on row ids
+Deduplicates candidates by product name code, scores them with the historical relevance
+formula (name/brand/category containment, name similarity, sale and stock boosts) using
+precomputed arrays, and selects the top-k with argpartition.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from search_index import RankedTextScorer, rapid_fuzz, rapid_process
+
+NAME_MATCH_SCORE = 10.0
+BRAND_MATCH_SCORE = 5.0
+CATEGORY_MATCH_SCORE = 3.0
+SIMILARITY_WEIGHT = 2.0
+ON_SALE_BOOST = 1.0
+AVAILABILITY_BOOST = 0.5
+
+# Units above which a product gets the availability boost
+AVAILABILITY_THRESHOLD = 10
+
+
+class RelevanceRanker:
+    """Row-id ranking with per-row arrays computed once per catalog"""
+
+    def __init__(self, names: List[str], names_lower: List[str], brands_lower: List[str],
+                 categories_lower: List[str], boosts: np.ndarray):
+        self.names_lower = names_lower
+        self.brands_lower = brands_lower
+        self.categories_lower = categories_lower
+        self.boosts = boosts
+
+        # Duplicate products share a name code
+        self.name_codes = pd.factorize(pd.Series(names, dtype=object))[0].astype(np.int32)
+
+        # Rows grouped by lowercased name, for name -> rows lookups
+        lower_codes, lower_names = pd.factorize(pd.Series(names_lower, dtype=object))
+        self._lower_lookup: Dict[str, int] = {name: code for code, name in enumerate(lower_names)}
+        self._lower_order = np.argsort(lower_codes, kind='stable').astype(np.int32)
+        self._lower_bounds = np.searchsorted(lower_codes[self._lower_order], np.arange(len(lower_names) + 1))
+
+    @classmethod
+    def build(cls, search_index: Dict[str, List[str]], records) -> 'RelevanceRanker':
+        return cls(records.columns['name'], search_index['product_names'], search_index['brands'],
+                   search_index['categories'], cls.compute_boosts(records))
+
+    @staticmethod
+    def compute_boosts(records) -> np.ndarray:
+        """Sale and availability boosts of every row"""
+        on_sale = np.asarray(records.columns['on_sale'], dtype=bool)
+        units = np.asarray(records.columns['units_available'], dtype=np.int64)
+        return on_sale * ON_SALE_BOOST + (units > AVAILABILITY_THRESHOLD) * AVAILABILITY_BOOST
+
+    def with_records(self, records) -> 'RelevanceRanker':
+        """Copy sharing the text arrays, with boosts recomputed after a price/stock update"""
+        updated = object.__new__(RelevanceRanker)
+        updated.__dict__.update(self.__dict__)
+        updated.boosts = self.compute_boosts(records)
+        return updated
+
+    def rows_with_names(self, names_lower: List[str]) -> List[int]:
+        """Rows (catalog order) whose lowercased name is one of the given names"""
+        groups = []
+        for name in names_lower:
+            code = self._lower_lookup.get(name)
+            if code is not None:
+                groups.append(self._lower_order[self._lower_bounds[code]:self._lower_bounds[code + 1]])
+        if not groups:
+            return []
+        return np.unique(np.concatenate(groups)).tolist()
+
+    def dedupe(self, rows: List[int]) -> np.ndarray:
+        """Keep the first row of every product name, in candidate order"""
+        rows = np.asarray(rows, dtype=np.int32)
+        _, first = np.unique(self.name_codes[rows], return_index=True)
+        return rows[np.sort(first)]
+
+    def similarity(self, query: str, rows: np.ndarray, known: Optional[Dict[int, float]] = None) -> np.ndarray:
+        """partial_ratio(query, name) / 100 per row, reusing scores the strategy already computed"""
+        known = known or {}
+        similarity = np.fromiter((known.get(row, -1.0) for row in rows.tolist()), dtype=np.float64, count=len(rows))
+        missing = np.flatnonzero(similarity < 0)
+        if len(missing) == 0:
+            return similarity
+
+        names = [self.names_lower[row] for row in rows[missing]]
+        if rapid_process is not None:
+            ratios = np.rint(rapid_process.cdist([query], names, scorer=rapid_fuzz.partial_ratio,
+                                                 dtype=np.float32)[0])
+        else:
+            from fuzzywuzzy import fuzz
+            ratios = np.array([fuzz.partial_ratio(query, name) for name in names], dtype=np.float64)
+        similarity[missing] = ratios / 100
+        return similarity
+
+    def scores(self, query: str, rows: np.ndarray, known: Optional[Dict[int, float]] = None) -> np.ndarray:
+        """Relevance of each row to the query"""
+        row_list = rows.tolist()
+        containment = np.array([
+            NAME_MATCH_SCORE * (query in self.names_lower[row])
+            + BRAND_MATCH_SCORE * (query in self.brands_lower[row])
+            + CATEGORY_MATCH_SCORE * (query in self.categories_lower[row])
+            for row in row_list
+        ], dtype=np.float64)
+        return containment + SIMILARITY_WEIGHT * self.similarity(query, rows, known) + self.boosts[rows]
+
+    def rank(self, query: str, rows: List[int], k: int, known: Optional[Dict[int, float]] = None) -> List[int]:
+        """Deduplicated top-k rows by relevance (ties keep candidate order)"""
+        if not rows or k <= 0:
+            return []
+        query = query.lower()
+        unique = self.dedupe(rows)
+        top = RankedTextScorer.top_k(self.scores(query, unique, known), k, min_score=-np.inf)
+        return unique[top].tolist()
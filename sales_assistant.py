@@ -5,22 +5,16 @@ Sales Voice Assistant - Exactly like your notebook format
 
 import os
 from livekit.agents import Agent
-from livekit.plugins import openai, elevenlabs, silero
+
+# Shared, lazily loaded models (one VAD and one set of plugin clients per process)
+from model_registry import get_llm, get_stt, get_tts, get_vad
 
 class SalesAssistant(Agent):
     def __init__(self) -> None:
-        # Use the API key from environment
-        api_key = os.getenv('OPENAI_API_KEY')
-
-        llm = openai.LLM(model="gpt-4o", api_key=api_key)
-        stt = openai.STT()
-
-        try:
-            tts = elevenlabs.TTS()
-        except:
-            tts = openai.TTS()
-
-        silero_vad = silero.VAD.load()
+        llm = get_llm("gpt-4o")
+        stt = get_stt()
+        tts = get_tts()
+        silero_vad = get_vad()
 
         super().__init__(
             instructions="""
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Search Index Module - Inverted token and n-gram index for product lookups
+Answers substring and word queries via posting-list intersection instead of full-table scans
+"""
+
+import re
+import heapq
+import logging
+from functools import lru_cache, partial
+from typing import Callable, List, Dict, Iterable, Optional
+from collections import defaultdict
+
+import numpy as np
+from fuzzywuzzy import fuzz
+
+try:
+    from rapidfuzz import fuzz as rapid_fuzz, process as rapid_process
+except ImportError:  # pragma: no cover - optional speedup
+    rapid_fuzz = None
+    rapid_process = None
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r'\b\w+\b')
+
+# Size of the character n-grams used for substring lookups
+NGRAM_SIZE = 3
+
+# Shortest token that counts as a prefix of a query word ("tab" for "tablet")
+MIN_PREFIX = 3
+
+
+@lru_cache(maxsize=1 << 16)
+def partial_ratio(query: str, text: str) -> int:
+    """fuzzywuzzy partial_ratio, the reference score (memoized: query words and catalog rows repeat)"""
+    return fuzz.partial_ratio(query, text)
+
+
+def ratio_bounds(matrix: np.ndarray) -> np.ndarray:
+    """
+    Upper bounds of fuzzywuzzy partial_ratio from rapidfuzz partial_ratio scores: the optimal
+    alignment is never worse than fuzzywuzzy's, and fuzzywuzzy rounds to an integer
+    """
+    return np.ceil(matrix - 1e-6)
+
+
+def _ngrams(text: str, n: int = NGRAM_SIZE) -> Iterable[str]:
+    """Yield all character n-grams of a string"""
+    return (text[i:i + n] for i in range(len(text) - n + 1))
+
+
+class InvertedIndex:
+    """
+    Token and character n-gram postings over the searchable product fields.
+
+    Postings are sorted NumPy arrays of row positions, so lookups intersect the
+    shortest lists first and only verify the surviving candidates.
+    """
+
+    def __init__(self, fields: Dict[str, List[str]],
+                 token_postings: Optional[Dict[str, np.ndarray]] = None,
+                 ngram_postings: Optional[Dict[str, np.ndarray]] = None):
+        """
+        Build the index from lowercased field values (one list per field, aligned by row).
+        Prebuilt postings (e.g. from a catalog snapshot) skip the build step.
+        """
+        self.fields = fields
+        self.num_rows = len(next(iter(fields.values()))) if fields else 0
+        self.token_postings: Dict[str, np.ndarray] = token_postings or {}
+        self.ngram_postings: Dict[str, np.ndarray] = ngram_postings or {}
+        if token_postings is None or ngram_postings is None:
+            self._build()
+
+    def _build(self):
+        """Build token and n-gram postings for every row"""
+        tokens = defaultdict(list)
+        ngrams = defaultdict(list)
+        field_values = list(self.fields.values())
+
+        for row in range(self.num_rows):
+            row_tokens = set()
+            row_ngrams = set()
+            for values in field_values:
+                text = values[row]
+                row_tokens.update(TOKEN_PATTERN.findall(text))
+                row_ngrams.update(_ngrams(text))
+
+            for token in row_tokens:
+                tokens[token].append(row)
+            for gram in row_ngrams:
+                ngrams[gram].append(row)
+
+        # Rows are visited in order, so every posting list is already sorted
+        self.token_postings = {k: np.array(v, dtype=np.int32) for k, v in tokens.items()}
+        self.ngram_postings = {k: np.array(v, dtype=np.int32) for k, v in ngrams.items()}
+
+        logger.info(f"Search index: {len(self.token_postings)} tokens, {len(self.ngram_postings)} n-grams")
+
+    @staticmethod
+    def _intersect(postings: List[np.ndarray]) -> np.ndarray:
+        """Intersect posting lists, shortest first"""
+        postings = sorted(postings, key=len)
+        result = postings[0]
+        for posting in postings[1:]:
+            if len(result) == 0:
+                break
+            result = np.intersect1d(result, posting, assume_unique=True)
+        return result
+
+    def _contains(self, row: int, query: str) -> bool:
+        """Verify that a row contains the query in one of its fields"""
+        return any(query in values[row] for values in self.fields.values())
+
+    def candidates(self, query: str) -> Iterable[int]:
+        """
+        Return rows that may contain the query as a substring (superset, unverified).
+
+        Queries of at least NGRAM_SIZE characters are answered from the n-gram
+        postings; shorter ones cannot be pruned and yield every row.
+        """
+        if len(query) < NGRAM_SIZE:
+            return range(self.num_rows)
+
+        postings = []
+        for gram in set(_ngrams(query)):
+            posting = self.ngram_postings.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        return self._intersect(postings).tolist()
+
+    def find_substring(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """Return row positions (in catalog order) where any field contains the query"""
+        if not query or (limit is not None and limit <= 0):
+            return []
+
+        candidates = self.candidates(query)
+
+        matches = []
+        for row in candidates:
+            if self._contains(row, query):
+                matches.append(row)
+                if limit is not None and len(matches) >= limit:
+                    break
+        return matches
+
+    def find_words(self, words: List[str], limit: Optional[int] = None) -> List[int]:
+        """Return row positions (in catalog order) containing every word as a whole token"""
+        if limit is not None and limit <= 0:
+            return []
+
+        postings = []
+        for word in words:
+            posting = self.token_postings.get(word)
+            if posting is None:
+                return []
+            postings.append(posting)
+
+        if not postings:
+            return []
+
+        rows = self._intersect(postings)
+        if limit is not None:
+            rows = rows[:limit]
+        return rows.tolist()
+
+
+class RankedTextScorer:
+    """
+    Batched scorer for the ranked full-text search strategy.
+
+    Keeps the historical scoring contract: for every query word a row earns
+    len(word) when the word appears in its full text, plus fuzzywuzzy's
+    partial_ratio / 100. Rows are returned by descending score (ties in catalog
+    order), keeping only those scoring above `min_score`.
+
+    rapidfuzz's partial_ratio takes the best alignment where fuzzywuzzy's picks
+    one heuristically, so it is never lower: one rapidfuzz cdist call bounds
+    every row and only the rows whose bound can still reach the top k are
+    scored with fuzzywuzzy. Without rapidfuzz every row is scored.
+    """
+
+    def __init__(self, full_text: List[str], inverted_index: InvertedIndex):
+        self.full_text = full_text
+        self.inverted_index = inverted_index
+
+    def _contained(self, words: List[str]) -> np.ndarray:
+        """words x rows flags: the row's full text contains the word"""
+        contained = np.zeros((len(words), len(self.full_text)), dtype=bool)
+        for i, word in enumerate(words):
+            rows = [row for row in self.inverted_index.candidates(word) if word in self.full_text[row]]
+            contained[i, rows] = True
+        return contained
+
+    def _score_row(self, words: List[str], contained: np.ndarray, row: int) -> float:
+        """Exact score of one row, summed in the same order as the original per-row loop"""
+        text = self.full_text[row]
+        score = 0
+        for i, word in enumerate(words):
+            if contained[i, row]:
+                score += len(word)
+            score += partial_ratio(word, text) / 100
+        return score
+
+    def _bounds(self, words: List[str], contained: np.ndarray) -> np.ndarray:
+        """Upper bound of every row's score (infinite without rapidfuzz)"""
+        if rapid_process is None:
+            return np.full(len(self.full_text), np.inf)
+
+        # One C-level words x rows matrix instead of a Python double loop
+        matrix = rapid_process.cdist(words, self.full_text, scorer=rapid_fuzz.partial_ratio,
+                                     dtype=np.float64, workers=-1)
+        ratios = ratio_bounds(matrix)
+        bounds = np.zeros(len(self.full_text), dtype=np.float64)
+        for i, word in enumerate(words):
+            bounds += contained[i] * len(word)
+            bounds += ratios[i] / 100
+        return bounds
+
+    def search(self, words: List[str], k: int, min_score: float = 0.5) -> List[int]:
+        """Return the top-k row positions for the query words"""
+        if not words or not self.full_text:
+            return []
+        contained = self._contained(words)
+        return self.bounded_top_k(self._bounds(words, contained),
+                                  partial(self._score_row, words, contained), k, min_score)
+
+    def token_counts(self, words: List[str], rows: np.ndarray) -> np.ndarray:
+        """
+        How many of the words each of the given rows contains as a whole token
+        ("air" counts for "Nike Air Max", not for "Deportes y Aire Libre")
+        """
+        counts = np.zeros(len(rows), dtype=np.int32)
+        for word in words:
+            posting = self.inverted_index.token_postings.get(word)
+            if posting is not None:
+                counts += np.isin(rows, posting, assume_unique=True)
+        return counts
+
+    def prefix_counts(self, words: List[str], rows: np.ndarray) -> np.ndarray:
+        """
+        How many of the words each of the given rows names by prefix: a token of at least
+        MIN_PREFIX characters that starts the word or starts with it ("tab" for "tablet")
+        """
+        counts = np.zeros(len(rows), dtype=np.int32)
+        for word in words:
+            if len(word) < MIN_PREFIX:
+                continue
+            postings = [posting for token, posting in self.inverted_index.token_postings.items()
+                        if len(token) >= MIN_PREFIX and (token.startswith(word) or word.startswith(token))]
+            if postings:
+                counts += np.isin(rows, np.concatenate(postings))
+        return counts
+
+    @staticmethod
+    def top_k(scores: np.ndarray, k: int, min_score: float = 0.5) -> List[int]:
+        """Select the k best rows with argpartition, breaking ties by row position"""
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[:k - len(above)]
+        selected = np.concatenate([above, ties])
+
+        order = np.lexsort((selected, -scores[selected]))
+        selected = selected[order]
+        return selected[scores[selected] > min_score].tolist()
+
+    @classmethod
+    def bounded_top_k(cls, bounds: np.ndarray, exact: Callable[[int], float], k: int,
+                      min_score: float) -> List[int]:
+        """
+        top_k over exact scores that are expensive to compute, given an upper bound of each.
+        Rows are scored in descending bound order until no bound left can reach the k-th best
+        exact score (ties included, since they may win on row position) or `min_score`.
+        """
+        k = min(k, len(bounds))
+        if k <= 0:
+            return []
+
+        scores = np.full(len(bounds), -np.inf)
+        best: List[float] = []
+        for row in np.lexsort((np.arange(len(bounds)), -bounds)).tolist():
+            if bounds[row] <= min_score or (len(best) == k and bounds[row] < best[0]):
+                break
+            scores[row] = exact(row)
+            if len(best) < k:
+                heapq.heappush(best, scores[row])
+            elif scores[row] > best[0]:
+                heapq.heapreplace(best, scores[row])
+        return cls.top_k(scores, k, min_score)
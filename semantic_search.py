@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Semantic Search Module - Sentence embeddings served from a persisted FAISS index
+Embeddings are computed offline on CPU and stored next to the product CSV:
+
+    python semantic_search.py --csv data/product_data.csv
+"""
+
+import os
+import json
+import hashlib
+import logging
+import argparse
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from model_registry import get_text_encoder
+
+try:
+    import faiss
+except ImportError:  # pragma: no cover - optional dependency
+    faiss = None
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'paraphrase-multilingual-MiniLM-L12-v2')
+
+# Catalogs above this size use an IVF index instead of exhaustive search
+IVF_MIN_ROWS = 50000
+IVF_NPROBE = 16
+
+
+def index_paths(csv_file: str) -> Tuple[str, str, str]:
+    """Embedding, FAISS index and metadata paths stored alongside the CSV"""
+    base, _ = os.path.splitext(csv_file)
+    return f"{base}.embeddings.npy", f"{base}.faiss", f"{base}.embeddings.json"
+
+
+def texts_fingerprint(texts: List[str]) -> str:
+    """Hash of the embedded texts, used to detect stale indexes"""
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def _create_index(embeddings: np.ndarray):
+    """Inner-product index over normalized embeddings (cosine similarity)"""
+    rows, dim = embeddings.shape
+    if rows < IVF_MIN_ROWS:
+        index = faiss.IndexFlatIP(dim)
+    else:
+        nlist = int(4 * np.sqrt(rows))
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(embeddings)
+    index.add(embeddings)
+    return index
+
+
+def build_semantic_index(csv_file: str, texts: List[str], model_name: str = EMBEDDING_MODEL,
+                         batch_size: int = 64):
+    """Compute embeddings in CPU batches and persist them with their FAISS index"""
+    if faiss is None:
+        raise RuntimeError("faiss-cpu is required to build the semantic index")
+
+    embeddings_path, faiss_path, meta_path = index_paths(csv_file)
+    model = get_text_encoder(model_name)
+
+    logger.info(f"Encoding {len(texts)} products with {model_name}")
+    embeddings = model.encode(
+        texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=True,
+    ).astype(np.float32)
+
+    np.save(embeddings_path, embeddings)
+    faiss.write_index(_create_index(embeddings), faiss_path)
+
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'model': model_name,
+            'rows': len(texts),
+            'dim': int(embeddings.shape[1]),
+            'texts_sha256': texts_fingerprint(texts),
+        }, f, indent=2)
+
+    logger.info(f"Semantic index saved to {faiss_path}")
+
+
+class SemanticIndex:
+    """Persisted FAISS index plus a lazily loaded query encoder"""
+
+    def __init__(self, index, model_name: str):
+        self.index = index
+        self.model_name = model_name
+
+        if hasattr(self.index, 'nprobe'):
+            self.index.nprobe = IVF_NPROBE
+
+    @classmethod
+    def load(cls, csv_file: str, texts: List[str]) -> Optional['SemanticIndex']:
+        """Load the persisted index for a catalog, or None when missing, stale or unsupported"""
+        if faiss is None:
+            logger.info("faiss not installed, semantic search disabled")
+            return None
+
+        _, faiss_path, meta_path = index_paths(csv_file)
+        if not (os.path.exists(faiss_path) and os.path.exists(meta_path)):
+            logger.info(f"No semantic index for {csv_file}; build it with: python semantic_search.py --csv {csv_file}")
+            return None
+
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+
+        if meta.get('rows') != len(texts) or meta.get('texts_sha256') != texts_fingerprint(texts):
+            logger.warning(f"Semantic index for {csv_file} is stale, semantic search disabled until rebuilt")
+            return None
+
+        index = faiss.read_index(faiss_path)
+        logger.info(f"Loaded semantic index with {index.ntotal} vectors ({meta['model']})")
+        return cls(index, meta['model'])
+
+    def _encoder(self):
+        """Query encoder, loaded on first use and shared through the model registry"""
+        return get_text_encoder(self.model_name)
+
+    def search(self, query: str, k: int, min_score: float = 0.45) -> List[Tuple[int, float]]:
+        """Return (row, cosine similarity) pairs for the closest products"""
+        if k <= 0:
+            return []
+
+        vector = self._encoder().encode([query], convert_to_numpy=True, normalize_embeddings=True)
+        scores, rows = self.index.search(vector.astype(np.float32), k)
+        return [
+            (int(row), float(score))
+            for row, score in zip(rows[0], scores[0])
+            if row >= 0 and score >= min_score
+        ]
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Build the semantic product index")
+    parser.add_argument('--csv', default='data/product_data.csv')
+    parser.add_argument('--model', default=EMBEDDING_MODEL)
+    parser.add_argument('--batch-size', type=int, default=64)
+    args = parser.parse_args()
+
+    from product_database import ProductDatabase
+    db = ProductDatabase(args.csv)
+    build_semantic_index(args.csv, db.search_index['full_text'], args.model, args.batch_size)
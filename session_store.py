@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Session Store Module - Bounded conversation sessions with idle-TTL and size eviction
+The in-memory backend serves a single process; the SQLite backend shares conversation
+history between Gunicorn workers through a local database file. Messages trimmed from a
+session can be folded into a per-session summary by a `summarize` callback.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from sqlite_store import PurgeSchedule, SQLiteConnections
+
+logger = logging.getLogger(__name__)
+
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'memory')
+SESSION_DB = os.getenv('SESSION_DB', 'data/sessions.sqlite3')
+SESSION_MAX = int(os.getenv('SESSION_MAX', '1000'))
+SESSION_IDLE_TTL = float(os.getenv('SESSION_IDLE_TTL', '1800'))
+SESSION_MAX_MESSAGES = int(os.getenv('SESSION_MAX_MESSAGES', '20'))
+
+# Rough per-message bookkeeping overhead (dict, timestamp, role) for memory accounting
+MESSAGE_OVERHEAD_BYTES = 200
+
+
+# summarize(summary, dropped_messages) -> updated summary
+Summarizer = Callable[[str, List[Dict]], str]
+
+
+def message_size(message: Dict) -> int:
+    """Approximate memory used by one history message"""
+    return len(message.get('content', '').encode('utf-8')) + MESSAGE_OVERHEAD_BYTES
+
+
+class SessionStore:
+    """Common interface and counters for session backends"""
+
+    def __init__(self, max_sessions: int = SESSION_MAX, idle_ttl: float = SESSION_IDLE_TTL,
+                 max_messages: int = SESSION_MAX_MESSAGES, summarize: Optional[Summarizer] = None):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_messages = max_messages
+        self.summarize = summarize
+        self.evicted = 0
+        self.expired = 0
+        self._purge_schedule = PurgeSchedule(self.purge_expired)
+
+    def get_history(self, session_id: str) -> List[Dict]:
+        """Conversation history of a session (empty for unknown sessions)"""
+        raise NotImplementedError
+
+    def get_summary(self, session_id: str) -> str:
+        """Rolling summary of the messages trimmed from a session (empty when none)"""
+        raise NotImplementedError
+
+    def append_message(self, session_id: str, role: str, content: str):
+        """Append a message, keeping only the last `max_messages` (older ones go to the summary)"""
+        raise NotImplementedError
+
+    def _fold(self, summary: str, dropped: List[Dict]) -> str:
+        if not dropped or self.summarize is None:
+            return summary
+        return self.summarize(summary, dropped)
+
+    def delete(self, session_id: str):
+        """Forget a session"""
+        raise NotImplementedError
+
+    def purge_expired(self):
+        """Drop sessions idle for longer than `idle_ttl`"""
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        """Session counts, evictions and approximate memory use"""
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    """Process-local sessions kept in least-recently-used order"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._sessions: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._lock = threading.RLock()
+        self.total_bytes = 0
+
+    def _get(self, session_id: str, create: bool = False) -> Optional[Dict]:
+        now = time.time()
+        entry = self._sessions.get(session_id)
+        if entry is not None and now - entry['last_access'] > self.idle_ttl:
+            self._remove(session_id)
+            self.expired += 1
+            entry = None
+
+        if entry is None:
+            if not create:
+                return None
+            entry = {'history': [], 'summary': '', 'bytes': 0, 'last_access': now}
+            self._sessions[session_id] = entry
+            while len(self._sessions) > self.max_sessions:
+                oldest = next(iter(self._sessions))
+                self._remove(oldest)
+                self.evicted += 1
+
+        entry['last_access'] = now
+        self._sessions.move_to_end(session_id)
+        return entry
+
+    def _remove(self, session_id: str):
+        entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            self.total_bytes -= entry['bytes']
+
+    def get_history(self, session_id: str) -> List[Dict]:
+        with self._lock:
+            entry = self._get(session_id)
+            return list(entry['history']) if entry else []
+
+    def get_summary(self, session_id: str) -> str:
+        with self._lock:
+            entry = self._get(session_id)
+            return entry['summary'] if entry else ''
+
+    def append_message(self, session_id: str, role: str, content: str):
+        message = {'role': role, 'content': content, 'timestamp': time.time()}
+        with self._lock:
+            self._purge_schedule.maybe_purge()
+            entry = self._get(session_id, create=True)
+            history = entry['history']
+            history.append(message)
+            size = message_size(message)
+
+            # Keep only the last messages to prevent context bloat
+            if len(history) > self.max_messages:
+                dropped = history[:-self.max_messages]
+                del history[:-self.max_messages]
+                size -= sum(message_size(m) for m in dropped)
+
+                summary = self._fold(entry['summary'], dropped)
+                size += len(summary.encode('utf-8')) - len(entry['summary'].encode('utf-8'))
+                entry['summary'] = summary
+
+            entry['bytes'] += size
+            self.total_bytes += size
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._remove(session_id)
+
+    def purge_expired(self):
+        cutoff = time.time() - self.idle_ttl
+        with self._lock:
+            expired = [sid for sid, entry in self._sessions.items() if entry['last_access'] < cutoff]
+            for session_id in expired:
+                self._remove(session_id)
+            self.expired += len(expired)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'idle_ttl': self.idle_ttl,
+                'history_bytes': self.total_bytes,
+                'evicted': self.evicted,
+                'expired': self.expired,
+            }
+
+
+class SQLiteSessionStore(SessionStore):
+    """Conversation history in a local SQLite file shared by every worker process"""
+
+    def __init__(self, path: str = SESSION_DB, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._connections = SQLiteConnections(path)
+        with self._connections.get() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    history TEXT NOT NULL,
+                    summary TEXT NOT NULL DEFAULT '',
+                    bytes INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access)")
+
+            # Databases created before summaries existed
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+            if 'summary' not in columns:
+                conn.execute("ALTER TABLE sessions ADD COLUMN summary TEXT NOT NULL DEFAULT ''")
+
+    def get_history(self, session_id: str) -> List[Dict]:
+        conn = self._connections.get()
+        with conn:
+            row = conn.execute(
+                "SELECT history FROM sessions WHERE session_id = ? AND last_access >= ?",
+                (session_id, time.time() - self.idle_ttl)
+            ).fetchone()
+            if row is None:
+                return []
+            conn.execute("UPDATE sessions SET last_access = ? WHERE session_id = ?", (time.time(), session_id))
+        return json.loads(row[0])
+
+    def get_summary(self, session_id: str) -> str:
+        row = self._connections.get().execute(
+            "SELECT summary FROM sessions WHERE session_id = ? AND last_access >= ?",
+            (session_id, time.time() - self.idle_ttl)
+        ).fetchone()
+        return row[0] if row else ''
+
+    def append_message(self, session_id: str, role: str, content: str):
+        message = {'role': role, 'content': content, 'timestamp': time.time()}
+        self._purge_schedule.maybe_purge()
+        conn = self._connections.get()
+        with conn:
+            # IMMEDIATE takes the write lock up front so concurrent appends don't interleave
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT history, summary, last_access FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+
+            history, summary = [], ''
+            if row is not None and row[2] >= time.time() - self.idle_ttl:
+                history, summary = json.loads(row[0]), row[1]
+            history.append(message)
+            if len(history) > self.max_messages:
+                summary = self._fold(summary, history[:-self.max_messages])
+                history = history[-self.max_messages:]
+
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, history, summary, bytes, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (session_id, json.dumps(history, ensure_ascii=False), summary,
+                 sum(message_size(m) for m in history) + len(summary.encode('utf-8')), time.time())
+            )
+
+            if row is None:
+                self._evict_overflow(conn)
+
+    def _evict_overflow(self, conn: sqlite3.Connection):
+        """Remove least recently used sessions beyond `max_sessions`"""
+        cursor = conn.execute("""
+            DELETE FROM sessions WHERE session_id IN (
+                SELECT session_id FROM sessions ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_sessions,))
+        self.evicted += cursor.rowcount
+
+    def delete(self, session_id: str):
+        conn = self._connections.get()
+        with conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def purge_expired(self):
+        conn = self._connections.get()
+        with conn:
+            cursor = conn.execute("DELETE FROM sessions WHERE last_access < ?", (time.time() - self.idle_ttl,))
+        self.expired += cursor.rowcount
+
+    def stats(self) -> Dict:
+        conn = self._connections.get()
+        count, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM sessions").fetchone()
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'sessions': count,
+            'max_sessions': self.max_sessions,
+            'idle_ttl': self.idle_ttl,
+            'history_bytes': total_bytes,
+            'evicted': self.evicted,
+            'expired': self.expired,
+        }
+
+
+def create_session_store(summarize: Optional[Summarizer] = None) -> SessionStore:
+    """Session store selected by SESSION_BACKEND (memory or sqlite)"""
+    if SESSION_BACKEND == 'sqlite':
+        logger.info(f"Using SQLite session store at {SESSION_DB}")
+        return SQLiteSessionStore(SESSION_DB, summarize=summarize)
+    return MemorySessionStore(summarize=summarize)
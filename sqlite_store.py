@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+SQLite Store Module - Plumbing shared by the SQLite-backed stores
+Per-thread connections to a local database file in WAL mode, and the periodic sweep of
+expired entries that the session store and the completion cache run during writes.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Callable
+
+# How often expired entries are swept during writes (seconds)
+PURGE_INTERVAL = 60
+
+
+class SQLiteConnections:
+    """One connection per thread (WAL mode so workers read while another writes)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+class PurgeSchedule:
+    """Runs `purge` from a write path at most once per `interval` seconds"""
+
+    def __init__(self, purge: Callable[[], None], interval: float = PURGE_INTERVAL):
+        self.purge = purge
+        self.interval = interval
+        self._last_purge = time.monotonic()
+
+    def maybe_purge(self):
+        if time.monotonic() - self._last_purge >= self.interval:
+            self._last_purge = time.monotonic()
+            self.purge()
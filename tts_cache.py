@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+TTS Cache Module - Content-addressed cache of synthesized speech
+Audio is keyed on (text, voice, speed, model) and cached per sentence, so a sentence shared by
+many responses (greetings, the fallback question, closing lines) is synthesized once. A bounded
+in-memory LRU sits in front of an on-disk AudioStore; both evict by total size.
+"""
+
+import os
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from audio_store import AudioStore
+from cache import LRUCache
+from voice_pipeline import split_sentences
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Set TTS_CACHE=0 to always call the TTS API
+TTS_CACHE_ENABLED = os.getenv('TTS_CACHE', '1') != '0'
+TTS_CACHE_DIR = os.getenv('TTS_CACHE_DIR', 'data/tts_cache')
+TTS_CACHE_DISK_MB = float(os.getenv('TTS_CACHE_DISK_MB', '512'))
+TTS_CACHE_MEMORY_MB = float(os.getenv('TTS_CACHE_MEMORY_MB', '32'))
+
+# Upper bound on in-memory entries; the byte budget is what normally evicts
+MEMORY_MAX_ENTRIES = 100_000
+
+TTS_CACHE_LOOKUPS = metrics.Counter(
+    'voice_sales_tts_cache_lookups_total', 'TTS cache lookups by the tier that answered them', ('result',))
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace-insensitive form of a sentence, used for the cache key"""
+    return ' '.join(text.split())
+
+
+def split_for_synthesis(text: str) -> List[str]:
+    """Sentences of a response, each cached and synthesized on its own"""
+    sentences, remainder = split_sentences(normalize_text(text))
+    if remainder.strip():
+        sentences.append(remainder.strip())
+    return sentences
+
+
+class TTSCache:
+    """Two-tier (memory, disk) sentence-level cache in front of a TTS call"""
+
+    def __init__(self, directory: Optional[str] = TTS_CACHE_DIR, disk_mb: float = TTS_CACHE_DISK_MB,
+                 memory_mb: float = TTS_CACHE_MEMORY_MB):
+        self.memory = LRUCache(max_size=MEMORY_MAX_ENTRIES, max_bytes=int(memory_mb * 1024 * 1024))
+        self.disk = AudioStore(directory, ttl=None, max_bytes=int(disk_mb * 1024 * 1024)) if directory else None
+        self.hits = 0
+        self.misses = 0
+        # Lookups run on many threads; the counters share the in-memory tier's lock
+        self._lock = self.memory._lock
+
+    @staticmethod
+    def key(text: str, voice: str, speed: float, model: str) -> str:
+        """Content address of one synthesized sentence"""
+        payload = '\x00'.join([model, voice, f"{speed:g}", normalize_text(text)])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _count(self, result: str):
+        with self._lock:
+            if result == 'miss':
+                self.misses += 1
+            else:
+                self.hits += 1
+        TTS_CACHE_LOOKUPS.inc(result=result)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached audio from memory, then disk (promoted to memory), or None"""
+        audio = self.memory.get(key)
+        if audio is not None:
+            self._count('memory')
+            return audio
+
+        if self.disk is not None:
+            audio = self.disk.get(key)
+            if audio is not None:
+                self.memory.set(key, audio)
+                self._count('disk')
+                return audio
+
+        self._count('miss')
+        return None
+
+    def set(self, key: str, audio: bytes):
+        if not audio:
+            return
+        self.memory.set(key, audio)
+        if self.disk is not None:
+            self.disk.set(key, audio)
+
+    async def synthesize_async(self, text: str, voice: str, speed: float, model: str,
+                               synthesize: Callable[[str], Awaitable[bytes]]) -> bytes:
+        """Audio for one sentence, awaiting synthesize(text) only on a miss (disk I/O runs off the event loop)"""
+        key = self.key(text, voice, speed, model)
+        audio = await asyncio.to_thread(self.get, key)
+        if audio is None:
+            audio = await synthesize(text)
+            await asyncio.to_thread(self.set, key, audio)
+        return audio
+
+    async def synthesize_text(self, text: str, voice: str, speed: float, model: str,
+                              synthesize: Callable[[str], Awaitable[bytes]]) -> bytes:
+        """
+        Audio for a whole response, one cached sentence at a time
+        Missing sentences are synthesized concurrently; the MP3 segments are concatenated in order
+        """
+        sentences = split_for_synthesis(text)
+        if not sentences:
+            return b''
+        segments = await asyncio.gather(*(
+            self.synthesize_async(sentence, voice, speed, model, synthesize) for sentence in sentences
+        ))
+        return b''.join(segments)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'memory': self.memory.stats(),
+            'disk': self.disk.stats() if self.disk is not None else None,
+        }
+
+
+_tts_cache = None
+_tts_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> Optional[TTSCache]:
+    """Process-wide TTS cache (None when disabled with TTS_CACHE=0)"""
+    global _tts_cache
+    if not TTS_CACHE_ENABLED:
+        return None
+    if _tts_cache is None:
+        with _tts_cache_lock:
+            if _tts_cache is None:
+                _tts_cache = TTSCache()
+    return _tts_cache
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Value Resolver Module - Fuzzy resolution of spoken brand/category names to catalog values
+Keeps the distinct values sorted with their normalized forms for exact lookups and memoizes
+the fuzzy ranking per query, so "samsun" -> Samsung costs one partial_ratio pass the first
+time and a dictionary hit afterwards. Rows for a resolved value come from the FacetIndex.
+"""
+
+from typing import Iterable, List, Tuple
+
+import numpy as np
+from fuzzywuzzy import fuzz, process
+
+from cache import LRUCache
+from query_intent import fold
+
+# Fuzzy rankings kept per resolver (one entry per distinct normalized query)
+RESOLVER_CACHE_SIZE = 4096
+
+
+class ValueResolver:
+    """Resolves free text to the best matching distinct values of one catalog column"""
+
+    def __init__(self, values: Iterable, cache_size: int = RESOLVER_CACHE_SIZE):
+        self.values: List[str] = sorted({value for value in values if isinstance(value, str) and value})
+        self.normalized = np.array([fold(value) for value in self.values], dtype=object)
+
+        # Normalized names sorted for binary-search exact lookups
+        self._exact_order = np.argsort(self.normalized, kind='stable')
+        self._exact_keys = self.normalized[self._exact_order].tolist()
+        self._rankings = LRUCache(max_size=cache_size)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def exact(self, query: str):
+        """Catalog value whose accent/case-folded form equals the query, or None"""
+        key = fold(query.strip())
+        position = int(np.searchsorted(self._exact_keys, key)) if self._exact_keys else 0
+        if position < len(self._exact_keys) and self._exact_keys[position] == key:
+            return self.values[self._exact_order[position]]
+        return None
+
+    def ranking(self, query: str) -> List[Tuple[str, int]]:
+        """Every value scored with partial_ratio against the query, best first (memoized)"""
+        key = ' '.join(query.lower().split())
+        ranking = self._rankings.get(key)
+        if ranking is None:
+            ranking = [(value, score) for value, score in
+                       process.extract(key, self.values, limit=None, scorer=fuzz.partial_ratio)]
+            self._rankings.set(key, ranking)
+        return ranking
+
+    def resolve(self, query: str, limit: int = 1, min_score: int = 60, strict: bool = False) -> List[str]:
+        """
+        Up to `limit` values scoring at least `min_score` (above it when strict)
+        An exact normalized match answers single-value lookups without fuzzy scoring
+        """
+        if not query or not self.values or limit <= 0:
+            return []
+
+        if limit == 1:
+            exact = self.exact(query)
+            if exact is not None:
+                return [exact]
+
+        return [value for value, score in self.ranking(query)[:limit]
+                if score > min_score or (score == min_score and not strict)]
+
+    def cache_stats(self):
+        """Hit/miss statistics of the memoized fuzzy rankings"""
+        return self._rankings.stats()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Voice Pipeline Module - Asynchronous, streamed voice turn
+STT -> product search -> streamed LLM tokens -> per-sentence TTS, emitting events as
+soon as each piece is ready so the first audio arrives after roughly STT + one sentence.
+Typed turns use the same search and token streaming without STT/TTS. A turn answered before
+(same context and message) is replayed from the completion cache instead of calling the LLM.
+"""
+
+import re
+import time
+import base64
+import asyncio
+import logging
+from collections import deque
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from async_runtime import run_in_pool
+
+logger = logging.getLogger(__name__)
+
+# A sentence ends at . ! ? or … followed by whitespace (keeps prices like $1.284 intact)
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?…])\s+')
+
+FALLBACK_RESPONSE = "¿En qué producto específico estás interesado? Tengo excelentes ofertas."
+
+
+def split_sentences(buffer: str) -> Tuple[List[str], str]:
+    """Split finished sentences off the buffer, returning (sentences, remainder)"""
+    parts = SENTENCE_BOUNDARY.split(buffer)
+    complete = [part.strip() for part in parts[:-1] if part.strip()]
+    return complete, parts[-1]
+
+
+class VoicePipeline:
+    """One streamed voice turn against OpenAI-compatible STT, chat and TTS endpoints"""
+
+    def __init__(self, client, search: Callable, build_context: Callable, render_prompt: Callable,
+                 system_prompt: str, llm_model: str = "gpt-4o-mini", llm_options: Dict = None,
+                 stt_model: str = "whisper-1", tts_model: str = "tts-1", tts_speed: float = 1.1,
+                 tts_cache=None, publish_audio: Optional[Callable[[bytes], str]] = None,
+                 completion_cache=None, completion_key: Optional[Callable] = None):
+        self.client = client
+        self.search = search
+        # build_context(user_input, products, search_description) -> prompt context; it may block
+        # (session reads, token counting) so it runs in a worker thread, once per turn
+        self.build_context = build_context
+        # render_prompt(context, user_input) -> prompt sent to the LLM
+        self.render_prompt = render_prompt
+        self.system_prompt = system_prompt
+        self.llm_model = llm_model
+        self.llm_options = llm_options or {}
+        self.stt_model = stt_model
+        self.tts_model = tts_model
+        self.tts_speed = tts_speed
+        self.tts_cache = tts_cache
+        # When set, audio events carry a URL to the published MP3 instead of base64 data (blocking)
+        self.publish_audio = publish_audio
+        # completion_key(context, user_input) -> key in completion_cache
+        self.completion_cache = completion_cache
+        self.completion_key = completion_key
+
+    async def transcribe(self, audio: bytes, filename: str, mimetype: Optional[str] = None) -> str:
+        """Speech-to-text for the uploaded recording"""
+        transcript = await self.client.audio.transcriptions.create(
+            model=self.stt_model,
+            file=(filename, audio, mimetype) if mimetype else (filename, audio)
+        )
+        return transcript.text
+
+    async def stream_completion(self, prompt: str) -> AsyncIterator[str]:
+        """Yield LLM tokens as they arrive"""
+        stream = await self.client.chat.completions.create(
+            model=self.llm_model,
+            messages=[
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            stream=True,
+            **self.llm_options
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def prompt_context(self, user_input: str, products: List[Dict], search_description: str) -> str:
+        """The turn's prompt context, built off the event loop"""
+        return await asyncio.to_thread(self.build_context, user_input, products, search_description)
+
+    async def completion_deltas(self, user_input: str, context: str) -> AsyncIterator[str]:
+        """LLM tokens for the turn, or the whole cached response as a single delta"""
+        key = None
+        if self.completion_cache is not None and self.completion_key is not None:
+            key = self.completion_key(context, user_input)
+            cached = await asyncio.to_thread(self.completion_cache.get, key)
+            if cached is not None:
+                yield cached
+                return
+
+        parts = []
+        async for delta in self.stream_completion(self.render_prompt(context, user_input)):
+            parts.append(delta)
+            yield delta
+
+        # Only complete responses are stored; a failed stream raises before reaching here
+        if key is not None:
+            await asyncio.to_thread(self.completion_cache.set, key, ''.join(parts).strip())
+
+    async def synthesize(self, text: str, voice: str) -> bytes:
+        """Text-to-speech for one sentence, served from the TTS cache when it was seen before"""
+        if self.tts_cache is None:
+            return await self._synthesize(text, voice)
+        return await self.tts_cache.synthesize_async(
+            text, voice, self.tts_speed, self.tts_model, lambda sentence: self._synthesize(sentence, voice)
+        )
+
+    async def _synthesize(self, text: str, voice: str) -> bytes:
+        response = await self.client.audio.speech.create(
+            model=self.tts_model,
+            voice=voice,
+            input=text,
+            speed=self.tts_speed
+        )
+        return response.content
+
+    async def _audio_event(self, index: int, sentence: str, audio: bytes) -> Dict:
+        event = {'type': 'audio', 'index': index, 'text': sentence}
+        if self.publish_audio is not None:
+            # Publishing writes a file (and now and then purges old ones), keep it off the loop
+            event['audio_url'] = await asyncio.to_thread(self.publish_audio, audio) if audio else None
+        else:
+            event['audio_data'] = base64.b64encode(audio).decode()
+        return event
+
+    async def run_text(self, user_input: str) -> AsyncIterator[Dict]:
+        """
+        Process one typed turn (no STT/TTS), yielding events in this order:
+        products, text deltas, done.
+        """
+        start = time.perf_counter()
+        timings = {}
+
+        products, search_description = await run_in_pool(self.search, user_input)
+        timings['search'] = time.perf_counter() - start
+        yield {'type': 'products', 'mentioned_products': products[:6], 'search_description': search_description}
+
+        context = await self.prompt_context(user_input, products, search_description)
+
+        parts = []
+        try:
+            async for delta in self.completion_deltas(user_input, context):
+                if 'first_token' not in timings:
+                    timings['first_token'] = time.perf_counter() - start
+                parts.append(delta)
+                yield {'type': 'text', 'delta': delta}
+
+        except Exception as e:
+            logger.error(f"Error streaming response: {e}")
+            if not parts:
+                parts.append(FALLBACK_RESPONSE)
+                yield {'type': 'text', 'delta': FALLBACK_RESPONSE}
+
+        timings['total'] = time.perf_counter() - start
+        yield {
+            'type': 'done',
+            'response_text': ''.join(parts).strip(),
+            'timings': {stage: round(seconds, 3) for stage, seconds in timings.items()},
+        }
+
+    async def run(self, audio: bytes, filename: str, voice: str, mimetype: Optional[str] = None) -> AsyncIterator[Dict]:
+        """
+        Process one voice turn, yielding events in this order:
+        transcript, products, text deltas interleaved with audio chunks, done.
+        """
+        start = time.perf_counter()
+        timings = {}
+
+        user_input = await self.transcribe(audio, filename, mimetype)
+        timings['stt'] = time.perf_counter() - start
+        logger.info(f"Voice input: {user_input}")
+        yield {'type': 'transcript', 'text': user_input}
+
+        # Search is CPU-bound, keep it off the event loop (on the bounded search pool)
+        products, search_description = await run_in_pool(self.search, user_input)
+        yield {'type': 'products', 'mentioned_products': products[:6], 'search_description': search_description}
+
+        context = await self.prompt_context(user_input, products, search_description)
+
+        # TTS tasks in sentence order; each starts as soon as its sentence is complete
+        pending = deque()
+        sent = 0
+        parts = []
+        buffer = ""
+
+        def queue_sentence(sentence: str):
+            pending.append((sentence, asyncio.create_task(self.synthesize(sentence, voice))))
+
+        async def next_audio() -> Dict:
+            nonlocal sent
+            sentence, task = pending.popleft()
+            try:
+                audio_bytes = await task
+            except Exception as e:
+                logger.error(f"TTS failed for sentence {sent}: {e}")
+                audio_bytes = b""
+            if sent == 0:
+                timings['first_audio'] = time.perf_counter() - start
+            event = await self._audio_event(sent, sentence, audio_bytes)
+            sent += 1
+            return event
+
+        try:
+            try:
+                async for delta in self.completion_deltas(user_input, context):
+                    if 'first_token' not in timings:
+                        timings['first_token'] = time.perf_counter() - start
+                    parts.append(delta)
+                    yield {'type': 'text', 'delta': delta}
+
+                    sentences, buffer = split_sentences(buffer + delta)
+                    for sentence in sentences:
+                        queue_sentence(sentence)
+
+                    # Push audio that is already synthesized without waiting for the LLM
+                    while pending and pending[0][1].done():
+                        yield await next_audio()
+
+            except Exception as e:
+                logger.error(f"Error streaming response: {e}")
+                if not parts:
+                    parts.append(FALLBACK_RESPONSE)
+                    buffer = FALLBACK_RESPONSE
+                    yield {'type': 'text', 'delta': FALLBACK_RESPONSE}
+
+            if buffer.strip():
+                queue_sentence(buffer.strip())
+
+            while pending:
+                yield await next_audio()
+
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+        timings['total'] = time.perf_counter() - start
+        yield {
+            'type': 'done',
+            'response_text': ''.join(parts).strip(),
+            'timings': {stage: round(seconds, 3) for stage, seconds in timings.items()},
+        }
@@ -4,24 +4,42 @@ Optimized Voice Sales App - Concise & Fast Responses
 Integrates real product database with faster, shorter responses
 """
 
-from flask import Flask, render_template, request, jsonify, session, send_file
+from flask import Flask, render_template, request, jsonify, session, send_file, Response, stream_with_context
 import uuid
 import logging
 import os
-import tempfile
-import io
 import asyncio
-from threading import Thread
-import time
-import re
 import base64
-from io import BytesIO
-
-# Import our LiveKit voice assistant
-from sales_assistant import SalesAssistant
+import json
 
 # Import our product database
 from product_database import get_product_database
+from catalog_reload import CatalogReloader
+
+# Streamed voice pipeline on a shared event loop
+from voice_pipeline import VoicePipeline, FALLBACK_RESPONSE
+from async_runtime import iterate_async, run_async, run_in_pool, turn_limiter, Overloaded
+
+# Sentence-level cache of synthesized speech
+from tts_cache import get_tts_cache
+
+# Reuse of LLM responses for repeated turns
+from completion_cache import get_completion_cache
+
+# Response audio served as binary files instead of base64
+from audio_store import AudioStore, AUDIO_URL_TTL
+
+# Process-wide pooled OpenAI clients
+from openai_clients import get_async_openai_client
+
+# Bounded per-session conversation history
+from session_store import create_session_store
+
+# Token-budgeted prompts with a rolling per-session summary
+from prompt_builder import build_context, render_prompt, summarize
+
+# Per-stage latency histograms and search strategy counters
+import metrics
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -30,12 +48,23 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'voice-sales-secret-key-change-this')
 
-# Store assistant instances per session
-assistants = {}
-conversation_history = {}
+# Store conversation history per session (voice models are only loaded by SalesAssistant);
+# messages trimmed from a session are folded into its summary
+sessions = create_session_store(summarize=summarize)
 
 # Initialize product database
 product_db = None
+catalog_reloader = None
+
+# Token required by the admin reload endpoint (disabled when unset)
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+# Voice endpoints return audio as base64 in the JSON (default) or as a URL to the MP3
+AUDIO_FORMATS = ('base64', 'url')
+audio_store = AudioStore()
+
+# Most queries accepted by one batch search call
+BATCH_SEARCH_MAX_QUERIES = int(os.environ.get('BATCH_SEARCH_MAX_QUERIES', '10000'))
 
 def init_product_database():
     """Initialize product database"""
@@ -46,85 +75,24 @@ def init_product_database():
     except Exception as e:
         logger.error(f"❌ Error initializing product database: {e}")
 
-def get_assistant_for_session():
-    """Get or create assistant for current session"""
+def get_session_id():
+    """Get or create the id of the current session"""
     if 'session_id' not in session:
         session['session_id'] = str(uuid.uuid4())
 
-    session_id = session['session_id']
-
-    if session_id not in assistants:
-        assistants[session_id] = SalesAssistant()
-        conversation_history[session_id] = []
-
-    return assistants[session_id], conversation_history[session_id]
+    return session['session_id']
 
 def add_to_conversation(session_id, role, message):
-    """Add message to conversation history"""
-    if session_id not in conversation_history:
-        conversation_history[session_id] = []
-
-    conversation_history[session_id].append({
-        'role': role,
-        'content': message,
-        'timestamp': time.time()
-    })
+    """Add message to conversation history (the store keeps the last 20, older ones go to the summary)"""
+    sessions.append_message(session_id, role, message)
 
-    # Keep only last 20 messages to prevent context bloat
-    if len(conversation_history[session_id]) > 20:
-        conversation_history[session_id] = conversation_history[session_id][-20:]
-
-def build_optimized_prompt(user_message, history, products, search_description=""):
-    """Build concise prompt with essential context only"""
-
-    # Recent conversation (last 4 messages max)
-    recent_context = ""
-    if history:
-        recent_messages = history[-4:]
-        for msg in recent_messages:
-            role = "Usuario" if msg['role'] == 'user' else "Asistente"
-            recent_context += f"{role}: {msg['content'][:100]}...\n"
-
-    # Top 6 most relevant products (increased from 3)
-    products_text = ""
-    if products:
-        # Check if this is an alternative suggestion
-        if "No tenemos" in search_description:
-            products_text = f"{search_description}\n"
-        else:
-            products_text = "PRODUCTOS RELEVANTES:\n"
-
-        for i, p in enumerate(products[:6], 1):  # Increased from 3 to 6
-            price = f"${p['price']:.0f}"
-            if p['on_sale'] and p['original_price']:
-                price = f"${p['price']:.0f} (¡oferta!)"
-            products_text += f"{i}. {p['name']} - {p['brand']} - {price}\n"
-
-    # Concise prompt
-    prompt = f"""
-CONTEXTO RECIENTE:
-{recent_context}
-
-{products_text}
-
-USUARIO: {user_message}
-
-RESPUESTA (máximo 2-3 oraciones, específica con precios, promociona productos relevantes):"""
-
-    return prompt
+def turn_context(session_id, products, search_description=""):
+    """Prompt context of the session's current turn: summary, earlier messages and products within the token budget"""
+    # The current message is the last one in the history; the prompt states it on its own line
+    history = sessions.get_history(session_id)[:-1]
+    return build_context(history, products, search_description, sessions.get_summary(session_id))
 
-async def generate_optimized_response(assistant, prompt):
-    """Generate fast, concise response"""
-    try:
-        from openai import OpenAI
-        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # Faster model
-            messages=[
-                {
-                    "role": "system",
-                    "content": """Eres un asistente de ventas conciso y efectivo.
+SYSTEM_PROMPT = """Eres un asistente de ventas conciso y efectivo.
 
 REGLAS ESTRICTAS:
 - Máximo 3-4 oraciones por respuesta
@@ -139,22 +107,74 @@ EJEMPLOS:
 "Te ofrezco iPhone 13 Pro a $1,284, iPhone 13 a $7,833 (¡oferta!) y iPhone 12 Pro Max a $9,580. ¿Cuál prefieres?"
 "En electrónicos tengo: iPhone 13 Pro $1,284, iPhone SE $5,015 (oferta) y iPhone 13 mini $4,991. Todos con garantía Apple."
 """
+
+LLM_MODEL = "gpt-4o-mini"  # Faster model
+LLM_OPTIONS = {
+    'max_tokens': 150,  # Increased from 100 to accommodate more products
+    'temperature': 0.7,
+    'presence_penalty': 0.6,  # Avoid repetition
+}
+
+TTS_MODEL = "tts-1"  # Faster TTS model
+TTS_SPEED = 1.1  # Slightly faster speech
+
+async def synthesize_speech(text, voice):
+    """Speech for a full response; cached sentences skip the TTS call"""
+    async def synthesize(sentence):
+        response = await get_async_openai_client().audio.speech.create(
+            model=TTS_MODEL, voice=voice, input=sentence, speed=TTS_SPEED
+        )
+        return response.content
+
+    tts_cache = get_tts_cache()
+    if tts_cache is None:
+        return await synthesize(text)
+    return await tts_cache.synthesize_text(text, voice, TTS_SPEED, TTS_MODEL, synthesize)
+
+async def generate_optimized_response(prompt):
+    """Generate fast, concise response"""
+    try:
+        client = get_async_openai_client()
+
+        response = await client.chat.completions.create(
+            model=LLM_MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
                     "content": prompt
                 }
             ],
-            max_tokens=150,  # Increased from 100 to accommodate more products
-            temperature=0.7,
-            presence_penalty=0.6,  # Avoid repetition
+            **LLM_OPTIONS
         )
 
         return response.choices[0].message.content.strip()
 
     except Exception as e:
         logger.error(f"Error generating response: {e}")
-        return "¿En qué producto específico estás interesado? Tengo excelentes ofertas."
+        return FALLBACK_RESPONSE
+
+def completion_context(context, catalog_version):
+    """Everything the LLM sees for a turn except the user message, for completion cache keys"""
+    return '\n'.join([catalog_version or '', LLM_MODEL, json.dumps(LLM_OPTIONS, sort_keys=True), SYSTEM_PROMPT, context])
+
+async def complete(user_message, context, prompt, catalog_version):
+    """LLM response for a turn, reused from the completion cache when the same turn was answered before"""
+    completion_cache = get_completion_cache()
+    if completion_cache is None:
+        return await generate_optimized_response(prompt)
+
+    key = completion_cache.key(completion_context(context, catalog_version), user_message)
+    response = await asyncio.to_thread(completion_cache.get, key)
+    if response is None:
+        response = await generate_optimized_response(prompt)
+        # The fallback stands in for a failed call, keep retrying the LLM
+        if response != FALLBACK_RESPONSE:
+            await asyncio.to_thread(completion_cache.set, key, response)
+    return response
 
 @app.route('/')
 def index():
@@ -165,8 +185,10 @@ def index():
 def greet():
     """Fast greeting with featured products"""
     try:
-        assistant, history = get_assistant_for_session()
-        session_id = session['session_id']
+        session_id = get_session_id()
+
+        # Pin the current catalog for this request
+        product_db = get_product_database()
 
         # Get 6 featured products (increased from 3)
         featured_products = product_db.get_featured_products(max_results=6)
@@ -188,120 +210,282 @@ def greet():
         logger.error(f"Error in greet: {e}")
         return jsonify({'error': 'Error initializing assistant'}), 500
 
-@app.route('/api/chat', methods=['POST'])
-def chat():
-    """Handle text chat with optimized responses"""
-    try:
-        data = request.get_json()
-        user_message = data.get('message', '').strip()
+# Answer to turns refused by the concurrency limiter (HTTP 503)
+OVERLOADED_ERROR = 'Server busy, try again shortly'
+
+def overloaded_response():
+    """503 with a retry hint when the turn limiter and its queue are full"""
+    return jsonify({'error': OVERLOADED_ERROR}), 503, {'Retry-After': '1'}
 
-        if not user_message:
-            return jsonify({'error': 'No message provided'}), 400
+def read_chat_request():
+    """((session_id, message), None) for a text turn request, or (None, error response)"""
+    data = request.get_json(silent=True) or {}
+    user_message = (data.get('message') or '').strip()
 
-        assistant, history = get_assistant_for_session()
-        session_id = session['session_id']
+    if not user_message:
+        return None, (jsonify({'error': 'No message provided'}), 400)
+    return (get_session_id(), user_message), None
 
-        # Add user message
-        add_to_conversation(session_id, 'user', user_message)
+async def chat_turn(session_id, user_message):
+    """One text turn on the shared event loop; returns the /api/chat payload"""
+    async with turn_limiter:
+        timings = metrics.start_request('chat')
 
-        # Enhanced product search (increased from 5 to 8)
-        products, search_description = product_db.smart_search(user_message, max_results=8)
+        # Add user message (session stores may do file I/O, keep it off the loop)
+        await asyncio.to_thread(add_to_conversation, session_id, 'user', user_message)
+
+        # Enhanced product search (increased from 5 to 8), CPU-bound on the search pool
+        product_db = get_product_database()
+        with metrics.stage('search'):
+            products, search_description = await run_in_pool(product_db.smart_search, user_message, max_results=8)
 
         # Build optimized prompt
-        context_prompt = build_optimized_prompt(user_message, history, products, search_description)
+        with metrics.stage('prompt'):
+            context = await asyncio.to_thread(turn_context, session_id, products, search_description)
+            context_prompt = render_prompt(context, user_message)
 
         # Generate fast response
-        response = asyncio.run(generate_optimized_response(assistant, context_prompt))
+        with metrics.stage('llm'):
+            response = await complete(user_message, context, context_prompt, product_db.catalog_version)
 
         # Add response to history
-        add_to_conversation(session_id, 'assistant', response)
+        await asyncio.to_thread(add_to_conversation, session_id, 'assistant', response)
+        history = await asyncio.to_thread(sessions.get_history, session_id)
 
-        return jsonify({
+        return {
             'success': True,
             'response': response,
             'mentioned_products': products[:6],  # Show max 6 products (increased from 3)
             'conversation': history[-6:],  # Show last 6 messages only
-        })
+            'processing_time': metrics.finish_request(timings)
+        }
+
+@app.route('/api/chat', methods=['POST'])
+def chat():
+    """Handle text chat with optimized responses"""
+    try:
+        chat_request, error = read_chat_request()
+        if error:
+            return error
 
+        return jsonify(run_async(chat_turn(*chat_request)))
+
+    except Overloaded:
+        return overloaded_response()
     except Exception as e:
         logger.error(f"Error in chat: {e}")
         return jsonify({'error': 'Error processing message'}), 500
 
-@app.route('/api/voice/chat', methods=['POST'])
-def voice_chat():
-    """Handle voice chat with fast responses"""
+def create_pipeline(session_id, publish=None):
+    """Streamed turn pipeline whose prompts include the session history"""
+    product_db = get_product_database()
+    completion_cache = get_completion_cache()
+
+    def build_context(user_input, products, search_description):
+        return turn_context(session_id, products, search_description)
+
+    def completion_key(context, user_input):
+        return completion_cache.key(completion_context(context, product_db.catalog_version), user_input)
+
+    return VoicePipeline(
+        client=get_async_openai_client(),
+        search=lambda text: product_db.smart_search(text, max_results=8),
+        build_context=build_context,
+        render_prompt=render_prompt,
+        system_prompt=SYSTEM_PROMPT,
+        llm_model=LLM_MODEL,
+        llm_options=LLM_OPTIONS,
+        tts_model=TTS_MODEL,
+        tts_speed=TTS_SPEED,
+        tts_cache=get_tts_cache(),
+        publish_audio=publish,
+        completion_cache=completion_cache,
+        completion_key=completion_key,
+    )
+
+def stream_events(events):
+    """Newline-delimited JSON response, flushed as soon as each event is ready"""
+    return Response(
+        stream_with_context(events),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def stream_turn(events, error_message):
+    """
+    NDJSON response for a turn's async event generator, consumed on the shared loop
+    The first event is awaited before the response starts, so a full server answers 503 and
+    a failure before any output answers 500 instead of a broken 200 stream.
+    """
+    events = iterate_async(events)
     try:
-        session_id = request.form.get('session_id')
-        voice = request.form.get('voice', 'alloy')
-        audio_file = request.files.get('audio')
+        first = next(events)
+    except Overloaded:
+        return overloaded_response()
+    except Exception as e:
+        logger.error(f"{error_message}: {e}")
+        return jsonify({'error': error_message}), 500
 
-        if not audio_file:
-            return jsonify({'error': 'No audio file provided'}), 400
+    def generate():
+        try:
+            yield json.dumps(first, ensure_ascii=False) + '\n'
+            for event in events:
+                yield json.dumps(event, ensure_ascii=False) + '\n'
+
+        except Exception as e:
+            logger.error(f"{error_message}: {e}")
+            yield json.dumps({'type': 'error', 'error': error_message}) + '\n'
+
+    response = stream_events(generate())
+    # Frees the turn slot even if the client disconnects before the body is read
+    response.call_on_close(events.close)
+    return response
+
+async def chat_stream_turn(session_id, user_message):
+    """Events of a streamed text turn; the session history is updated as they are produced"""
+    async with turn_limiter:
+        await asyncio.to_thread(add_to_conversation, session_id, 'user', user_message)
+        pipeline = create_pipeline(session_id)
+        async for event in pipeline.run_text(user_message):
+            if event['type'] == 'done':
+                await asyncio.to_thread(add_to_conversation, session_id, 'assistant', event['response_text'])
+                for stage, seconds in event['timings'].items():
+                    metrics.record_stage(stage, seconds, endpoint='chat_stream')
+                history = await asyncio.to_thread(sessions.get_history, session_id)
+                event['conversation'] = history[-6:]
+            yield event
+
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """Handle text chat as a stream: products first, then LLM tokens, then the updated history"""
+    chat_request, error = read_chat_request()
+    if error:
+        return error
+
+    return stream_turn(chat_stream_turn(*chat_request), 'Error processing message')
+
+async def voice_turn(session_id, audio, filename, mimetype, voice, audio_format):
+    """One voice turn on the shared event loop; returns the /api/voice/chat payload"""
+    async with turn_limiter:
+        timings = metrics.start_request('voice_chat')
+        client = get_async_openai_client()
+
+        # Convert to text, sending the upload to Whisper without a temporary file
+        with metrics.stage('stt'):
+            transcript = await client.audio.transcriptions.create(
+                model="whisper-1",
+                file=(filename, audio, mimetype)
+            )
 
-        # Get conversation history
-        history = conversation_history.get(session_id, [])
-        assistant = assistants.get(session_id)
+        user_input = transcript.text
+        logger.info(f"Voice input: {user_input}")
 
-        # Save audio temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as temp_file:
-            audio_file.save(temp_file.name)
-            temp_path = temp_file.name
+        # Add to conversation
+        await asyncio.to_thread(add_to_conversation, session_id, 'user', user_input)
 
-        try:
-            # Convert to text
-            from openai import OpenAI
-            client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-            with open(temp_path, 'rb') as audio_data:
-                transcript = client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_data
-                )
-
-            user_input = transcript.text
-            logger.info(f"Voice input: {user_input}")
-
-            # Add to conversation
-            add_to_conversation(session_id, 'user', user_input)
-
-            # Enhanced product search
-            products, search_description = product_db.smart_search(user_input, max_results=8)
-
-            # Generate optimized response
-            context_prompt = build_optimized_prompt(user_input, history, products, search_description)
-            response_text = asyncio.run(generate_optimized_response(assistant, context_prompt))
-
-            # Add to conversation
-            add_to_conversation(session_id, 'assistant', response_text)
-
-            # Generate audio response
-            audio_response = client.audio.speech.create(
-                model="tts-1",  # Faster TTS model
-                voice=voice,
-                input=response_text,
-                speed=1.1  # Slightly faster speech
-            )
+        # Enhanced product search
+        product_db = get_product_database()
+        with metrics.stage('search'):
+            products, search_description = await run_in_pool(product_db.smart_search, user_input, max_results=8)
+
+        # Generate optimized response
+        with metrics.stage('prompt'):
+            context = await asyncio.to_thread(turn_context, session_id, products, search_description)
+            context_prompt = render_prompt(context, user_input)
+        with metrics.stage('llm'):
+            response_text = await complete(user_input, context, context_prompt, product_db.catalog_version)
+
+        # Add to conversation
+        await asyncio.to_thread(add_to_conversation, session_id, 'assistant', response_text)
+
+        # Generate audio response
+        with metrics.stage('tts'):
+            audio_bytes = await synthesize_speech(response_text, voice)
+
+        # Binary MP3 behind a URL, or base64 inside the JSON for older clients
+        if audio_format == 'url':
+            with metrics.stage('publish'):
+                response_audio = {'audio_url': await asyncio.to_thread(publish_audio, audio_bytes)}
+        else:
+            with metrics.stage('encode'):
+                response_audio = {'audio_data': base64.b64encode(audio_bytes).decode()}
 
-            # Convert to base64
-            audio_data = base64.b64encode(audio_response.content).decode()
+        return {
+            'success': True,
+            'user_message': user_input,
+            'response_text': response_text,
+            **response_audio,
+            'mentioned_products': products[:6],  # Show max 6 products (increased from 3)
+            'processing_time': metrics.finish_request(timings)
+        }
+
+def read_voice_request():
+    """
+    ((session_id, audio, filename, mimetype, voice, audio_format), None) for a voice turn request,
+    or (None, error response)
+    """
+    session_id = request.form.get('session_id')
+    voice = request.form.get('voice', 'alloy')
+    audio_format = request.form.get('audio_format', 'base64')
+    audio_file = request.files.get('audio')
+
+    if not audio_file:
+        return None, (jsonify({'error': 'No audio file provided'}), 400)
+    if audio_format not in AUDIO_FORMATS:
+        return None, (jsonify({'error': 'audio_format must be base64 or url'}), 400)
+    return (session_id, audio_file.read(), audio_file.filename or 'audio.webm',
+            audio_file.mimetype or 'audio/webm', voice, audio_format), None
 
-            return jsonify({
-                'success': True,
-                'user_message': user_input,
-                'response_text': response_text,
-                'audio_data': audio_data,
-                'mentioned_products': products[:6],  # Show max 6 products (increased from 3)
-                'processing_time': 'optimized'
-            })
+@app.route('/api/voice/chat', methods=['POST'])
+def voice_chat():
+    """Handle voice chat with fast responses"""
+    try:
+        voice_request, error = read_voice_request()
+        if error:
+            return error
 
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        return jsonify(run_async(voice_turn(*voice_request)))
 
+    except Overloaded:
+        return overloaded_response()
     except Exception as e:
         logger.error(f"Error in voice chat: {e}")
         return jsonify({'error': 'Error processing voice message'}), 500
 
+async def voice_stream_turn(session_id, audio, filename, mimetype, voice, audio_format):
+    """Events of a streamed voice turn; the session history is updated as they are produced"""
+    async with turn_limiter:
+        pipeline = create_pipeline(session_id, publish_audio if audio_format == 'url' else None)
+        async for event in pipeline.run(audio, filename, voice, mimetype):
+            if event['type'] == 'transcript':
+                await asyncio.to_thread(add_to_conversation, session_id, 'user', event['text'])
+            elif event['type'] == 'done':
+                await asyncio.to_thread(add_to_conversation, session_id, 'assistant', event['response_text'])
+                for stage, seconds in event['timings'].items():
+                    metrics.record_stage(stage, seconds, endpoint='voice_stream')
+            yield event
+
+@app.route('/api/voice/chat/stream', methods=['POST'])
+def voice_chat_stream():
+    """Handle voice chat as a stream: transcript, products, text tokens and per-sentence audio"""
+    voice_request, error = read_voice_request()
+    if error:
+        return error
+
+    return stream_turn(voice_stream_turn(*voice_request), 'Error processing voice message')
+
+def publish_audio(audio):
+    """Publish response audio and return the URL it is served from"""
+    return f"/api/audio/{audio_store.publish(audio)}"
+
+@app.route('/api/audio/<audio_id>', methods=['GET'])
+def get_audio(audio_id):
+    """Published response audio as MP3, with range requests for progressive playback"""
+    path = audio_store.path(audio_id)
+    if path is None:
+        return jsonify({'error': 'Audio not found'}), 404
+    return send_file(path, mimetype='audio/mpeg', conditional=True, max_age=int(AUDIO_URL_TTL))
+
 @app.route('/api/products', methods=['GET'])
 def get_products():
     """Get product recommendations"""
@@ -309,11 +493,28 @@ def get_products():
         category = request.args.get('category', '')
         search_term = request.args.get('search', '')
         max_results = int(request.args.get('max_results', 5))
+        min_price = request.args.get('min_price', type=float)
+        max_price = request.args.get('max_price', type=float)
+        product_db = get_product_database()
 
-        if search_term:
+        if min_price is not None or max_price is not None:
+            # Sorted price index; category/brand/on_sale narrow the range
+            sort = request.args.get('sort', 'asc')
+            if sort not in ('asc', 'desc', 'catalog'):
+                return jsonify({'error': 'sort must be asc, desc or catalog'}), 400
+
+            on_sale = request.args.get('on_sale')
+            products = product_db.get_products_by_price_range(
+                min_price, max_price, max_results=max_results,
+                sort=None if sort == 'catalog' else sort,
+                category=category or None,
+                brand=request.args.get('brand') or None,
+                on_sale=None if on_sale is None else on_sale.lower() in ('1', 'true', 'si', 'sí')
+            )
+        elif search_term:
             products, _ = product_db.smart_search(search_term, max_results=max_results)
         elif category:
-            products = product_db.get_by_category(category, max_results=max_results)
+            products = product_db.get_products_by_category(category, max_results=max_results)
         else:
             products = product_db.get_featured_products(max_results=max_results)
 
@@ -327,11 +528,150 @@ def get_products():
         logger.error(f"Error getting products: {e}")
         return jsonify({'error': 'Error retrieving products'}), 500
 
-if __name__ == '__main__':
-    # Initialize database
+@app.route('/api/products/facets', methods=['GET'])
+def product_facets():
+    """Products matching category/brand/on_sale filters, with counts per facet value"""
+    try:
+        filters = {
+            'category': request.args.getlist('category') or None,
+            'brand': request.args.getlist('brand') or None,
+        }
+        on_sale = request.args.get('on_sale')
+        if on_sale is not None:
+            filters['on_sale'] = on_sale.lower() in ('1', 'true', 'si', 'sí')
+
+        max_results = int(request.args.get('max_results', 10))
+        result = get_product_database().filter_products(max_results=max_results, **filters)
+
+        return jsonify({'success': True, **result})
+
+    except Exception as e:
+        logger.error(f"Error getting product facets: {e}")
+        return jsonify({'error': 'Error retrieving products'}), 500
+
+@app.route('/api/products/batch', methods=['POST'])
+def batch_products():
+    """Run many search queries in one call; results come back in input order"""
+    try:
+        data = request.get_json(silent=True) or {}
+        queries = data.get('queries')
+        if not isinstance(queries, list) or not all(isinstance(query, str) for query in queries):
+            return jsonify({'error': 'queries must be a list of strings'}), 400
+        if len(queries) > BATCH_SEARCH_MAX_QUERIES:
+            return jsonify({'error': f'At most {BATCH_SEARCH_MAX_QUERIES} queries per batch'}), 400
+
+        max_results = int(data.get('max_results', 8))
+        timings = metrics.start_request('products_batch')
+        with metrics.stage('search'):
+            results = get_product_database().batch_search(queries, max_results=max_results)
+        # Strategies differ per query; the counters in /metrics keep the breakdown
+        timings.pop('search_strategy', None)
+
+        return jsonify({
+            'success': True,
+            'results': [
+                {'query': query, 'products': products, 'search_description': description, 'count': len(products)}
+                for query, (products, description) in zip(queries, results)
+            ],
+            'count': len(results),
+            'processing_time': metrics.finish_request(timings)
+        })
+
+    except Exception as e:
+        logger.error(f"Error in batch search: {e}")
+        return jsonify({'error': 'Error retrieving products'}), 500
+
+@app.route('/api/search/cache', methods=['GET'])
+def search_cache_stats():
+    """Search result cache statistics for tuning its size"""
+    product_db = get_product_database()
+    return jsonify({
+        'success': True,
+        'cache': product_db.search_cache_stats(),
+        'resolvers': {
+            'brand': product_db.brand_resolver.cache_stats(),
+            'category': product_db.category_resolver.cache_stats(),
+        }
+    })
+
+@app.route('/api/tts/cache', methods=['GET'])
+def tts_cache_stats():
+    """TTS audio cache hit rate and memory/disk usage"""
+    tts_cache = get_tts_cache()
+    return jsonify({
+        'success': True,
+        'enabled': tts_cache is not None,
+        'cache': tts_cache.stats() if tts_cache is not None else None
+    })
+
+@app.route('/api/completions/cache', methods=['GET'])
+def completion_cache_stats():
+    """LLM completion cache hit rate (exact and paraphrase) and size"""
+    completion_cache = get_completion_cache()
+    return jsonify({
+        'success': True,
+        'enabled': completion_cache is not None,
+        'cache': completion_cache.stats() if completion_cache is not None else None
+    })
+
+@app.route('/api/sessions/stats', methods=['GET'])
+def session_stats():
+    """Session store size, evictions and approximate memory use"""
+    return jsonify({
+        'success': True,
+        'sessions': sessions.stats()
+    })
+
+@app.route('/api/runtime/stats', methods=['GET'])
+def runtime_stats():
+    """Turns running and waiting against the concurrency limit"""
+    return jsonify({
+        'success': True,
+        'turns': turn_limiter.stats()
+    })
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage latency histograms and search strategy hits in Prometheus text format"""
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.teardown_request
+def clear_request_timings(exc=None):
+    """Don't let a failed request's timings leak into the next one on this thread"""
+    metrics.clear_request()
+
+@app.route('/api/admin/reload', methods=['POST'])
+def reload_catalog():
+    """Reload the product catalog from disk without restarting"""
+    if not ADMIN_TOKEN or request.headers.get('X-Admin-Token') != ADMIN_TOKEN:
+        return jsonify({'error': 'Forbidden'}), 403
+
+    try:
+        reloader = catalog_reloader or CatalogReloader()
+        summary = reloader.reload()
+        return jsonify({'success': True, **summary})
+
+    except Exception as e:
+        logger.error(f"Error reloading catalog: {e}")
+        return jsonify({'error': 'Error reloading catalog'}), 500
+
+def start_services():
+    """Load the catalog and start the optional catalog watcher; returns False when the catalog failed to load"""
+    global catalog_reloader
     init_product_database()
 
     if not product_db:
+        return False
+
+    # Pick up CSV changes without restarting
+    if os.environ.get('CATALOG_WATCH') == '1' and catalog_reloader is None:
+        catalog_reloader = CatalogReloader(product_db.csv_file)
+        catalog_reloader.start()
+    return True
+
+if __name__ == '__main__':
+    # Initialize database
+    if not start_services():
         print("❌ Failed to initialize product database")
         exit(1)
 
@@ -347,5 +687,6 @@ if __name__ == '__main__':
     print("- 📝 2-3 sentences maximum")
     print("- 💨 TTS-1 for faster audio generation")
     print("\n🌐 Open http://localhost:5000")
+    print("⚙️  Development server; for production run: uvicorn asgi_app:app --host 0.0.0.0 --port 5000")
 
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000, threaded=True)